@@ -1,9 +1,32 @@
+import functools
 import os
+import sys
+import uuid
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 import numpy as np
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+
+from catalog import load_catalog
+from coverage import coverage_map
+from downsampling import lttb
+from figure_cache import FigureCache, as_figure, source_version
+from geo_density import bin_positions
+from instrumentation import RerunProfile, log_path, payload_bytes, timed_export
+from on_demand import PropagationCache
+from orbit_export import EXPORT_FORMATS, export_callback, export_file_name
+from orbit_query import RESOLUTIONS, IndexedSource, OrbitQuery, open_source
+from orbit_summary import sample_kpis
+from passes import STATIONS, predict_window
+
+# Points drawn by the single-satellite altitude chart
+ALTITUDE_CHART_POINTS = 2000
+
+# Passes drawn on the pass timeline (the table always lists all of them)
+PASS_TIMELINE_ROWS = 500
+
 # ============================================================
 # PAGE CONFIGURATION (MUST BE FIRST STREAMLIT COMMAND)
 # ============================================================
@@ -12,79 +35,157 @@ st.set_page_config(
     layout="wide"
 )
 
+# Per-rerun stage timings (debug panel / ORBIT_PERF_LOG)
+session_id = st.session_state.setdefault("perf_session", uuid.uuid4().hex[:8])
+profile = RerunProfile(session_id)
+perf_log = log_path()
+
 # ============================================================
 # DATA LOADING (ROBUST, DEPLOYMENT-SAFE, CACHED)
 # ============================================================
-@st.cache_data(show_spinner="Loading orbit data...")
-def load_orbit_data():
-    data_path = "data/all_satellite_orbits.csv"
+@st.cache_resource(show_spinner="Loading orbit data...")
+def load_orbit_source():
+    data_path = "data/all_satellite_orbits"
 
-    if not os.path.exists(data_path):
+    if not os.path.isdir(data_path):
         raise FileNotFoundError(
-            "❌ Orbit data file not found.\n\n"
-            "Expected path: data/all_satellite_orbits.csv\n"
-            "Make sure the file is committed to the repository."
+            "❌ Orbit dataset not found.\n\n"
+            "Expected path: data/all_satellite_orbits/ (Parquet, partitioned by day)\n"
+            "Generate it with scripts/GenerateAllOrbitsFromMetadata.py."
         )
 
-    df = pd.read_csv(
-        data_path,
-        parse_dates=["Time (UTC)"]
-    )
+    # Small datasets: one typed columnar read, sorted once with its time and
+    # per-satellite indexes, held once per process and shared (not copied)
+    # by every session. Larger ones stay on disk and every query is pushed
+    # down into the Parquet scan. Hourly summaries attached either way.
+    return open_source(data_path)
 
-    # Ensure numeric consistency
-    df["Latitude"] = pd.to_numeric(df["Latitude"], errors="coerce")
-    df["Longitude"] = pd.to_numeric(df["Longitude"], errors="coerce")
-    df["Altitude (m)"] = pd.to_numeric(df["Altitude (m)"], errors="coerce")
-
-    # Drop non-physical or incomplete rows
-    df = df.dropna(
-        subset=[
-            "Latitude",
-            "Longitude",
-            "Altitude (m)",
-            "Time (UTC)",
-            "Satellite Name"
-        ]
-    )
 
-    return df
+@st.cache_resource(show_spinner="Loading element catalog...")
+def load_element_catalog():
+    # Parsed once per process; the .npz cache makes restarts cheap too
+    return load_catalog("data/starlink_metadata.csv", cache_dir="data/.catalog_cache")
 
 
-# ============================================================
-# SAFE DATA LOAD
-# ============================================================
-try:
-    df = load_orbit_data()
-except Exception as e:
-    st.error(str(e))
-    st.stop()
+@st.cache_resource
+def get_propagation_cache():
+    # One size-bounded LRU shared by every session
+    return PropagationCache(max_bytes=512 * 1024 ** 2)
+
+
+@st.cache_resource
+def get_figure_cache():
+    # Plotly JSON on disk, shared by every session and process
+    return FigureCache("data/.figure_cache", max_bytes=256 * 1024 ** 2)
+
+
+@st.cache_resource
+def load_source_version(path):
+    # Stamped once per process, like the data loaded from it
+    return source_version(path)
+
 
 # ============================================================
 # SIDEBAR — USER CONTROLS
 # ============================================================
 st.sidebar.header("🛰️ Orbit Controls")
 
-# Date range filter
-min_date = df["Time (UTC)"].min().date()
-max_date = df["Time (UTC)"].max().date()
-
-start_date, end_date = st.sidebar.date_input(
-    "Simulation Date Range",
-    [min_date, max_date]
+data_source = st.sidebar.radio(
+    "Data Source",
+    ["Precomputed dataset", "On-demand propagation"],
+    help="On-demand mode propagates the selected satellites for any window and step"
 )
 
-# Satellite selection
-satellites = sorted(df["Satellite Name"].unique())
+if data_source == "Precomputed dataset":
+    # ========================================================
+    # SAFE DATA LOAD
+    # ========================================================
+    try:
+        with profile.stage("load_orbit_data") as stage:
+            source = load_orbit_source()
+            if isinstance(source, IndexedSource):
+                # Built with the dataset so the first region query does not pay for it
+                source.spatial_index()
+            stage["rows"] = len(source)
+            stage["detail"] = source.kind
+    except Exception as e:
+        st.error(str(e))
+        st.stop()
+
+    dataset_key = (data_source, load_source_version("data/all_satellite_orbits"))
+
+    # Date range filter (from the sorted time index or the hourly summaries)
+    first_time, last_time = source.time_range()
+    min_date = first_time.date()
+    max_date = last_time.date()
+
+    start_date, end_date = st.sidebar.date_input(
+        "Simulation Date Range",
+        [min_date, max_date]
+    )
+
+    # Satellite selection
+    satellites = source.satellites
 
-selected_sats = st.sidebar.multiselect(
-    "Select Satellites (optional)",
-    satellites,
-    help="Leave empty to view all satellites"
-)
+    selected_sats = st.sidebar.multiselect(
+        "Select Satellites (optional)",
+        satellites,
+        help="Leave empty to view all satellites"
+    )
+
+else:
+    try:
+        catalog = load_element_catalog()
+    except Exception as e:
+        st.error(str(e))
+        st.stop()
+
+    today = pd.Timestamp.now(tz="UTC").date()
+
+    start_date, end_date = st.sidebar.date_input(
+        "Simulation Date Range",
+        [today, today]
+    )
+
+    selected_sats = st.sidebar.multiselect(
+        "Select Satellites",
+        sorted(catalog.names),
+        help="Only the selected satellites are propagated"
+    )
+
+    propagation_step = st.sidebar.selectbox(
+        "Propagation Step",
+        ["30 s", "1 min", "5 min", "10 min"],
+        index=1
+    )
+
+    if not selected_sats:
+        st.info("🛰️ Select one or more satellites in the sidebar to propagate.")
+        st.stop()
+
+    step_minutes = {"30 s": 0.5, "1 min": 1, "5 min": 5, "10 min": 10}[propagation_step]
+
+    with st.spinner("Propagating selected satellites..."), profile.stage("propagate") as stage:
+        # The query source, and its tile index once a region is set, live in
+        # the LRU entry, so both are evicted together
+        source = get_propagation_cache().get(
+            catalog,
+            selected_sats,
+            pd.Timestamp(start_date),
+            pd.Timestamp(end_date) + pd.Timedelta(days=1),
+            step_minutes
+        )
+        stage["rows"] = len(source)
+
+    dataset_key = (data_source, load_source_version("data/starlink_metadata.csv"),
+                   str(start_date), str(end_date), tuple(sorted(selected_sats)), step_minutes)
+
+    satellites = sorted(selected_sats)
 
 # Altitude filter
-alt_min = int(np.floor(df["Altitude (m)"].min()))
-alt_max = int(np.ceil(df["Altitude (m)"].max()))
+alt_lo, alt_hi = source.altitude_range()
+alt_min = int(np.floor(alt_lo))
+alt_max = int(np.ceil(alt_hi))
 
 alt_range = st.sidebar.slider(
     "Altitude Range (meters)",
@@ -94,45 +195,257 @@ alt_range = st.sidebar.slider(
     step=1000
 )
 
-# Time downsampling
+# Time downsampling: one sample per satellite per time bin
 time_step = st.sidebar.selectbox(
     "Time Resolution",
     ["All", "5 min", "10 min", "30 min"],
     help="Reduce points for clarity and performance"
 )
 
+# Map rendering (level of detail)
+with st.sidebar.expander("Map Rendering"):
+    map_point_budget = st.number_input(
+        "Point Budget",
+        min_value=1_000,
+        max_value=500_000,
+        value=20_000,
+        step=1_000,
+        help="Above this many samples the map shows a binned density layer"
+    )
+    map_cell_deg = st.selectbox(
+        "Density Cell Size (°)",
+        [1.0, 2.0, 5.0],
+        index=1
+    )
+
+# Region of interest (geo-tiled index in memory, pushed-down box on disk)
+with st.sidebar.expander("Region of Interest"):
+    region_mode = st.radio(
+        "Region",
+        ["Anywhere", "Bounding box", "Point + radius"],
+        help="Keep only samples whose subpoint lies inside the region"
+    )
+    bbox = radius = None
+    if region_mode == "Bounding box":
+        c1, c2 = st.columns(2)
+        bbox = (
+            c1.number_input("Min Latitude", -90.0, 90.0, 35.0),
+            c2.number_input("Max Latitude", -90.0, 90.0, 60.0),
+            c1.number_input("Min Longitude", -180.0, 180.0, -10.0),
+            c2.number_input("Max Longitude", -180.0, 180.0, 30.0,
+                            help="Smaller than Min Longitude: the box crosses 180°")
+        )
+    elif region_mode == "Point + radius":
+        c1, c2 = st.columns(2)
+        radius = (
+            c1.number_input("Latitude", -90.0, 90.0, 51.5),
+            c2.number_input("Longitude", -180.0, 180.0, 0.0),
+            st.number_input("Radius (km)", 1.0, 20_000.0, 500.0, step=50.0)
+        )
+
+# Performance instrumentation; payload sizes cost a serialization, so they
+# are only measured when someone looks at them
+show_perf = st.sidebar.checkbox(
+    "Show performance panel",
+    help="Per-stage timings, row counts and figure payload sizes for this rerun"
+)
+profiling = show_perf or perf_log is not None
+
 # ============================================================
 # DATA FILTERING PIPELINE
 # ============================================================
-filtered_df = df[
-    (df["Time (UTC)"].dt.date >= start_date) &
-    (df["Time (UTC)"].dt.date <= end_date) &
-    (df["Altitude (m)"] >= alt_range[0]) &
-    (df["Altitude (m)"] <= alt_range[1])
-]
-
-if selected_sats:
-    filtered_df = filtered_df[
-        filtered_df["Satellite Name"].isin(selected_sats)
-    ]
-
-# Time downsampling
-if time_step != "All":
-    rule = {
-        "5 min": "5min",
-        "10 min": "10min",
-        "30 min": "30min"
-    }[time_step]
-
-    filtered_df["Time Bin"] = filtered_df["Time (UTC)"].dt.floor(rule)
-
-    filtered_df = (
-        filtered_df
-        .groupby(["Satellite Name", "Time Bin"])
-        .first()
-        .reset_index()
-        .rename(columns={"Time Bin": "Time (UTC)"})
+# Everything the views depend on; cached view results are keyed by it
+query = OrbitQuery(
+    start=pd.Timestamp(start_date),
+    end=pd.Timestamp(end_date) + pd.Timedelta(days=1),
+    satellites=tuple(selected_sats),
+    alt_range=tuple(alt_range),
+    bbox=bbox,
+    radius=radius,
+    resolution=RESOLUTIONS[time_step]
+)
+filter_state = dataset_key + query.key()
+
+
+@functools.cache
+def filtered_samples():
+    """Samples of the sidebar query, built on first use in this rerun (if at all)."""
+    # In memory: binary search, tile lookups and masks on the shared arrays,
+    # so the result is a view or row positions, never a copy of the dataset.
+    # On disk: only the matching partitions, row groups and rows are read.
+    with profile.stage("query") as stage:
+        samples = source.samples(query)
+        stage["rows"] = len(samples)
+        stage["detail"] = source.kind
+    return samples
+
+
+# ============================================================
+# VIEW BUILDERS (cached by filter state, frames never hashed)
+# ============================================================
+@st.cache_data(max_entries=32, show_spinner=False)
+def build_overview_kpis(filter_state, _orbit_summary):
+    # From the hourly summaries when the filter lines up with them,
+    # otherwise from the filtered samples
+    kpis = None
+    if _orbit_summary is not None and query.resolution is None and query.region is None:
+        kpis = _orbit_summary.kpis(
+            query.start,
+            query.end,
+            query.alt_range,
+            query.satellites
+        )
+    if kpis is None:
+        kpis = sample_kpis(filtered_samples())
+    return kpis
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def build_coverage(filter_state, min_elevation, k, cell_deg):
+    # Streams the filtered samples step by step; both coverage layers
+    # share one result
+    return coverage_map(filtered_samples(), min_elevation, k, cell_deg)
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def build_pass_table(catalog_version, station_names, satellite_names, start, end,
+                     step_minutes, min_elevation, _catalog):
+    # The full catalog against a few stations takes tens of seconds: keep
+    # results per (elements, stations, satellites, window, step, mask)
+    stations = STATIONS[STATIONS["Station"].isin(station_names)].reset_index(drop=True)
+    return predict_window(_catalog, satellite_names, stations, start, end,
+                          step_minutes, min_elevation)
+
+
+def cached_figures(key_parts, build):
+    """``(figures, meta)`` from the disk figure cache, built on a miss."""
+    cache = get_figure_cache()
+    built = []
+
+    def build_and_mark():
+        built.append(True)
+        return build()
+
+    with profile.stage(f"figures:{key_parts[0]}") as stage:
+        entry = cache.get_or_build(cache.key(*key_parts), build_and_mark)
+        stage["detail"] = "built" if built else "cache hit"
+    return entry
+
+
+def plot(fig, name):
+    """``st.plotly_chart`` timed, with the figure's payload size if profiling."""
+    with profile.stage(f"figure:{name}"):
+        fig = as_figure(fig)
+    if profiling:
+        with profile.stage(f"serialize:{name}") as stage:
+            stage["bytes"] = payload_bytes(fig)
+    with profile.stage(f"plotly_chart:{name}"):
+        st.plotly_chart(fig, use_container_width=True)
+
+
+def build_distribution_figure(point_budget, cell_deg):
+    samples = filtered_samples()
+
+    if len(samples) > point_budget:
+        # Too many samples for the browser: send binned density cells instead
+        density = bin_positions(
+            samples["Latitude"].to_numpy(),
+            samples["Longitude"].to_numpy(),
+            samples["Altitude (m)"].to_numpy(),
+            cell_deg=cell_deg
+        )
+
+        fig_geo = px.scatter_geo(
+            density,
+            lat="Latitude",
+            lon="Longitude",
+            color="Mean Altitude (m)",
+            size="Samples",
+            hover_data={
+                "Samples": True,
+                "Mean Altitude (m)": ":.0f"
+            },
+            projection="natural earth",
+            color_continuous_scale="Viridis",
+            title=f"Satellite Sample Density Over Earth ({cell_deg:g}° cells)"
+        )
+
+        caption = (
+            f"Showing {len(density):,} density cells for {len(samples):,} samples "
+            f"(point budget {point_budget:,})."
+        )
+        return [fig_geo], {"caption": caption}
+
+    fig_geo = px.scatter_geo(
+        samples,
+        lat="Latitude",
+        lon="Longitude",
+        color="Altitude (m)",
+        hover_name="Satellite Name",
+        hover_data={
+            "Time (UTC)": True,
+            "Altitude (m)": ":.0f"
+        },
+        projection="natural earth",
+        color_continuous_scale="Viridis",
+        title="Satellite Positions Over Earth"
+    )
+    return [fig_geo], {"caption": None}
+
+
+def build_coverage_figure(layer, min_elevation, k, cell_deg):
+    with profile.stage("coverage") as stage:
+        coverage = build_coverage(filter_state, min_elevation, k, cell_deg)
+        stage["rows"] = len(coverage)
+
+    if layer == "Coverage":
+        color, scale = "Coverage", "Viridis"
+        title = f"Fraction of Time with ≥{k} Satellite(s) Above {min_elevation}°"
+    else:
+        color, scale = "Max Revisit Gap (min)", "Inferno_r"
+        title = f"Longest Gap with No Satellite Above {min_elevation}°"
+
+    fig = px.scatter_geo(
+        coverage,
+        lat="Latitude",
+        lon="Longitude",
+        color=color,
+        hover_data={
+            "Coverage": ":.1%",
+            "Mean Satellites in View": ":.1f",
+            "Max Revisit Gap (min)": ":.0f"
+        },
+        projection="natural earth",
+        color_continuous_scale=scale,
+        title=f"{title} ({cell_deg:g}° cells)"
     )
+    fig.update_traces(marker={"symbol": "square", "size": 2 + 3 * cell_deg, "opacity": 0.8})
+    return [fig], {}
+
+
+def build_dynamics_figures(selected_sat):
+    # O(1) offset lookup in memory, name-pruned row groups on disk;
+    # rows in time order either way
+    sat_df = source.satellite(selected_sat)
+
+    fig_track = px.line_geo(
+        sat_df,
+        lat="Latitude",
+        lon="Longitude",
+        color="Altitude (m)",
+        projection="natural earth",
+        title=f"Ground Track of {selected_sat}"
+    )
+
+    # Shape-preserving decimation to a fixed point budget
+    fig_alt = px.line(
+        lttb(sat_df, "Time (UTC)", "Altitude (m)", ALTITUDE_CHART_POINTS),
+        x="Time (UTC)",
+        y="Altitude (m)",
+        title="Orbital Altitude Variation"
+    )
+    return [fig_track, fig_alt], {}
+
 
 # ============================================================
 # TITLE & DESCRIPTION
@@ -150,21 +463,21 @@ allowing exploration of:
 - Temporal evolution of orbits
 """)
 
-tab1, tab2, tab3, tab4 = st.tabs(
-    ["Overview", "Global Distribution", "Orbit Dynamics", "Data Explorer"]
-)
 
 # ============================================================
-# TAB 1 — OVERVIEW (EDUCATIONAL KPIs)
+# VIEW 1 — OVERVIEW (EDUCATIONAL KPIs)
 # ============================================================
-with tab1:
+def render_overview():
     c1, c2, c3, c4 = st.columns(4)
 
-    c1.metric("Unique Satellites", filtered_df["Satellite Name"].nunique())
-    c2.metric("Orbit Samples", len(filtered_df))
+    with profile.stage("kpis"):
+        kpis = build_overview_kpis(filter_state, source.summary)
+
+    c1.metric("Unique Satellites", kpis["satellites"])
+    c2.metric("Orbit Samples", kpis["samples"])
     c3.metric(
         "Mean Altitude (m)",
-        f"{filtered_df['Altitude (m)'].mean():,.0f}"
+        f"{kpis['mean_altitude']:,.0f}"
     )
     c4.metric(
         "Time Span",
@@ -178,28 +491,51 @@ with tab1:
 - Ground track repetition arises from **orbital resonance**
     """)
 
+
 # ============================================================
-# TAB 2 — GLOBAL DISTRIBUTION
+# VIEW 2 — GLOBAL DISTRIBUTION
 # ============================================================
-with tab2:
+def render_global_distribution():
     st.subheader("🌍 Global Satellite Distribution")
 
-    fig_geo = px.scatter_geo(
-        filtered_df,
-        lat="Latitude",
-        lon="Longitude",
-        color="Altitude (m)",
-        hover_name="Satellite Name",
-        hover_data={
-            "Time (UTC)": True,
-            "Altitude (m)": ":.0f"
-        },
-        projection="natural earth",
-        color_continuous_scale="Viridis",
-        title="Satellite Positions Over Earth"
+    layer = st.radio(
+        "Map Layer",
+        ["Satellite Positions", "Coverage", "Revisit Gap"],
+        horizontal=True,
+        help="Coverage and revisit gaps are computed per map cell from the filtered samples"
     )
 
-    st.plotly_chart(fig_geo, use_container_width=True)
+    if layer == "Satellite Positions":
+        with st.spinner("Building map..."):
+            (fig_geo,), meta = cached_figures(
+                ("distribution",) + filter_state + (map_point_budget, map_cell_deg),
+                lambda: build_distribution_figure(map_point_budget, map_cell_deg)
+            )
+        if meta["caption"]:
+            st.caption(meta["caption"])
+    else:
+        c1, c2 = st.columns(2)
+        min_elevation = c1.slider("Elevation Mask (deg)", 0, 45, 10)
+        k = c2.number_input(
+            "Satellites in View (k)",
+            min_value=1,
+            max_value=50,
+            value=1,
+            disabled=layer != "Coverage",
+            help="Coverage counts the time with at least k satellites in view"
+        )
+
+        with st.spinner("Computing coverage..."):
+            (fig_geo,), _ = cached_figures(
+                ("coverage", layer) + filter_state + (min_elevation, k, map_cell_deg),
+                lambda: build_coverage_figure(layer, min_elevation, k, map_cell_deg)
+            )
+        st.caption(
+            "Revisit gaps are measured in time steps of the filtered samples: "
+            "a coarser Time Resolution gives coarser gaps."
+        )
+
+    plot(fig_geo, "distribution")
 
     st.markdown("""
 **Insight:**
@@ -207,10 +543,11 @@ with tab2:
 - Polar clustering reflects Sun-synchronous orbits
 """)
 
+
 # ============================================================
-# TAB 3 — ORBIT DYNAMICS
+# VIEW 3 — ORBIT DYNAMICS
 # ============================================================
-with tab3:
+def render_orbit_dynamics():
     st.subheader("🛰️ Single-Satellite Orbit Analysis")
 
     selected_sat = st.selectbox(
@@ -218,30 +555,17 @@ with tab3:
         satellites
     )
 
-    sat_df = (
-        df[df["Satellite Name"] == selected_sat]
-        .sort_values("Time (UTC)")
-    )
+    with st.spinner("Building orbit charts..."):
+        (fig_track, fig_alt), _ = cached_figures(
+            ("dynamics",) + dataset_key + (selected_sat,),
+            lambda: build_dynamics_figures(selected_sat)
+        )
 
     st.markdown("### Ground Track (Satellite Path over Earth)")
-    fig_track = px.line_geo(
-        sat_df,
-        lat="Latitude",
-        lon="Longitude",
-        color="Altitude (m)",
-        projection="natural earth",
-        title=f"Ground Track of {selected_sat}"
-    )
-    st.plotly_chart(fig_track, use_container_width=True)
+    plot(fig_track, "ground_track")
 
     st.markdown("### Altitude vs Time")
-    fig_alt = px.line(
-        sat_df,
-        x="Time (UTC)",
-        y="Altitude (m)",
-        title="Orbital Altitude Variation"
-    )
-    st.plotly_chart(fig_alt, use_container_width=True)
+    plot(fig_alt, "altitude")
 
     st.markdown("""
 **Learning Notes:**
@@ -249,28 +573,164 @@ with tab3:
 - Periodic variation → eccentricity or perturbations
 """)
 
+
 # ============================================================
-# TAB 4 — DATA EXPLORER
+# VIEW 4 — DATA EXPLORER
 # ============================================================
-with tab4:
+def render_data_explorer():
     st.subheader("📄 Orbit Data Explorer")
 
-    st.dataframe(
-        filtered_df[
-            [
-                "Time (UTC)",
-                "Satellite Name",
-                "Latitude",
-                "Longitude",
-                "Altitude (m)"
-            ]
-        ],
-        use_container_width=True
+    filtered_df = filtered_samples()
+
+    with profile.stage("dataframe") as stage:
+        st.dataframe(
+            filtered_df[
+                [
+                    "Time (UTC)",
+                    "Satellite Name",
+                    "Latitude",
+                    "Longitude",
+                    "Altitude (m)"
+                ]
+            ],
+            use_container_width=True
+        )
+        stage["rows"] = len(filtered_df)
+
+    export_format = st.radio(
+        "Export Format",
+        list(EXPORT_FORMATS),
+        horizontal=True
     )
 
+    # Serialized only when the button is clicked, in chunks
+    export = export_callback(filtered_df, export_format)
+    if perf_log:
+        export = timed_export(export, perf_log, session_id,
+                              format=export_format, rows=len(filtered_df))
+
     st.download_button(
         "📥 Download Filtered Orbit Data",
-        filtered_df.to_csv(index=False),
-        "filtered_orbit_data.csv",
-        "text/csv"
+        export,
+        export_file_name("filtered_orbit_data", export_format),
+        EXPORT_FORMATS[export_format][1]
+    )
+
+
+# ============================================================
+# VIEW 5 — GROUND STATION PASSES
+# ============================================================
+def render_ground_passes():
+    st.subheader("📡 Ground Station Passes")
+
+    c1, c2, c3 = st.columns(3)
+    station_names = c1.multiselect(
+        "Ground Stations",
+        list(STATIONS["Station"]),
+        default=["Svalbard"]
+    )
+    min_elevation = c2.slider("Elevation Mask (deg)", 0, 45, 10)
+    pass_step = c3.selectbox(
+        "Search Step",
+        ["30 s", "1 min", "2 min"],
+        index=1,
+        help="Coarse sampling step; rise, culmination and set are then refined to 1 s"
+    )
+
+    if not station_names:
+        st.info("📡 Select one or more ground stations.")
+        return
+
+    try:
+        element_catalog = load_element_catalog()
+    except Exception as e:
+        st.error(str(e))
+        return
+
+    with st.spinner("Predicting passes..."), profile.stage("passes") as stage:
+        passes = build_pass_table(
+            load_source_version("data/starlink_metadata.csv"),
+            tuple(station_names),
+            tuple(sorted(selected_sats)),
+            pd.Timestamp(start_date),
+            pd.Timestamp(end_date) + pd.Timedelta(days=1),
+            {"30 s": 0.5, "1 min": 1, "2 min": 2}[pass_step],
+            min_elevation,
+            element_catalog
+        )
+        stage["rows"] = len(passes)
+
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Passes", f"{len(passes):,}")
+    c2.metric("Visible Satellites", f"{passes['Satellite Name'].nunique():,}")
+    c3.metric(
+        "Median Duration (s)",
+        f"{passes['Duration (s)'].median():,.0f}" if len(passes) else "—"
     )
+
+    with profile.stage("dataframe") as stage:
+        st.dataframe(passes, use_container_width=True, hide_index=True)
+        stage["rows"] = len(passes)
+
+    if 0 < len(passes) <= PASS_TIMELINE_ROWS:
+        # Passes cut by the window edges are drawn up to the edge
+        timeline = passes.assign(**{
+            "Rise (UTC)": passes["Rise (UTC)"].fillna(pd.Timestamp(start_date)),
+            "Set (UTC)": passes["Set (UTC)"].fillna(
+                pd.Timestamp(end_date) + pd.Timedelta(days=1)
+            ),
+        })
+        fig_passes = px.timeline(
+            timeline,
+            x_start="Rise (UTC)",
+            x_end="Set (UTC)",
+            y="Satellite Name",
+            color="Station",
+            hover_data={"Max Elevation (deg)": ":.1f"},
+            title="Pass Timeline"
+        )
+        plot(fig_passes, "passes")
+    elif len(passes):
+        st.caption(
+            f"Pass timeline shown for up to {PASS_TIMELINE_ROWS:,} passes: "
+            "select satellites in the sidebar to narrow the table."
+        )
+
+    st.markdown("""
+**Operational Notes:**
+- A pass runs from rise to set above the elevation mask
+- Passes cut by the window edges have no rise or set time
+""")
+
+
+# ============================================================
+# VIEW SELECTOR — only the active view is computed
+# ============================================================
+VIEWS = {
+    "Overview": render_overview,
+    "Global Distribution": render_global_distribution,
+    "Orbit Dynamics": render_orbit_dynamics,
+    "Data Explorer": render_data_explorer,
+    "Ground Station Passes": render_ground_passes,
+}
+
+view = st.radio(
+    "View",
+    list(VIEWS),
+    horizontal=True,
+    label_visibility="collapsed",
+    key="active_view"
+)
+
+VIEWS[view]()
+
+# ============================================================
+# PERFORMANCE PANEL & LOG
+# ============================================================
+if show_perf:
+    with st.sidebar.expander("⏱️ Performance (this rerun)", expanded=True):
+        st.dataframe(profile.to_frame(), hide_index=True, use_container_width=True)
+
+if perf_log:
+    profile.log(perf_log, view=view, data_source=data_source, source=source.kind,
+                time_step=time_step)
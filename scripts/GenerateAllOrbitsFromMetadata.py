@@ -1,77 +1,372 @@
-from skyfield.api import load, EarthSatellite, wgs84
-import pandas as pd
+import argparse
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+from skyfield.api import load
 import numpy as np
+import pandas as pd
+
+from catalog import CACHE_DIR, load_catalog
+from orbit_store import (
+    ALT,
+    LAT,
+    LON,
+    NAME,
+    TIME,
+    OrbitDatasetWriter,
+    ShardReader,
+    read_manifest,
+    shard_files,
+    summary_file,
+    write_manifest,
+)
+from propagation import (
+    build_time_grid,
+    grid_datetimes,
+    iter_propagated_blocks,
+    propagate_geodetic,
+)
+
+METADATA_PATH = "../data/starlink_metadata.csv"
+OUTPUT_PATH = "../data/all_satellite_orbits"
+
+DEFAULT_HOURS = 24
+DEFAULT_STEP_MINUTES = 10
+
+
+def shard_stem(shard_id):
+    return f"shard_{shard_id:04d}"
+
+
+def shard_ids(catalog, n_shards):
+    """Stable shard assignment by NORAD ID, so a satellite always lands in
+    the same shard files across runs (needed for incremental updates)."""
+    return catalog.norad_ids % n_shards
+
+
+def name_order(catalog):
+    """Positions sorting a shard by satellite name.
+
+    Shards are written in (name, time) order, so each Parquet row group
+    covers a narrow range of names and a query for a few satellites can
+    skip the others by their statistics.
+    """
+    return np.argsort(catalog.names, kind="stable")
+
 
 # =========================================================
-# LOAD TLE FILE
+# PROPAGATE ONE SHARD (runs inside a worker process)
 # =========================================================
-tle_path = "../data/starlink_tle.txt"
+def propagate_shard(shard_id, catalog, grid, dataset_dir, chunk_rows):
+    catalog = catalog.take(name_order(catalog))
+    satrecs = catalog.satrecs()
+    names = catalog.names
 
-with open(tle_path, "r") as f:
-    lines = f.readlines()
+    ts = load.timescale()
+    times = build_time_grid(ts, *grid)
+    time_values = grid_datetimes(times)
 
-# Each satellite has 3 lines: name, line1, line2
-satellites = []
-for i in range(0, len(lines), 3):
-    name = lines[i].strip()
-    line1 = lines[i+1].strip()
-    line2 = lines[i+2].strip()
-    satellites.append((name, line1, line2))
+    propagated = np.zeros(len(names), dtype=bool)
+
+    # Stream bounded blocks of the shard straight into its own files
+    with OrbitDatasetWriter(dataset_dir, shard_stem(shard_id), chunk_rows) as writer:
+        for sat_slice, time_slice, lat, lon, alt, valid in iter_propagated_blocks(
+            satrecs, times, chunk_rows
+        ):
+            writer.write_block(
+                names[sat_slice], time_values[time_slice], lat, lon, alt, valid
+            )
+            propagated[sat_slice] |= valid.any(axis=1)
+
+    for name in names[~propagated]:
+        print(f"⚠️ Skipped {name}: SGP4 propagation failed")
+
+    return writer.paths, writer.rows_written
 
-print(f"Loaded {len(satellites)} satellites")
 
 # =========================================================
-# TIME SETUP
+# UPDATE ONE SHARD IN PLACE (incremental mode)
 # =========================================================
-ts = load.timescale()
-start_time = ts.now()
-
-minutes = np.arange(0, 24 * 60, 10)  # 24 hours, 10 min step
-times = ts.utc(
-    start_time.utc_datetime().year,
-    start_time.utc_datetime().month,
-    start_time.utc_datetime().day,
-    start_time.utc_datetime().hour,
-    start_time.utc_datetime().minute + minutes
-)
+def update_shard(shard_id, catalog, changed, grid, dataset_dir, chunk_rows):
+    """Rewrite one shard, re-propagating only its ``changed`` satellites.
+
+    The shard is rebuilt in the same satellite blocks as a full rebuild:
+    for every block, stored rows of its unchanged satellites are read back
+    (only the row groups covering their names) and its changed satellites
+    are propagated, and the merged block goes through the writer. Memory
+    stays bounded by ``chunk_rows``, and row order and row-group sizing are
+    the same as regenerating the shard from scratch. Rows of decayed
+    satellites are dropped.
+    """
+    order = name_order(catalog)
+    catalog, changed = catalog.take(order), changed[order]
+    names = catalog.names
+
+    stem = shard_stem(shard_id)
+    old_paths = shard_files(dataset_dir, stem)
+    if os.path.exists(summary_file(dataset_dir, stem)):
+        old_paths.append(summary_file(dataset_dir, stem))
+
+    ts = load.timescale()
+    times = build_time_grid(ts, *grid)
+    time_values = grid_datetimes(times)
+
+    # Same satellite blocks as iter_propagated_blocks
+    sat_block = max(1, chunk_rows // max(1, min(len(time_values), chunk_rows)))
+
+    staging_dir = os.path.join(dataset_dir, f".{stem}.staging")
+    shutil.rmtree(staging_dir, ignore_errors=True)
+
+    fresh_rows = 0
+    with ShardReader(dataset_dir, stem) as stored, \
+            OrbitDatasetWriter(staging_dir, stem, chunk_rows) as writer:
+        for s0 in range(0, len(catalog), sat_block):
+            block = slice(s0, s0 + sat_block)
+            block_names = names[block]
+            block_changed = changed[block]
+
+            reused = stored.read(block_names[~block_changed].tolist())
+            parts = [(
+                reused[NAME].astype(str).to_numpy(dtype=object),
+                reused[TIME].dt.tz_localize(None).to_numpy(dtype="datetime64[ms]"),
+                reused[LAT].to_numpy(),
+                reused[LON].to_numpy(),
+                reused[ALT].to_numpy(),
+            )]
+
+            if block_changed.any():
+                fresh_names = block_names[block_changed]
+                satrecs = catalog.take(np.flatnonzero(block_changed) + s0).satrecs()
+                lat, lon, alt, valid = propagate_geodetic(satrecs, times)
+                sat_idx, time_idx = np.nonzero(valid)
+                parts.append((fresh_names[sat_idx], time_values[time_idx],
+                              lat[valid], lon[valid], alt[valid]))
+                fresh_rows += len(sat_idx)
+
+                for name in fresh_names[~valid.any(axis=1)]:
+                    print(f"⚠️ Skipped {name}: SGP4 propagation failed")
+
+            # Back into (name, time) order, as a full rebuild writes them
+            row_names, row_times, lat, lon, alt = (np.concatenate(p) for p in zip(*parts))
+            position = pd.Index(block_names).get_indexer(row_names)
+            rows = np.lexsort((row_times, position))
+            writer.write_rows(row_names[rows], row_times[rows], lat[rows], lon[rows],
+                              alt[rows])
+
+    # Swap the shard's files into the live dataset
+    for path in old_paths:
+        os.remove(path)
+    paths = []
+    for path in writer.paths:
+        target = os.path.join(dataset_dir, os.path.relpath(path, staging_dir))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(path, target)
+        paths.append(target)
+    shutil.rmtree(staging_dir, ignore_errors=True)
+
+    return paths, fresh_rows
+
 
 # =========================================================
-# PROPAGATE ORBITS
+# MERGE SHARDS
 # =========================================================
-rows = []
-
-for name, line1, line2 in satellites[:500]:  # limit for testing
-    try:
-        sat = EarthSatellite(line1, line2, name, ts)
-        geocentric = sat.at(times)
-        subpoint = wgs84.subpoint(geocentric)
-
-        for t, lat, lon, alt in zip(
-            times,
-            subpoint.latitude.degrees,
-            subpoint.longitude.degrees,
-            subpoint.elevation.m
-        ):
-            rows.append([
-                name,
-                t.utc_iso(),
-                lat,
-                lon,
-                alt
-            ])
+def merge_shards(staging_dir, output_dir):
+    """Publish the shard files written under ``staging_dir`` as the dataset.
+
+    Shards are already Parquet files inside the day partitions, so merging
+    is a directory swap: readers never see a half-written dataset.
+    """
+    if os.path.isdir(output_dir):
+        previous = output_dir + ".old"
+        os.replace(output_dir, previous)
+        os.replace(staging_dir, output_dir)
+        shutil.rmtree(previous)
+    else:
+        os.replace(staging_dir, output_dir)
+
+
+def build_manifest(catalog, grid, n_shards):
+    start, total_minutes, step_minutes = grid
+    return {
+        "grid": {
+            "start": start.isoformat(),
+            "total_minutes": total_minutes,
+            "step_minutes": step_minutes,
+        },
+        "shards": n_shards,
+        "satellites": {
+            str(norad): {"name": name, "fingerprint": fingerprint}
+            for norad, name, fingerprint in zip(
+                catalog.norad_ids.tolist(), catalog.names, catalog.fingerprints().tolist()
+            )
+        },
+    }
+
+
+def run_jobs(function, jobs, workers):
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(function, *zip(*jobs)))
+    return [function(*job) for job in jobs]
 
-    except Exception as e:
-        print(f"⚠️ Skipped {name}: {e}")
 
 # =========================================================
-# SAVE OUTPUT
+# FULL REBUILD / INCREMENTAL UPDATE
 # =========================================================
-df = pd.DataFrame(
-    rows,
-    columns=["Satellite Name", "Time (UTC)", "Latitude", "Longitude", "Altitude (m)"]
-)
+def full_rebuild(catalog, grid, n_shards, output_dir, workers, chunk_rows):
+    staging_dir = output_dir + ".staging"
+    if os.path.isdir(staging_dir):
+        shutil.rmtree(staging_dir)
+    os.makedirs(staging_dir)
+
+    shards = shard_ids(catalog, n_shards)
+    jobs = [
+        (shard_id, catalog.take(shards == shard_id), grid, staging_dir, chunk_rows)
+        for shard_id in range(n_shards)
+    ]
+    results = run_jobs(propagate_shard, jobs, workers)
+
+    write_manifest(staging_dir, build_manifest(catalog, grid, n_shards))
+    merge_shards(staging_dir, output_dir)
+
+    return sum(rows for _, rows in results)
+
+
+def incremental_update(catalog, manifest, grid, output_dir, workers, chunk_rows):
+    n_shards = manifest["shards"]
+    stored = manifest["satellites"]
+
+    fingerprints = catalog.fingerprints().tolist()
+    changed = np.array([
+        stored.get(str(norad), {}).get("fingerprint") != fingerprint
+        for norad, fingerprint in zip(catalog.norad_ids.tolist(), fingerprints)
+    ], dtype=bool)
+
+    current = set(catalog.norad_ids.tolist())
+    decayed = np.array([int(norad) for norad in stored if int(norad) not in current],
+                       dtype=np.int64)
+
+    shards = shard_ids(catalog, n_shards)
+    affected = np.union1d(shards[changed], decayed % n_shards)
+
+    print(f"Changed or new: {changed.sum()}, decayed: {len(decayed)}, "
+          f"shards to rewrite: {len(affected)}/{n_shards}")
+
+    jobs = [
+        (shard_id, catalog.take(shards == shard_id), changed[shards == shard_id],
+         grid, output_dir, chunk_rows)
+        for shard_id in affected.tolist()
+    ]
+    results = run_jobs(update_shard, jobs, workers)
+
+    write_manifest(output_dir, build_manifest(catalog, grid, n_shards))
+
+    return sum(rows for _, rows in results)
+
+
+# =========================================================
+# MAIN
+# =========================================================
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Propagate the Starlink TLE catalog into orbit samples"
+    )
+    parser.add_argument(
+        "--catalog", default=METADATA_PATH,
+        help="element source: OMM metadata CSV (default) or a TLE text file"
+    )
+    parser.add_argument(
+        "--cache-dir", default=CACHE_DIR,
+        help="parsed-catalog cache directory ('' disables the cache)"
+    )
+    parser.add_argument("--output", default=OUTPUT_PATH, help="output dataset directory")
+    parser.add_argument(
+        "--start", default=None,
+        help="grid start, ISO UTC (default: now, or the stored grid with --incremental)"
+    )
+    parser.add_argument(
+        "--hours", type=float, default=None,
+        help=f"propagation horizon (default {DEFAULT_HOURS})"
+    )
+    parser.add_argument(
+        "--step", type=float, default=None,
+        help=f"time step in minutes (default {DEFAULT_STEP_MINUTES})"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="worker processes (0 = one per CPU core)"
+    )
+    parser.add_argument(
+        "--shards", type=int, default=None,
+        help="number of catalog shards (default: one per worker)"
+    )
+    parser.add_argument(
+        "--chunk-rows", type=int, default=500_000,
+        help="samples propagated and flushed to disk per chunk (bounds memory)"
+    )
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="re-propagate only satellites whose element sets changed since the "
+             "last run and update the stored dataset in place"
+    )
+    return parser.parse_args()
+
+
+def resolve_grid(args, manifest):
+    """(start, total_minutes, step_minutes) from the CLI, falling back to the
+    stored grid in incremental mode and to the defaults otherwise."""
+    stored = manifest["grid"] if manifest else None
+
+    if args.start:
+        start = datetime.fromisoformat(args.start)
+        start = start.replace(tzinfo=timezone.utc) if start.tzinfo is None else start
+    elif stored:
+        start = datetime.fromisoformat(stored["start"])
+    else:
+        start = datetime.now(timezone.utc)
+    start = start.replace(second=0, microsecond=0)
+
+    if args.hours is not None:
+        total_minutes = args.hours * 60
+    else:
+        total_minutes = stored["total_minutes"] if stored else DEFAULT_HOURS * 60
+
+    if args.step is not None:
+        step_minutes = args.step
+    else:
+        step_minutes = stored["step_minutes"] if stored else DEFAULT_STEP_MINUTES
+
+    return start, total_minutes, step_minutes
+
+
+def main():
+    args = parse_args()
+
+    catalog = load_catalog(args.catalog, args.cache_dir)
+    print(f"Loaded {len(catalog)} satellites")
+
+    workers = args.workers or os.cpu_count()
+    manifest = read_manifest(args.output) if args.incremental else None
+
+    # All shards share one time grid
+    grid = resolve_grid(args, manifest)
+
+    if manifest and build_manifest(catalog, grid, manifest["shards"])["grid"] == manifest["grid"]:
+        rows = incremental_update(catalog, manifest, grid, args.output, workers,
+                                  args.chunk_rows)
+        label = "Rows re-propagated"
+    else:
+        if args.incremental:
+            print("ℹ️ No reusable dataset for this time grid, running a full rebuild")
+        n_shards = max(1, min(args.shards or workers, len(catalog)))
+        rows = full_rebuild(catalog, grid, n_shards, args.output, workers, args.chunk_rows)
+        label = "Rows generated"
+
+    print("✅ Orbit generation complete")
+    print(f"{label}: {rows}")
 
-df.to_csv("../data/all_satellite_orbits.csv", index=False)
 
-print("✅ Orbit generation complete")
-print(f"Rows generated: {len(df)}")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+"""Benchmark suite for the load, filter, figure, propagate and screen paths.
+
+Every scale (satellites x horizon days) gets a synthetic LEO catalog
+(random Walker-like shells, fresh epochs) and an orbit dataset generated
+from it in a temporary directory. The hot paths are then timed on it:
+
+* ``tle_parse``       parsing a TLE file of the catalog
+* ``propagate``       batch SGP4 + geodetic conversion (samples/s)
+* ``generate``        writing the Parquet dataset (samples/s)
+* ``load_orbit_data`` reading the dataset and building its ``OrbitIndex``
+* ``filter``          sidebar query + 10-minute bins, resident indexes
+* ``query_disk``      the same query pushed down into the Parquet scan
+* ``query_disk_sat``  one satellite over one day, pushed down
+* ``kpis_summary``    Overview KPIs from the hourly summaries
+* ``figure_map``      density binning + map figure + JSON serialization
+* ``figure_dynamics`` single-satellite charts (LTTB) + JSON serialization
+* ``screen``          grid-hashed conjunction screening over one hour
+* ``heatmap``         collision heatmap construction
+
+Each run appends one record to a JSON history file and prints the change
+against the previous run of the same stage and scale, so regressions show
+up as soon as they land::
+
+    python benchmarks.py                          # full matrix
+    python benchmarks.py --satellites 1000 --days 1
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from skyfield.api import load
+import numpy as np
+import pandas as pd
+import plotly.express as px
+from sgp4.exporter import export_tle
+
+from catalog import Catalog, catalog_from_tle
+from conjunctions import screen_catalog
+from downsampling import lttb
+from GenerateAllOrbitsFromMetadata import full_rebuild
+from geo_density import bin_positions
+from orbit_index import OrbitIndex
+from orbit_query import DatasetSource, IndexedSource, OrbitQuery
+from orbit_store import ALT, TIME, read_orbit_dataset, read_summary
+from orbit_summary import OrbitSummary
+from propagation import build_time_grid, iter_propagated_blocks
+from visualize_collision_heatmap import build_heatmap
+
+HISTORY_PATH = "../data/benchmark_history.json"
+
+# Inclination (deg) and mean motion (rev/day) of the synthetic shells
+_SHELLS = [(53.0, 15.06), (53.2, 15.10), (70.0, 15.08), (97.6, 15.20)]
+
+# Slower than this factor against the previous run is flagged (stages
+# faster than MIN_FLAGGED_S are too noisy to judge)
+REGRESSION_FACTOR = 1.2
+MIN_FLAGGED_S = 0.02
+
+
+# =========================================================
+# SYNTHETIC DATA
+# =========================================================
+def synthetic_catalog(n_sats, epoch, seed=0):
+    """Random near-circular LEO catalog with element epochs at ``epoch``."""
+    rng = np.random.default_rng(seed)
+    shell = rng.integers(len(_SHELLS), size=n_sats)
+    inclination, revs_per_day = np.array(_SHELLS)[shell].T
+
+    epoch_days = (pd.Timestamp(epoch).tz_convert(None) - pd.Timestamp("1949-12-31")) \
+        / pd.Timedelta(days=1)
+
+    elements = {
+        "epoch": np.full(n_sats, epoch_days),
+        "bstar": rng.uniform(1e-5, 3e-4, n_sats),
+        "ndot": np.zeros(n_sats),
+        "nddot": np.zeros(n_sats),
+        "ecco": rng.uniform(1e-4, 2e-3, n_sats),
+        "argpo": rng.uniform(0, 2 * np.pi, n_sats),
+        "inclo": np.radians(inclination),
+        "mo": rng.uniform(0, 2 * np.pi, n_sats),
+        "no_kozai": revs_per_day / 720.0 * np.pi,
+        "nodeo": rng.uniform(0, 2 * np.pi, n_sats),
+    }
+
+    norad_ids = np.arange(70000, 70000 + n_sats)
+    names = np.array([f"SYNTH-{i:05d}" for i in range(n_sats)], dtype=object)
+    return Catalog(names, norad_ids, elements)
+
+
+def write_tle_file(catalog, path):
+    with open(path, "w") as f:
+        for name, sat in zip(catalog.names, catalog.satrecs()):
+            line1, line2 = export_tle(sat)
+            f.write(f"{name}\n{line1}\n{line2}\n")
+
+
+def synthetic_events(catalog, start, n_events, seed=0):
+    """Conjunction rows shaped like detect_collisions_with_velocity.py output."""
+    rng = np.random.default_rng(seed)
+    pairs = rng.integers(len(catalog), size=(n_events, 2))
+    return pd.DataFrame({
+        "Timestamp": (pd.Timestamp(start) + pd.to_timedelta(
+            rng.uniform(0, 86400, n_events), unit="s")).astype(str),
+        "Satellite 1": catalog.names[pairs[:, 0]],
+        "Satellite 2": catalog.names[pairs[:, 1]],
+        "Miss Distance (km)": rng.uniform(0, 10, n_events),
+        "Relative Velocity (m/s)": rng.uniform(0, 15000, n_events),
+    })
+
+
+# =========================================================
+# TIMING
+# =========================================================
+def timed(function, repeat=1):
+    """(best wall time in seconds, last result) over ``repeat`` calls."""
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def bench_scale(n_sats, days, step_minutes, repeat, workdir):
+    """Time every stage for one scale; returns a list of result dicts."""
+    results = []
+
+    def record(stage, seconds, items=None):
+        entry = {"stage": stage, "satellites": n_sats, "days": days,
+                 "seconds": round(seconds, 6)}
+        if items is not None:
+            entry["items"] = int(items)
+            entry["items_per_s"] = round(items / seconds, 1) if seconds else None
+        results.append(entry)
+        rate = f"  ({entry['items_per_s']:,.0f}/s)" if items is not None else ""
+        print(f"  {stage:<16} {seconds:9.3f} s{rate}")
+
+    start = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+    catalog = synthetic_catalog(n_sats, start)
+    ts = load.timescale()
+    grid = (start, days * 24 * 60, step_minutes)
+    times = build_time_grid(ts, *grid)
+
+    # TLE parsing
+    tle_path = os.path.join(workdir, "catalog.tle")
+    write_tle_file(catalog, tle_path)
+    seconds, _ = timed(lambda: catalog_from_tle(tle_path), repeat)
+    record("tle_parse", seconds, n_sats)
+
+    # Propagation throughput (bounded blocks, nothing kept)
+    def propagate():
+        samples = 0
+        for *_, valid in iter_propagated_blocks(catalog.satrecs(), times, 1_000_000):
+            samples += int(valid.sum())
+        return samples
+    seconds, samples = timed(propagate, repeat)
+    record("propagate", seconds, samples)
+
+    # Dataset generation
+    dataset_dir = os.path.join(workdir, "orbits")
+    seconds, rows = timed(lambda: full_rebuild(catalog, grid, 1, dataset_dir, 1, 500_000))
+    record("generate", seconds, rows)
+
+    # Dashboard load
+    seconds, orbit_index = timed(
+        lambda: OrbitIndex(read_orbit_dataset(dataset_dir)), repeat
+    )
+    record("load_orbit_data", seconds, len(orbit_index))
+
+    # Sidebar filtering + downsampling: second day (or the day), mid
+    # altitudes, a tenth of the satellites
+    day_start = (pd.Timestamp(start) + pd.Timedelta(days=min(1, days - 1))).ceil("h")
+    day_end = day_start + pd.Timedelta(days=1)
+    altitudes = orbit_index.altitudes
+    alt_range = (float(np.percentile(altitudes, 10)), float(np.percentile(altitudes, 90)))
+    subset = list(catalog.names[::10])
+    query = OrbitQuery(day_start, day_end, tuple(subset), alt_range, resolution="10min")
+
+    seconds, filtered = timed(lambda: IndexedSource(orbit_index).samples(query), repeat)
+    record("filter", seconds, len(filtered))
+
+    # The same query and a single satellite, read from disk with pushdown
+    disk = DatasetSource(dataset_dir)
+    seconds, filtered = timed(lambda: disk.samples(query), repeat)
+    record("query_disk", seconds, len(filtered))
+
+    one_satellite = OrbitQuery(day_start, day_end, (catalog.names[0],))
+    seconds, filtered = timed(lambda: disk.samples(one_satellite), repeat)
+    record("query_disk_sat", seconds, len(filtered))
+
+    # Overview KPIs from the summaries
+    summary = OrbitSummary(read_summary(dataset_dir))
+    seconds, _ = timed(lambda: summary.kpis(day_start, day_end, None, subset), repeat)
+    record("kpis_summary", seconds, len(summary.df))
+
+    # Figures, including the JSON the browser would receive
+    window = orbit_index.rows(orbit_index.time_slice(day_start, day_end))
+
+    def map_figure():
+        density = bin_positions(window["Latitude"].to_numpy(),
+                                window["Longitude"].to_numpy(),
+                                window[ALT].to_numpy())
+        fig = px.scatter_geo(density, lat="Latitude", lon="Longitude",
+                             color="Mean Altitude (m)", size="Samples")
+        return fig.to_json()
+    seconds, _ = timed(map_figure, repeat)
+    record("figure_map", seconds, len(window))
+
+    def dynamics_figures():
+        sat_df = orbit_index.satellite(catalog.names[0])
+        track = px.line_geo(sat_df, lat="Latitude", lon="Longitude", color=ALT)
+        altitude = px.line(lttb(sat_df, TIME, ALT, 2000), x=TIME, y=ALT)
+        return track.to_json(), altitude.to_json()
+    seconds, _ = timed(dynamics_figures, repeat)
+    record("figure_dynamics", seconds, len(orbit_index.satellite_rows(catalog.names[0])))
+
+    # Conjunction screening over one hour at 1-minute steps
+    screen_times = build_time_grid(ts, start, 60, 1)
+    seconds, events = timed(lambda: screen_catalog(catalog, screen_times, 10.0), repeat)
+    record("screen", seconds, n_sats * len(screen_times))
+
+    # Collision heatmap
+    events = synthetic_events(catalog, start, max(1000, n_sats // 10))
+    seconds, _ = timed(lambda: build_heatmap(events).to_json(), repeat)
+    record("heatmap", seconds, len(events))
+
+    return results
+
+
+# =========================================================
+# HISTORY
+# =========================================================
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def compare(results, history):
+    """Print the change against the latest earlier run of each stage/scale."""
+    previous = {}
+    for run in history:
+        for entry in run["results"]:
+            previous[(entry["stage"], entry["satellites"], entry["days"])] = entry
+
+    for entry in results:
+        before = previous.get((entry["stage"], entry["satellites"], entry["days"]))
+        if not before or not before["seconds"]:
+            continue
+        ratio = entry["seconds"] / before["seconds"]
+        regressed = ratio > REGRESSION_FACTOR and entry["seconds"] >= MIN_FLAGGED_S
+        flag = "  ⚠️ regression" if regressed else ""
+        print(f"  {entry['stage']:<16} {entry['satellites']:>6} sats {entry['days']:>3} d  "
+              f"x{ratio:.2f} vs {before['seconds']:.3f} s{flag}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the orbit pipeline on synthetic catalogs"
+    )
+    parser.add_argument("--satellites", type=int, nargs="+", default=[1000, 10000, 50000],
+                        help="catalog sizes")
+    parser.add_argument("--days", type=int, nargs="+", default=[1, 7], help="horizons in days")
+    parser.add_argument("--step", type=float, default=10, help="time step in minutes")
+    parser.add_argument("--repeat", type=int, default=3, help="best of N timings per stage")
+    parser.add_argument("--history", default=HISTORY_PATH, help="JSON history file")
+    parser.add_argument("--no-save", action="store_true", help="do not append to the history")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    results = []
+    for n_sats in args.satellites:
+        for days in args.days:
+            print(f"▶ {n_sats} satellites, {days} day(s), {args.step:g}-minute step")
+            with tempfile.TemporaryDirectory() as workdir:
+                results += bench_scale(n_sats, days, args.step, args.repeat, workdir)
+
+    history = load_history(args.history)
+    if history:
+        print("Change vs previous run:")
+        compare(results, history)
+
+    if not args.no_save:
+        history.append({
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "step_minutes": args.step,
+            "results": results,
+        })
+        os.makedirs(os.path.dirname(args.history) or ".", exist_ok=True)
+        with open(args.history, "w") as f:
+            json.dump(history, f, indent=1)
+        print(f"✅ Results appended to {args.history}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""Satellite element catalog: OMM CSV / TLE ingestion with a binary cache.
+
+The catalog is kept as plain NumPy arrays (one entry per satellite) holding
+exactly the arguments ``Satrec.sgp4init`` needs, so it can be sliced into
+shards, pickled to worker processes and saved as a compact ``.npz``.
+
+``load_catalog`` reads ``starlink_metadata.csv`` (CelesTrak OMM columns)
+with one vectorized pandas pass; the parsed arrays are cached next to the
+data keyed by the SHA-256 of the source file, so repeated runs over an
+unchanged file skip parsing entirely.
+"""
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+from sgp4.api import WGS72, Satrec
+
+CACHE_DIR = "../data/.catalog_cache"
+
+# Days between the Julian date origin and SGP4's 1949-12-31 epoch origin
+SGP4_EPOCH0_JD = 2433281.5
+
+# OMM -> sgp4init unit conversions (same as sgp4.omm.initialize)
+_TO_RADIANS = np.pi / 180.0
+_NDOT_UNITS = 1036800.0 / np.pi
+_NDDOT_UNITS = 2985984000.0 / 2.0 / np.pi
+
+# sgp4init arguments, in call order after (gravconst, opsmode, satnum)
+ELEMENTS = [
+    "epoch", "bstar", "ndot", "nddot", "ecco",
+    "argpo", "inclo", "mo", "no_kozai", "nodeo",
+]
+
+OMM_COLUMNS = [
+    "OBJECT_NAME", "NORAD_CAT_ID", "EPOCH", "MEAN_MOTION", "ECCENTRICITY",
+    "INCLINATION", "RA_OF_ASC_NODE", "ARG_OF_PERICENTER", "MEAN_ANOMALY",
+    "BSTAR", "MEAN_MOTION_DOT", "MEAN_MOTION_DDOT",
+]
+
+
+class Catalog:
+    """Column-oriented element sets for a list of satellites."""
+
+    def __init__(self, names, norad_ids, elements):
+        self.names = np.asarray(names, dtype=object)
+        self.norad_ids = np.asarray(norad_ids, dtype=np.int64)
+        self.elements = {key: np.asarray(elements[key], dtype=np.float64) for key in ELEMENTS}
+
+    def __len__(self):
+        return len(self.names)
+
+    def take(self, index):
+        """Sub-catalog for a slice, index array or boolean mask."""
+        return Catalog(
+            self.names[index],
+            self.norad_ids[index],
+            {key: values[index] for key, values in self.elements.items()},
+        )
+
+    def satrecs(self):
+        """Initialise one SGP4 record per satellite from the element arrays."""
+        columns = [self.elements[key] for key in ELEMENTS]
+        satrecs = []
+        for satnum, values in zip(self.norad_ids.tolist(), zip(*columns)):
+            sat = Satrec()
+            sat.sgp4init(WGS72, "i", satnum, *values)
+            satrecs.append(sat)
+        return satrecs
+
+    def fingerprints(self):
+        """64-bit hash of every satellite's element set (epoch included), as hex.
+
+        FNV-1a over the raw float64 bits, vectorized across the catalog;
+        any change to a satellite's elements changes its fingerprint.
+        """
+        bits = np.stack([self.elements[key] for key in ELEMENTS], axis=1).view(np.uint64)
+        digest = np.full(len(self), 0xCBF29CE484222325, dtype=np.uint64)
+        for column in bits.T:
+            digest = (digest ^ column) * np.uint64(0x100000001B3)
+        return np.char.mod("%016x", digest)
+
+    # -----------------------------------------------------
+    # Binary cache
+    # -----------------------------------------------------
+    def save(self, path):
+        # Write-then-rename so concurrent runs never read a partial cache
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                names=self.names.astype(str),
+                norad_ids=self.norad_ids,
+                **self.elements,
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(
+                data["names"].astype(object),
+                data["norad_ids"],
+                {key: data[key] for key in ELEMENTS},
+            )
+
+
+# =========================================================
+# OMM CSV (starlink_metadata.csv)
+# =========================================================
+def catalog_from_omm(csv_path):
+    """Vectorized OMM CSV -> Catalog conversion (no per-row Python parsing)."""
+    df = pd.read_csv(csv_path, usecols=OMM_COLUMNS)
+    df = df.dropna()
+
+    epoch = pd.to_datetime(df["EPOCH"], format="ISO8601")
+    epoch_days = (epoch - pd.Timestamp("1949-12-31")) / pd.Timedelta(days=1)
+
+    elements = {
+        "epoch": epoch_days.to_numpy(),
+        "bstar": df["BSTAR"].to_numpy(),
+        "ndot": df["MEAN_MOTION_DOT"].to_numpy() / _NDOT_UNITS,
+        "nddot": df["MEAN_MOTION_DDOT"].to_numpy() / _NDDOT_UNITS,
+        "ecco": df["ECCENTRICITY"].to_numpy(),
+        "argpo": df["ARG_OF_PERICENTER"].to_numpy() * _TO_RADIANS,
+        "inclo": df["INCLINATION"].to_numpy() * _TO_RADIANS,
+        "mo": df["MEAN_ANOMALY"].to_numpy() * _TO_RADIANS,
+        "no_kozai": df["MEAN_MOTION"].to_numpy() / 720.0 * np.pi,
+        "nodeo": df["RA_OF_ASC_NODE"].to_numpy() * _TO_RADIANS,
+    }
+
+    return Catalog(df["OBJECT_NAME"].to_numpy(), df["NORAD_CAT_ID"].to_numpy(), elements)
+
+
+# =========================================================
+# TLE text (starlink_tle.txt)
+# =========================================================
+def read_tle_file(tle_path):
+    """(name, line1, line2) triples from a 2- or 3-line TLE file.
+
+    Lines are matched by their "1 " / "2 " prefixes rather than by position,
+    so blank lines (including a trailing one) and missing name lines are
+    tolerated.
+    """
+    with open(tle_path, "r") as f:
+        lines = [line.strip() for line in f if line.strip()]
+
+    satellites = []
+    name = None
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if line.startswith("1 ") and i + 1 < len(lines) and lines[i + 1].startswith("2 "):
+            satellites.append((name or f"NORAD {line[2:7].strip()}", line, lines[i + 1]))
+            name = None
+            i += 2
+        else:
+            name = line
+            i += 1
+
+    return satellites
+
+
+def catalog_from_tle(tle_path):
+    names = []
+    norad_ids = []
+    elements = {key: [] for key in ELEMENTS}
+
+    for name, line1, line2 in read_tle_file(tle_path):
+        try:
+            sat = Satrec.twoline2rv(line1, line2)
+        except Exception as e:
+            print(f"⚠️ Skipped {name}: {e}")
+            continue
+
+        names.append(name)
+        norad_ids.append(sat.satnum)
+        elements["epoch"].append(sat.jdsatepoch - SGP4_EPOCH0_JD + sat.jdsatepochF)
+        for key in ELEMENTS[1:]:
+            elements[key].append(getattr(sat, key))
+
+    return Catalog(names, norad_ids, elements)
+
+
+# =========================================================
+# CACHED ENTRY POINT
+# =========================================================
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_catalog(path, cache_dir=CACHE_DIR):
+    """Catalog for an OMM CSV or TLE file, served from the binary cache if possible."""
+    cache_path = None
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        cache_path = os.path.join(cache_dir, f"{file_sha256(path)[:32]}.npz")
+        if os.path.exists(cache_path):
+            return Catalog.load(cache_path)
+
+    if path.endswith(".csv"):
+        catalog = catalog_from_omm(path)
+    else:
+        catalog = catalog_from_tle(path)
+
+    if cache_path:
+        catalog.save(cache_path)
+
+    return catalog
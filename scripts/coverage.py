@@ -0,0 +1,171 @@
+"""Gridded coverage and revisit-time analysis from propagated subpoints.
+
+For every lat/lon cell of a regular grid this computes the fraction of
+time at least ``k`` satellites are above a minimum elevation, the mean
+number of satellites in view, and the longest revisit gap (no satellite in
+view at all).
+
+A satellite at altitude ``h`` is above elevation ``e`` for every ground
+point within the Earth central angle
+
+    lambda = arccos(R cos(e) / (R + h)) - e
+
+of its subpoint (spherical Earth), so coverage needs only the dataset's
+subpoints and altitudes. The naive cells x satellites x times test runs
+to billions of elements. Instead, samples are streamed one time step at a
+time. Within a step, each footprint adds one longitude interval per grid
+row it reaches (a few dozen rows at 2 degrees). The work is done in
+chunks of at most ``chunk_pairs`` (satellite, row) pairs, and a cumulative
+sum turns the intervals into per-cell counts. Memory is bounded by the
+grid and the chunk size, never by the window length or catalog size.
+"""
+import numpy as np
+import pandas as pd
+
+from orbit_store import ALT, LAT, LON, TIME
+
+# Mean Earth radius (km), spherical model
+EARTH_RADIUS_KM = 6371.0
+
+COLUMNS = [
+    "Latitude",
+    "Longitude",
+    "Coverage",
+    "Mean Satellites in View",
+    "Max Revisit Gap (min)",
+]
+
+
+def footprint_half_angle(alt_m, min_elevation_deg):
+    """Earth central angle (rad) seen above ``min_elevation_deg`` from ``alt_m``."""
+    elevation = np.radians(min_elevation_deg)
+    ratio = EARTH_RADIUS_KM / (EARTH_RADIUS_KM + np.asarray(alt_m) / 1000.0)
+    return np.arccos(np.clip(ratio * np.cos(elevation), -1.0, 1.0)) - elevation
+
+
+class CoverageGrid:
+    """Cell centres of a ``cell_deg`` grid, row-major from (-90, -180)."""
+
+    def __init__(self, cell_deg=2.0):
+        self.cell_deg = cell_deg
+        self.n_lat = int(round(180.0 / cell_deg))
+        self.n_lon = int(round(360.0 / cell_deg))
+        self.lat = -90.0 + (np.arange(self.n_lat) + 0.5) * cell_deg
+        self.lon = -180.0 + (np.arange(self.n_lon) + 0.5) * cell_deg
+
+    def __len__(self):
+        return self.n_lat * self.n_lon
+
+    def footprint_rows(self, lat, half_angle):
+        """``(owner, row)`` for every grid row a footprint may reach."""
+        half_deg = np.degrees(half_angle)
+        row_lo = np.clip(np.ceil((lat - half_deg + 90.0) / self.cell_deg - 0.5), 0, None)
+        row_hi = np.clip(np.floor((lat + half_deg + 90.0) / self.cell_deg - 0.5),
+                         None, self.n_lat - 1)
+        rows = np.maximum(row_hi - row_lo + 1, 0).astype(np.int64)
+
+        owner = np.repeat(np.arange(len(lat)), rows)
+        k = np.arange(rows.sum()) - np.repeat(np.cumsum(rows) - rows, rows)
+        return owner, row_lo.astype(np.int64)[owner] + k
+
+    def count_in_view(self, lat, lon, alt_m, min_elevation_deg, chunk_pairs=1_000_000):
+        """Satellites above the mask from every cell centre, for one instant.
+
+        A footprint crosses each grid row in one longitude interval (cell
+        centres within ``arccos(c)`` of the subpoint longitude, with
+        ``c = (cos lambda - sin phi sin phi_s) / (cos phi cos phi_s)``), so
+        every (satellite, row) pair adds +1/-1 to a per-row difference
+        array and one cumulative sum along longitude gives the counts.
+        """
+        half_angle = footprint_half_angle(alt_m, min_elevation_deg)
+        ok = (alt_m > 0) & (half_angle > 0)
+        lat, lon, half_angle = lat[ok], lon[ok], half_angle[ok]
+
+        width = self.n_lon + 1
+        diff = np.zeros(self.n_lat * width, dtype=np.int64)
+        if not len(lat):
+            return np.zeros(len(self), dtype=np.int64)
+
+        owner, row = self.footprint_rows(lat, half_angle)
+        sin_sat = np.sin(np.radians(lat))
+        cos_sat = np.cos(np.radians(lat))
+        cos_half = np.cos(half_angle)
+
+        for start in range(0, len(owner), chunk_pairs):
+            o = owner[start:start + chunk_pairs]
+            r = row[start:start + chunk_pairs]
+
+            phi = np.radians(self.lat[r])
+            c = (cos_half[o] - np.sin(phi) * sin_sat[o]) \
+                / np.maximum(np.cos(phi) * cos_sat[o], 1e-12)
+            lon_half = np.degrees(np.arccos(np.clip(c, -1.0, 1.0)))
+
+            col_lo = np.ceil((lon[o] - lon_half + 180.0) / self.cell_deg - 0.5)
+            col_hi = np.floor((lon[o] + lon_half + 180.0) / self.cell_deg - 0.5)
+            count = np.clip(col_hi - col_lo + 1, 0, self.n_lon).astype(np.int64)
+            count[c > 1.0] = 0
+            lo = col_lo.astype(np.int64) % self.n_lon
+            hi = lo + count
+
+            # Intervals past the antimeridian wrap into a second one from 0
+            wrap = hi > self.n_lon
+            base = r * width
+            index = np.concatenate([base + lo, base + np.minimum(hi, self.n_lon),
+                                    base[wrap], base[wrap] + hi[wrap] - self.n_lon])
+            weight = np.concatenate([np.ones(len(r)), -np.ones(len(r)),
+                                     np.ones(wrap.sum()), -np.ones(wrap.sum())])
+            keep = np.concatenate([count > 0, count > 0, np.ones(2 * wrap.sum(), bool)])
+            diff += np.bincount(index[keep], weights=weight[keep],
+                                minlength=len(diff)).astype(np.int64)
+
+        counts = np.cumsum(diff.reshape(self.n_lat, width), axis=1)[:, :self.n_lon]
+        return counts.ravel()
+
+
+def coverage_map(samples, min_elevation_deg=10.0, k=1, cell_deg=2.0, chunk_pairs=1_000_000):
+    """Per-cell coverage statistics of time-sorted orbit ``samples``.
+
+    ``Coverage`` is the fraction of time steps with at least ``k``
+    satellites in view; ``Max Revisit Gap (min)`` is the longest run of
+    steps with none in view (window edges included). Returns one row per
+    grid cell with ``COLUMNS``.
+    """
+    grid = CoverageGrid(cell_deg)
+    times = samples[TIME].to_numpy()
+    lat = samples[LAT].to_numpy(dtype=np.float64)
+    lon = samples[LON].to_numpy(dtype=np.float64)
+    alt = samples[ALT].to_numpy(dtype=np.float64)
+
+    # Samples are time-sorted: each step is a contiguous block of rows
+    starts = np.flatnonzero(np.r_[True, times[1:] != times[:-1]])
+    ends = np.r_[starts[1:], len(times)]
+    step_times = times[starts]
+    step = np.median(np.diff(step_times)) if len(step_times) > 1 else np.timedelta64(0, "m")
+
+    covered_k = np.zeros(len(grid), dtype=np.int64)
+    in_view = np.zeros(len(grid), dtype=np.int64)
+    last_seen = np.full(len(grid), -1, dtype=np.int64)
+    max_gap = np.zeros(len(grid), dtype=np.int64)
+
+    for t, (a, b) in enumerate(zip(starts, ends)):
+        counts = grid.count_in_view(lat[a:b], lon[a:b], alt[a:b], min_elevation_deg,
+                                    chunk_pairs)
+        covered_k += counts >= k
+        in_view += counts
+
+        seen = counts > 0
+        max_gap = np.where(seen, np.maximum(max_gap, t - last_seen - 1), max_gap)
+        last_seen[seen] = t
+
+    n_steps = len(starts)
+    max_gap = np.maximum(max_gap, n_steps - last_seen - 1)
+    step_minutes = step / np.timedelta64(1, "m")
+
+    cell_lat, cell_lon = np.meshgrid(grid.lat, grid.lon, indexing="ij")
+    return pd.DataFrame({
+        "Latitude": cell_lat.ravel(),
+        "Longitude": cell_lon.ravel(),
+        "Coverage": covered_k / max(n_steps, 1),
+        "Mean Satellites in View": in_view / max(n_steps, 1),
+        "Max Revisit Gap (min)": max_gap * step_minutes,
+    }, columns=COLUMNS)
@@ -1,8 +1,20 @@
+import functools
+import uuid
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 import numpy as np
 
+from downsampling import lttb
+from figure_cache import FigureCache, as_figure, source_version
+from instrumentation import RerunProfile, log_path, payload_bytes, timed_export
+from orbit_export import EXPORT_FORMATS, export_callback, export_file_name
+from orbit_query import RESOLUTIONS, OrbitQuery, open_source
+from orbit_summary import sample_kpis
+
+# Points drawn by the single-satellite altitude chart
+ALTITUDE_CHART_POINTS = 2000
+
 # ============================================================
 # PAGE CONFIGURATION
 # ============================================================
@@ -11,31 +23,39 @@ st.set_page_config(
     layout="wide"
 )
 
+# Per-rerun stage timings (debug panel / ORBIT_PERF_LOG)
+session_id = st.session_state.setdefault("perf_session", uuid.uuid4().hex[:8])
+profile = RerunProfile(session_id)
+perf_log = log_path()
+
 # ============================================================
 # DATA LOADING (ROBUST & CACHED)
 # ============================================================
-@st.cache_data
-def load_orbit_data():
-    df = pd.read_csv(
-        "../data/all_satellite_orbits.csv",
-        parse_dates=["Time (UTC)"]
-    )
+@st.cache_resource
+def load_orbit_source():
+    # Same query layer as app.py: small datasets are read once, indexed and
+    # shared (not copied) by every session; larger ones stay on disk and
+    # every query is pushed down into the Parquet scan
+    return open_source("../data/all_satellite_orbits")
 
-    # Ensure numeric consistency
-    df["Latitude"] = pd.to_numeric(df["Latitude"], errors="coerce")
-    df["Longitude"] = pd.to_numeric(df["Longitude"], errors="coerce")
-    df["Altitude (m)"] = pd.to_numeric(df["Altitude (m)"], errors="coerce")
 
-    # Drop non-physical rows
-    df = df.dropna(
-        subset=["Latitude", "Longitude", "Altitude (m)", "Time (UTC)", "Satellite Name"]
-    )
+@st.cache_resource
+def get_figure_cache():
+    # Plotly JSON on disk, shared by every session and process
+    return FigureCache("../data/.figure_cache", max_bytes=256 * 1024 ** 2)
+
 
-    return df
+@st.cache_resource
+def load_dataset_version():
+    # Stamped once per process, like the data loaded from it
+    return source_version("../data/all_satellite_orbits")
 
 
 try:
-    df = load_orbit_data()
+    with profile.stage("load_orbit_data") as stage:
+        source = load_orbit_source()
+        stage["rows"] = len(source)
+        stage["detail"] = source.kind
 except Exception as e:
     st.error(f"❌ Failed to load orbit data: {e}")
     st.stop()
@@ -45,16 +65,17 @@ except Exception as e:
 # ============================================================
 st.sidebar.header("🛰️ Orbit Controls")
 
-# Date range filter
-min_date = df["Time (UTC)"].min().date()
-max_date = df["Time (UTC)"].max().date()
+# Date range filter (from the sorted time index or the hourly summaries)
+first_time, last_time = source.time_range()
+min_date = first_time.date()
+max_date = last_time.date()
 start_date, end_date = st.sidebar.date_input(
     "Simulation Date Range",
     [min_date, max_date]
 )
 
 # Satellite selection
-satellites = sorted(df["Satellite Name"].unique())
+satellites = source.satellites
 selected_sats = st.sidebar.multiselect(
     "Select Satellites (optional)",
     satellites,
@@ -62,8 +83,9 @@ selected_sats = st.sidebar.multiselect(
 )
 
 # Altitude filter
-alt_min = int(np.floor(df["Altitude (m)"].min()))
-alt_max = int(np.ceil(df["Altitude (m)"].max()))
+alt_lo, alt_hi = source.altitude_range()
+alt_min = int(np.floor(alt_lo))
+alt_max = int(np.ceil(alt_hi))
 
 alt_range = st.sidebar.slider(
     "Altitude Range (meters)",
@@ -73,39 +95,132 @@ alt_range = st.sidebar.slider(
     step=1000
 )
 
-# Time downsampling (performance + learning)
+# Time downsampling: one sample per satellite per time bin
 time_step = st.sidebar.selectbox(
     "Time Resolution",
     ["All", "5 min", "10 min", "30 min"],
     help="Reduce points for clarity and performance"
 )
 
+# Performance instrumentation; payload sizes cost a serialization, so they
+# are only measured when someone looks at them
+show_perf = st.sidebar.checkbox(
+    "Show performance panel",
+    help="Per-stage timings, row counts and figure payload sizes for this rerun"
+)
+profiling = show_perf or perf_log is not None
+
 # ============================================================
 # DATA FILTERING
 # ============================================================
-filtered_df = df[
-    (df["Time (UTC)"].dt.date >= start_date) &
-    (df["Time (UTC)"].dt.date <= end_date) &
-    (df["Altitude (m)"] >= alt_range[0]) &
-    (df["Altitude (m)"] <= alt_range[1])
-]
-
-if selected_sats:
-    filtered_df = filtered_df[
-        filtered_df["Satellite Name"].isin(selected_sats)
-    ]
-
-# Time downsampling
-if time_step != "All":
-    rule = {"5 min": "5min", "10 min": "10min", "30 min": "30min"}[time_step]
-    filtered_df["Time Bin"] = filtered_df["Time (UTC)"].dt.floor(rule)
-    filtered_df = (
-        filtered_df
-        .groupby(["Satellite Name", "Time Bin"])
-        .first()
-        .reset_index()
-        .rename(columns={"Time Bin": "Time (UTC)"})
+# Everything the views depend on; cached view results are keyed by it
+query = OrbitQuery(
+    start=pd.Timestamp(start_date),
+    end=pd.Timestamp(end_date) + pd.Timedelta(days=1),
+    satellites=tuple(selected_sats),
+    alt_range=tuple(alt_range),
+    resolution=RESOLUTIONS[time_step]
+)
+filter_state = (load_dataset_version(),) + query.key()
+
+
+@functools.cache
+def filtered_samples():
+    """Samples of the sidebar query, built on first use in this rerun (if at all)."""
+    with profile.stage("query") as stage:
+        samples = source.samples(query)
+        stage["rows"] = len(samples)
+        stage["detail"] = source.kind
+    return samples
+
+
+# ============================================================
+# VIEW BUILDERS (cached by filter state, frames never hashed)
+# ============================================================
+@st.cache_data(max_entries=32, show_spinner=False)
+def build_overview_kpis(filter_state, _orbit_summary):
+    # From the hourly summaries when the filter lines up with them,
+    # otherwise from the filtered samples
+    kpis = None
+    if _orbit_summary is not None and query.resolution is None:
+        kpis = _orbit_summary.kpis(
+            query.start,
+            query.end,
+            query.alt_range,
+            query.satellites
+        )
+    if kpis is None:
+        kpis = sample_kpis(filtered_samples())
+    return kpis
+
+
+def cached_figures(key_parts, build):
+    """``(figures, meta)`` from the disk figure cache, built on a miss."""
+    cache = get_figure_cache()
+    built = []
+
+    def build_and_mark():
+        built.append(True)
+        return build()
+
+    with profile.stage(f"figures:{key_parts[0]}") as stage:
+        entry = cache.get_or_build(cache.key(*key_parts), build_and_mark)
+        stage["detail"] = "built" if built else "cache hit"
+    return entry
+
+
+def plot(fig, name):
+    """``st.plotly_chart`` timed, with the figure's payload size if profiling."""
+    with profile.stage(f"figure:{name}"):
+        fig = as_figure(fig)
+    if profiling:
+        with profile.stage(f"serialize:{name}") as stage:
+            stage["bytes"] = payload_bytes(fig)
+    with profile.stage(f"plotly_chart:{name}"):
+        st.plotly_chart(fig, use_container_width=True)
+
+
+def build_distribution_figure():
+    fig_geo = px.scatter_geo(
+        filtered_samples(),
+        lat="Latitude",
+        lon="Longitude",
+        color="Altitude (m)",
+        hover_name="Satellite Name",
+        hover_data={
+            "Time (UTC)": True,
+            "Altitude (m)": ":.0f"
+        },
+        projection="natural earth",
+        color_continuous_scale="Viridis",
+        title="Satellite Positions Over Earth"
     )
+    return [fig_geo], {}
+
+
+def build_dynamics_figures(selected_sat):
+    # O(1) offset lookup in memory, name-pruned row groups on disk;
+    # rows in time order either way
+    sat_df = source.satellite(selected_sat)
+
+    fig_track = px.line_geo(
+        sat_df,
+        lat="Latitude",
+        lon="Longitude",
+        color="Altitude (m)",
+        projection="natural earth",
+        title=f"Ground Track of {selected_sat}"
+    )
+
+    # Shape-preserving decimation to a fixed point budget
+    fig_alt = px.line(
+        lttb(sat_df, "Time (UTC)", "Altitude (m)", ALTITUDE_CHART_POINTS),
+        x="Time (UTC)",
+        y="Altitude (m)",
+        title="Orbital Altitude Variation"
+    )
+    return [fig_track, fig_alt], {}
+
 
 # ============================================================
 # TITLE
@@ -117,21 +232,21 @@ This dashboard is designed for **educational and aerospace study purposes**.
 It visualizes **real orbital motion** derived from satellite metadata and propagation.
 """)
 
-tab1, tab2, tab3, tab4 = st.tabs(
-    ["Overview", "Global Distribution", "Orbit Dynamics", "Data Explorer"]
-)
 
 # ============================================================
-# TAB 1 — OVERVIEW (EDUCATIONAL KPIs)
+# VIEW 1 — OVERVIEW (EDUCATIONAL KPIs)
 # ============================================================
-with tab1:
+def render_overview():
     c1, c2, c3, c4 = st.columns(4)
 
-    c1.metric("Unique Satellites", filtered_df["Satellite Name"].nunique())
-    c2.metric("Orbit Samples", len(filtered_df))
+    with profile.stage("kpis"):
+        kpis = build_overview_kpis(filter_state, source.summary)
+
+    c1.metric("Unique Satellites", kpis["satellites"])
+    c2.metric("Orbit Samples", kpis["samples"])
     c3.metric(
         "Mean Altitude (m)",
-        f"{filtered_df['Altitude (m)'].mean():,.0f}"
+        f"{kpis['mean_altitude']:,.0f}"
     )
     c4.metric(
         "Time Span",
@@ -145,28 +260,18 @@ with tab1:
 - Ground tracks repeat due to **orbital resonance**
     """)
 
+
 # ============================================================
-# TAB 2 — GLOBAL DISTRIBUTION
+# VIEW 2 — GLOBAL DISTRIBUTION
 # ============================================================
-with tab2:
+def render_global_distribution():
     st.subheader("🌍 Global Satellite Distribution")
 
-    fig_geo = px.scatter_geo(
-        filtered_df,
-        lat="Latitude",
-        lon="Longitude",
-        color="Altitude (m)",
-        hover_name="Satellite Name",
-        hover_data={
-            "Time (UTC)": True,
-            "Altitude (m)": ":.0f"
-        },
-        projection="natural earth",
-        color_continuous_scale="Viridis",
-        title="Satellite Positions Over Earth"
-    )
-
-    st.plotly_chart(fig_geo, use_container_width=True)
+    with st.spinner("Building map..."):
+        (fig_geo,), _ = cached_figures(
+            ("distribution",) + filter_state, build_distribution_figure
+        )
+    plot(fig_geo, "distribution")
 
     st.markdown("""
 **Insight:**
@@ -174,10 +279,11 @@ with tab2:
 - Gaps near poles/equator reveal constellation design choices
 """)
 
+
 # ============================================================
-# TAB 3 — ORBIT DYNAMICS & MOTION
+# VIEW 3 — ORBIT DYNAMICS & MOTION
 # ============================================================
-with tab3:
+def render_orbit_dynamics():
     st.subheader("🛰️ Single-Satellite Orbit Analysis")
 
     selected_sat = st.selectbox(
@@ -185,32 +291,19 @@ with tab3:
         satellites
     )
 
-    sat_df = (
-        df[df["Satellite Name"] == selected_sat]
-        .sort_values("Time (UTC)")
-    )
+    with st.spinner("Building orbit charts..."):
+        (fig_track, fig_alt), _ = cached_figures(
+            ("dynamics", filter_state[0], selected_sat),
+            lambda: build_dynamics_figures(selected_sat)
+        )
 
     # Ground track
     st.markdown("### Ground Track (Satellite Path over Earth)")
-    fig_track = px.line_geo(
-        sat_df,
-        lat="Latitude",
-        lon="Longitude",
-        color="Altitude (m)",
-        projection="natural earth",
-        title=f"Ground Track of {selected_sat}"
-    )
-    st.plotly_chart(fig_track, use_container_width=True)
+    plot(fig_track, "ground_track")
 
     # Altitude vs time
     st.markdown("### Altitude vs Time")
-    fig_alt = px.line(
-        sat_df,
-        x="Time (UTC)",
-        y="Altitude (m)",
-        title="Orbital Altitude Variation"
-    )
-    st.plotly_chart(fig_alt, use_container_width=True)
+    plot(fig_alt, "altitude")
 
     st.markdown("""
 **Learning Notes:**
@@ -218,22 +311,71 @@ with tab3:
 - Periodic variation → orbital perturbations or eccentricity
 """)
 
+
 # ============================================================
-# TAB 4 — DATA EXPLORER
+# VIEW 4 — DATA EXPLORER
 # ============================================================
-with tab4:
+def render_data_explorer():
     st.subheader("📄 Orbit Data Explorer")
 
-    st.dataframe(
-        filtered_df[
-            ["Time (UTC)", "Satellite Name", "Latitude", "Longitude", "Altitude (m)"]
-        ],
-        use_container_width=True
+    filtered_df = filtered_samples()
+
+    with profile.stage("dataframe") as stage:
+        st.dataframe(
+            filtered_df[
+                ["Time (UTC)", "Satellite Name", "Latitude", "Longitude", "Altitude (m)"]
+            ],
+            use_container_width=True
+        )
+        stage["rows"] = len(filtered_df)
+
+    export_format = st.radio(
+        "Export Format",
+        list(EXPORT_FORMATS),
+        horizontal=True
     )
 
+    # Serialized only when the button is clicked, in chunks
+    export = export_callback(filtered_df, export_format)
+    if perf_log:
+        export = timed_export(export, perf_log, session_id,
+                              format=export_format, rows=len(filtered_df))
+
     st.download_button(
         "📥 Download Filtered Orbit Data",
-        filtered_df.to_csv(index=False),
-        "filtered_orbit_data.csv",
-        "text/csv"
+        export,
+        export_file_name("filtered_orbit_data", export_format),
+        EXPORT_FORMATS[export_format][1]
     )
+
+
+# ============================================================
+# VIEW SELECTOR — only the active view is computed
+# ============================================================
+VIEWS = {
+    "Overview": render_overview,
+    "Global Distribution": render_global_distribution,
+    "Orbit Dynamics": render_orbit_dynamics,
+    "Data Explorer": render_data_explorer,
+}
+
+view = st.radio(
+    "View",
+    list(VIEWS),
+    horizontal=True,
+    label_visibility="collapsed",
+    key="active_view"
+)
+
+VIEWS[view]()
+
+# ============================================================
+# PERFORMANCE PANEL & LOG
+# ============================================================
+if show_perf:
+    with st.sidebar.expander("⏱️ Performance (this rerun)", expanded=True):
+        st.dataframe(profile.to_frame(), hide_index=True, use_container_width=True)
+
+if perf_log:
+    profile.log(perf_log, view=view, source=source.kind, time_step=time_step)
+
@@ -0,0 +1,97 @@
+import argparse
+import os
+from datetime import datetime, timezone
+
+from skyfield.api import load
+
+from catalog import CACHE_DIR, load_catalog
+from conjunctions import coarse_search_radius, screen_catalog, screen_catalog_refined
+from propagation import build_time_grid
+
+METADATA_PATH = "../data/starlink_metadata.csv"
+OUTPUT_PATH = "../data/collision_risks_with_velocity.csv"
+
+DEFAULT_STEP_MINUTES = 10
+# The refined coarse pass pads its grid query by the distance covered in
+# half a step, so it needs a fine grid to stay selective
+REFINE_STEP_MINUTES = 1
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Screen the catalog for close approaches between satellites"
+    )
+    parser.add_argument(
+        "--catalog", default=METADATA_PATH,
+        help="element source: OMM metadata CSV (default) or a TLE text file"
+    )
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="parsed-catalog cache directory")
+    parser.add_argument("--output", default=OUTPUT_PATH, help="conjunction CSV output")
+    parser.add_argument("--hours", type=float, default=24, help="screening horizon")
+    parser.add_argument(
+        "--step", type=float, default=None,
+        help=f"time step in minutes (default {DEFAULT_STEP_MINUTES}, "
+             f"or {REFINE_STEP_MINUTES} with --refine)"
+    )
+    parser.add_argument(
+        "--threshold-km", type=float, default=10.0,
+        help="report pairs closer than this distance"
+    )
+    parser.add_argument(
+        "--refine", action="store_true",
+        help="two-stage mode: padded coarse pass over the grid, then root-find "
+             "the exact time and distance of closest approach per candidate "
+             "(--step may be at most about 1 minute)"
+    )
+    parser.add_argument(
+        "--tolerance-s", type=float, default=1e-3,
+        help="closest-approach time tolerance in seconds (with --refine)"
+    )
+    args = parser.parse_args()
+
+    if args.step is None:
+        args.step = REFINE_STEP_MINUTES if args.refine else DEFAULT_STEP_MINUTES
+    if args.refine:
+        try:
+            coarse_search_radius(args.threshold_km, args.step * 60)
+        except ValueError as exc:
+            parser.error(str(exc))
+
+    return args
+
+
+def main():
+    args = parse_args()
+
+    # =========================================================
+    # LOAD CATALOG & TIME GRID
+    # =========================================================
+    catalog = load_catalog(args.catalog, args.cache_dir)
+    print(f"Loaded {len(catalog)} satellites")
+
+    ts = load.timescale()
+    times = build_time_grid(ts, datetime.now(timezone.utc), args.hours * 60, args.step)
+
+    # =========================================================
+    # SCREEN
+    # =========================================================
+    if args.refine:
+        events = screen_catalog_refined(
+            catalog, times, args.threshold_km, tolerance_s=args.tolerance_s
+        )
+    else:
+        events = screen_catalog(catalog, times, args.threshold_km)
+
+    # =========================================================
+    # SAVE OUTPUT
+    # =========================================================
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    events.to_csv(args.output, index=False)
+
+    print("✅ Conjunction screening complete")
+    print(f"Close approaches found: {len(events)}")
+    print(f"CSV saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Time-series decimation for the dashboard charts.
+
+``bin_downsample`` implements the "Time Resolution" option. The filtered
+frame is already sorted by time, so resolution bins are consecutive runs of
+rows: every row gets an integer (bin, satellite) code and the first row of
+each code is kept, which is ``groupby([bin, name]).first()`` without the
+group-by or the re-sort, and with no write into a filtered slice.
+
+``lttb_indices`` is Largest-Triangle-Three-Buckets: it picks a fixed number
+of points that preserve the visual shape of a line (peaks and troughs
+included), so long single-satellite windows plot quickly.
+"""
+import numpy as np
+import pandas as pd
+
+from orbit_store import NAME, TIME
+
+
+def bin_downsample(df, rule):
+    """First sample of every satellite in every ``rule`` bin (e.g. ``"10min"``).
+
+    ``df`` must be sorted by time. Bins are epoch-aligned like
+    ``Series.dt.floor``, and kept rows are stamped with their bin start.
+    A satellite whose first sample in a bin comes after the bin's first
+    grid step (it only enters the filtered window later in the bin) is
+    kept at that later sample.
+    """
+    if df.empty:
+        return df
+
+    times = df[TIME].to_numpy(dtype="datetime64[ms]").astype(np.int64)
+    width = pd.Timedelta(rule) // pd.Timedelta(milliseconds=1)
+    bins = times - times % width
+
+    names = df[NAME]
+    if isinstance(names.dtype, pd.CategoricalDtype):
+        codes, n_names = names.cat.codes.to_numpy(np.int64), len(names.cat.categories)
+    else:
+        codes, uniques = pd.factorize(names)
+        n_names = len(uniques)
+
+    # Dense bin number (bins are non-decreasing) combined with the satellite
+    bin_ids = np.cumsum(np.r_[False, bins[1:] != bins[:-1]])
+    keep = np.flatnonzero(~pd.Series(bin_ids * (n_names + 1) + codes).duplicated().to_numpy())
+
+    out = df.iloc[keep]
+    return out.assign(**{
+        TIME: pd.DatetimeIndex(bins[keep].astype("datetime64[ms]")).tz_localize(df[TIME].dt.tz)
+    })
+
+
+def lttb_indices(x, y, n_out):
+    """Row positions of the ``n_out`` points LTTB keeps for the line (x, y).
+
+    The first and last points are always kept; every bucket in between
+    contributes the point forming the largest triangle with the previously
+    kept point and the average of the next bucket.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0] = 0
+    kept[-1] = n - 1
+
+    previous = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        next_lo, next_hi = hi, edges[b + 2] if b + 2 < len(edges) else n
+        next_x = x[next_lo:next_hi].mean()
+        next_y = y[next_lo:next_hi].mean()
+
+        area = np.abs(
+            (x[previous] - next_x) * (y[lo:hi] - y[previous])
+            - (x[previous] - x[lo:hi]) * (next_y - y[previous])
+        )
+        previous = lo + int(np.argmax(area))
+        kept[b + 1] = previous
+
+    return kept
+
+
+def lttb(df, x, y, n_out):
+    """``df`` decimated to ``n_out`` rows along the (x, y) line."""
+    if len(df) <= n_out:
+        return df
+    xs = df[x]
+    if xs.dtype.kind == "M":
+        xs = xs.to_numpy(dtype="datetime64[ms]").astype(np.int64)
+    return df.iloc[lttb_indices(xs, df[y].to_numpy(), n_out)]
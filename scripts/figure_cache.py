@@ -0,0 +1,153 @@
+"""Content-addressed, size-capped disk cache for dashboard figures.
+
+Most sessions open the dashboard with the same default filters, so the
+same Plotly figures would be rebuilt for each of them. Figures are stored
+as Plotly JSON under a SHA-256 of everything that determines them (the
+dataset version plus the sidebar state), so any process serving the
+dashboard, including one started after a restart, can reuse them.
+
+Entries are written atomically: every write goes to its own ``mkstemp``
+file and is renamed into place, so concurrent sessions (threads of one
+process) building the same figure never share a temp file. A hit refreshes
+the entry's modification time. The cache keeps a running total of its
+size, and only a write that takes it over ``max_bytes`` rescans the
+directory and evicts the least recently used entries.
+
+A hit returns the stored figure dicts. They were validated when the
+figures were built, and ``st.plotly_chart`` would validate a dict all over
+again, so ``as_figure`` wraps one in a ``go.Figure`` with validation off.
+"""
+import glob
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+import plotly.graph_objects as go
+
+CACHE_DIR = "../data/.figure_cache"
+
+
+def as_figure(figure):
+    """``figure`` as a ``go.Figure``; a cached dict is wrapped unvalidated."""
+    if isinstance(figure, dict):
+        return go.Figure(figure, _validate=False)
+    return figure
+
+
+def source_version(*paths):
+    """Cheap version stamp for files or directory trees (names, sizes, mtimes).
+
+    Regenerating the orbit dataset or replacing the catalog changes it.
+    """
+    entries = []
+    for path in paths:
+        files = [path]
+        if os.path.isdir(path):
+            files = sorted(
+                os.path.join(root, name)
+                for root, _, names in os.walk(path) for name in names
+            )
+        for file in files:
+            if os.path.exists(file):
+                stat = os.stat(file)
+                entries.append((os.path.relpath(file, path), stat.st_size, stat.st_mtime_ns))
+    return hashlib.sha256(json.dumps(entries).encode()).hexdigest()[:16]
+
+
+class FigureCache:
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=256 * 1024 ** 2):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+        # Running size of the entries; resynced from disk on every eviction
+        self._lock = threading.Lock()
+        self._bytes = sum(size for _, size, _ in self._entries())
+
+    @staticmethod
+    def key(*parts):
+        return hashlib.sha256(json.dumps(parts, default=str).encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key):
+        """``(figures, meta)`` for ``key``, or None on a miss; ``figures``
+        are the stored figure dicts."""
+        path = self._path(key)
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+
+        return entry["figures"], entry["meta"]
+
+    def put(self, key, figures, meta=None):
+        # Figures are already JSON (Plotly's encoder handles NumPy arrays)
+        payload = '{"meta": %s, "figures": [%s]}' % (
+            json.dumps(meta), ", ".join(figure.to_json() for figure in figures)
+        )
+
+        path = self._path(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(payload)
+            size = os.path.getsize(tmp_path)
+            try:
+                replaced = os.path.getsize(path)
+            except OSError:
+                replaced = 0
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        with self._lock:
+            self._bytes += size - replaced
+            over_budget = self._bytes > self.max_bytes
+        if over_budget:
+            self.evict()
+
+    def get_or_build(self, key, build):
+        """Cached ``build()`` result; ``build`` returns ``(figures, meta)``.
+
+        A hit returns figure dicts, a miss the freshly built figures.
+        """
+        entry = self.get(key)
+        if entry is None:
+            entry = build()
+            self.put(key, *entry)
+        return entry
+
+    def _entries(self):
+        entries = []
+        for path in glob.glob(os.path.join(self.cache_dir, "*.json")):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        return entries
+
+    def evict(self):
+        """Drop least recently used entries until under ``max_bytes``."""
+        with self._lock:
+            entries = self._entries()
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                total -= size
+            self._bytes = total
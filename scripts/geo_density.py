@@ -0,0 +1,35 @@
+"""Server-side lat/lon binning for the Global Distribution map.
+
+Above a point budget the dashboard does not ship every sample to the
+browser. Samples are binned into a regular lat/lon grid with
+``np.histogram2d`` (sample count and mean altitude per cell), and only the
+non-empty cells are sent. The payload is then bounded by the grid size
+(at most 64,800 cells at 1°) instead of by the number of samples.
+"""
+import numpy as np
+import pandas as pd
+
+
+def bin_positions(lat, lon, alt, cell_deg=2.0):
+    """Per-cell sample count and mean altitude for the non-empty cells.
+
+    Returns a DataFrame with the cell-centre ``Latitude``/``Longitude``,
+    ``Samples`` and ``Mean Altitude (m)``.
+    """
+    lat_edges = np.arange(-90.0, 90.0 + cell_deg, cell_deg)
+    lon_edges = np.arange(-180.0, 180.0 + cell_deg, cell_deg)
+
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    alt = np.asarray(alt, dtype=np.float64)
+
+    counts, _, _ = np.histogram2d(lat, lon, bins=(lat_edges, lon_edges))
+    alt_sum, _, _ = np.histogram2d(lat, lon, bins=(lat_edges, lon_edges), weights=alt)
+
+    row, col = np.nonzero(counts)
+    return pd.DataFrame({
+        "Latitude": (lat_edges[row] + lat_edges[row + 1]) / 2.0,
+        "Longitude": (lon_edges[col] + lon_edges[col + 1]) / 2.0,
+        "Samples": counts[row, col].astype(np.int64),
+        "Mean Altitude (m)": alt_sum[row, col] / counts[row, col],
+    })
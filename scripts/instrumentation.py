@@ -0,0 +1,119 @@
+"""Per-rerun stage timing for the dashboard.
+
+A ``RerunProfile`` is created at the top of every script run; pipeline
+stages are wrapped in ``profile.stage(name)`` and may attach the number of
+rows they produced and the size of the payload they serialized. At the end
+of the run the profile can be shown in the debug sidebar panel
+(``profile.to_frame()``) and appended as one JSON line to a structured log
+for offline analysis (``profile.log(path)``).
+
+Logging is enabled for every session by pointing ``ORBIT_PERF_LOG`` at a
+file, so latency can be collected under real concurrent load without
+anyone opening the panel. Work that happens outside a rerun (the lazy
+download export) is logged as a standalone event with ``log_event``.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import pandas as pd
+import plotly.io as pio
+
+LOG_ENV = "ORBIT_PERF_LOG"
+
+STAGE_COLUMNS = ["stage", "seconds", "rows", "bytes", "detail"]
+
+# Sessions run on threads of one process: serialize appends to the log
+_log_lock = threading.Lock()
+
+
+def log_path():
+    """Structured log file from the environment, or None if logging is off."""
+    return os.environ.get(LOG_ENV) or None
+
+
+def _append(path, record):
+    line = json.dumps(record, default=str)
+    with _log_lock:
+        with open(path, "a") as f:
+            f.write(line + "\n")
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+
+
+class RerunProfile:
+    def __init__(self, session_id=None):
+        self.session_id = session_id
+        self.started = time.perf_counter()
+        self.timestamp = _now()
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name):
+        """Time the enclosed block; yields the stage record so the block can
+        fill in ``rows``, ``bytes`` and ``detail`` (e.g. a cache hit)."""
+        record = {"stage": name, "seconds": None, "rows": None, "bytes": None,
+                  "detail": None}
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["seconds"] = time.perf_counter() - start
+            self.stages.append(record)
+
+    @property
+    def total_seconds(self):
+        return time.perf_counter() - self.started
+
+    def to_frame(self):
+        total = {"stage": "total (rerun)", "seconds": self.total_seconds}
+        frame = pd.DataFrame(self.stages + [total], columns=STAGE_COLUMNS)
+        return frame.astype({"rows": "Int64", "bytes": "Int64"})
+
+    def log(self, path, **context):
+        """Append this rerun (stages plus ``context`` such as the view) as JSON."""
+        _append(path, {
+            "timestamp": self.timestamp,
+            "session": self.session_id,
+            "event": "rerun",
+            "total_seconds": round(self.total_seconds, 6),
+            **context,
+            "stages": [
+                {**stage, "seconds": round(stage["seconds"], 6)} for stage in self.stages
+            ],
+        })
+
+
+def log_event(path, session_id, event, seconds, **fields):
+    """Append a standalone timed event (e.g. a download export)."""
+    _append(path, {
+        "timestamp": _now(),
+        "session": session_id,
+        "event": event,
+        "total_seconds": round(seconds, 6),
+        **fields,
+    })
+
+
+def payload_bytes(fig):
+    """Size of the JSON a Plotly figure sends to the browser."""
+    return len(pio.to_json(fig, validate=False))
+
+
+def timed_export(export, path, session_id, **fields):
+    """Wrap a zero-argument export callable so each call is logged with its
+    duration and output size (the download runs outside any rerun)."""
+    def run():
+        start = time.perf_counter()
+        out = export()
+        seconds = time.perf_counter() - start
+        size = out.seek(0, os.SEEK_END)
+        out.seek(0)
+        log_event(path, session_id, "export", seconds, bytes=size, **fields)
+        return out
+    return run
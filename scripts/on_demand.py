@@ -0,0 +1,99 @@
+"""On-demand propagation for the dashboard, with a size-bounded LRU cache.
+
+Instead of only showing what was precomputed into the orbit dataset, the
+dashboard can propagate the selected satellites over any date window at any
+step straight from the element catalog. Results are kept in one process-wide
+LRU keyed by (satellite set, window, step) and bounded by their in-memory
+size, so revisiting a view is free and memory stays capped. Entries are
+stored as ``IndexedSource`` objects, shared read-only by the sessions that
+hit them. The tile index a region query builds lives on the entry too, so
+it is evicted with the samples it points into, and every entry is charged
+for it up front.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from skyfield.api import load
+
+from orbit_index import OrbitIndex
+from orbit_query import IndexedSource
+from orbit_store import ALT, LAT, LON, NAME, TIME
+from propagation import build_time_grid, grid_datetimes, propagate_geodetic
+from spatial_index import SpatialIndex
+
+
+def propagate_window(catalog, names, start, end, step_minutes, ts=None):
+    """Propagate ``names`` over ``[start, end)`` into a dataset-shaped DataFrame.
+
+    Columns and dtypes match ``orbit_store.read_orbit_dataset`` so the rest
+    of the dashboard pipeline does not care where the samples came from.
+    """
+    ts = ts or load.timescale()
+    subset = catalog.take(np.flatnonzero(np.isin(catalog.names, list(names))))
+
+    total_minutes = (pd.Timestamp(end) - pd.Timestamp(start)) / pd.Timedelta(minutes=1)
+    times = build_time_grid(ts, pd.Timestamp(start, tz="UTC"), total_minutes, step_minutes)
+    lat, lon, alt, valid = propagate_geodetic(subset.satrecs(), times)
+
+    sat_idx, time_idx = np.nonzero(valid)
+    return pd.DataFrame({
+        NAME: pd.Categorical(subset.names[sat_idx]),
+        TIME: pd.DatetimeIndex(grid_datetimes(times)[time_idx]).tz_localize("UTC"),
+        LAT: lat[valid].astype(np.float32),
+        LON: lon[valid].astype(np.float32),
+        ALT: alt[valid].astype(np.float32),
+    })
+
+
+class PropagationCache:
+    """Thread-safe LRU of propagated windows, bounded by total bytes.
+
+    Streamlit serves sessions from threads of one process, so a single
+    instance (held with ``st.cache_resource``) is shared by every user.
+    """
+
+    def __init__(self, max_bytes=512 * 1024 ** 2):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._ts = load.timescale()
+
+    @staticmethod
+    def key(names, start, end, step_minutes):
+        return (
+            tuple(sorted(names)),
+            pd.Timestamp(start).isoformat(),
+            pd.Timestamp(end).isoformat(),
+            float(step_minutes),
+        )
+
+    def get(self, catalog, names, start, end, step_minutes):
+        """Cached ``IndexedSource`` of ``names`` propagated over ``[start, end)``."""
+        key = self.key(names, start, end, step_minutes)
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key][0]
+
+        index = OrbitIndex(
+            propagate_window(catalog, key[0], start, end, step_minutes, self._ts)
+        )
+        source = IndexedSource(index)
+        size = index.nbytes + SpatialIndex.BYTES_PER_ROW * len(index)
+
+        with self._lock:
+            if key not in self._entries and size <= self.max_bytes:
+                self._entries[key] = (source, size)
+                self.current_bytes += size
+                while self.current_bytes > self.max_bytes:
+                    _, (_, evicted) = self._entries.popitem(last=False)
+                    self.current_bytes -= evicted
+
+        return source
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,179 @@
+"""Headless, parallel export of 3D orbit animations (GIF or MP4).
+
+Frames are rendered with the Agg backend in worker processes, each worker
+taking a contiguous range of frames:
+
+* the static scene (Earth mesh, axes, title) is drawn once per worker and
+  kept as a bitmap; every frame restores it and draws only the moving
+  artists (satellite markers, trails, clock),
+* all trails live in one preallocated (satellites, steps + 1, 3) buffer
+  drawn as a single NaN-separated line, so advancing a frame writes one
+  column (and clears one for a bounded trail) instead of re-slicing lists,
+* any number of satellites share those two artists.
+
+Frames are written as PNGs to a temporary directory and stitched with
+Pillow (GIF) or a local ffmpeg binary (MP4).
+"""
+import os
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use("Agg")
+
+import numpy as np
+import matplotlib.pyplot as plt
+from PIL import Image
+
+# Earth radius (approximate in km), for the 3D globe
+EARTH_RADIUS_KM = 6371.0
+
+
+def frame_path(frame_dir, frame):
+    return os.path.join(frame_dir, f"frame_{frame:05d}.png")
+
+
+# =========================================================
+# FRAME RENDERING (runs inside a worker process)
+# =========================================================
+def render_frames(xyz, labels, frames, frame_dir, title, trail_steps, size_px):
+    """Render ``frames`` of the (N, T, 3) track array ``xyz`` (NaN = no sample).
+
+    ``trail_steps`` is the trail length in steps (None = since the start).
+    """
+    n_sats, n_steps, _ = xyz.shape
+    # Robust to a few runaway tracks from stale element sets
+    limit = 1.05 * np.nanpercentile(np.linalg.norm(xyz, axis=-1), 99)
+
+    plt.style.use("dark_background")
+    fig = plt.figure(figsize=(size_px[0] / 100, size_px[1] / 100), dpi=100)
+    ax = fig.add_subplot(111, projection="3d")
+    ax.set_title(title)
+
+    # Earth sphere (static: drawn into the background once)
+    u, v = np.mgrid[0:2 * np.pi:100j, 0:np.pi:50j]
+    ax.plot_surface(
+        EARTH_RADIUS_KM * np.cos(u) * np.sin(v),
+        EARTH_RADIUS_KM * np.sin(u) * np.sin(v),
+        EARTH_RADIUS_KM * np.cos(v),
+        rstride=4, cstride=4, color="midnightblue", edgecolor="gray",
+        linewidth=0.3, alpha=1.0
+    )
+
+    ax.set_xlim([-limit, limit])
+    ax.set_ylim([-limit, limit])
+    ax.set_zlim([-limit, limit])
+    ax.set_xlabel("X (km)")
+    ax.set_ylabel("Y (km)")
+    ax.set_zlabel("Z (km)")
+
+    # Moving artists, excluded from the background
+    crowded = n_sats >= 50
+    trail_line, = ax.plot([], [], [], color="red", linewidth=0.4 if crowded else 1,
+                          animated=True)
+    satellite_dots, = ax.plot([], [], [], "ro", markersize=1.5 if crowded else 4,
+                              animated=True)
+    clock = ax.text2D(0.02, 0.95, "", transform=ax.transAxes, animated=True)
+
+    fig.canvas.draw()
+    background = fig.canvas.copy_from_bbox(fig.bbox)
+
+    # Preallocated trails: one NaN column after every satellite's samples
+    # breaks the single line between satellites
+    trail = np.full((n_sats, n_steps + 1, 3), np.nan)
+    first = frames[0]
+    lo = 0 if trail_steps is None else max(0, first - trail_steps)
+    trail[:, lo:first + 1] = xyz[:, lo:first + 1]
+    flat = trail.reshape(-1, 3)
+
+    for frame in frames:
+        if frame != first:
+            trail[:, frame] = xyz[:, frame]
+            if trail_steps is not None and frame - trail_steps - 1 >= 0:
+                trail[:, frame - trail_steps - 1] = np.nan
+
+        trail_line.set_data_3d(flat[:, 0], flat[:, 1], flat[:, 2])
+        satellite_dots.set_data_3d(xyz[:, frame, 0], xyz[:, frame, 1], xyz[:, frame, 2])
+        clock.set_text(labels[frame])
+
+        fig.canvas.restore_region(background)
+        ax.draw_artist(trail_line)
+        ax.draw_artist(satellite_dots)
+        ax.draw_artist(clock)
+
+        rgba = np.asarray(fig.canvas.buffer_rgba())
+        Image.fromarray(rgba[..., :3]).save(frame_path(frame_dir, frame), compress_level=1)
+
+    plt.close(fig)
+    return len(frames)
+
+
+# =========================================================
+# STITCHING
+# =========================================================
+def stitch_gif(frame_files, path, fps):
+    # One shared palette keeps colours stable and quantization cheap
+    first = Image.open(frame_files[0]).quantize(colors=256)
+    images = [first] + [Image.open(f).quantize(palette=first) for f in frame_files[1:]]
+    images[0].save(path, save_all=True, append_images=images[1:],
+                   duration=int(1000 / fps), loop=0, optimize=False)
+
+
+def find_ffmpeg():
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        raise RuntimeError("❌ MP4 export needs ffmpeg on PATH (or export a .gif instead)")
+    return ffmpeg
+
+
+def stitch_mp4(frame_dir, path, fps):
+    ffmpeg = find_ffmpeg()
+    subprocess.run(
+        [ffmpeg, "-y", "-loglevel", "error", "-framerate", str(fps),
+         "-i", os.path.join(frame_dir, "frame_%05d.png"),
+         "-pix_fmt", "yuv420p", "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", path],
+        check=True
+    )
+
+
+# =========================================================
+# ENTRY POINT
+# =========================================================
+def export_animation(xyz, valid, labels, path, title="3D Orbit Animation",
+                     trail_steps=None, fps=10, size_px=(1000, 800), workers=1):
+    """Render the (N, T, 3) tracks in km to ``path`` (``.gif`` or ``.mp4``).
+
+    ``valid`` masks out samples SGP4 could not produce; ``labels`` holds one
+    clock string per time step.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in (".gif", ".mp4"):
+        raise ValueError(f"Unsupported animation format: {extension} (use .gif or .mp4)")
+    if extension == ".mp4":
+        find_ffmpeg()  # fail before rendering anything
+
+    xyz = np.where(valid[..., None], xyz, np.nan)
+    n_steps = xyz.shape[1]
+
+    chunks = [c for c in np.array_split(np.arange(n_steps), max(1, workers)) if len(c)]
+
+    with tempfile.TemporaryDirectory() as frame_dir:
+        jobs = [
+            (xyz, labels, chunk.tolist(), frame_dir, title, trail_steps, size_px)
+            for chunk in chunks
+        ]
+        if workers > 1 and len(jobs) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                rendered = sum(pool.map(render_frames, *zip(*jobs)))
+        else:
+            rendered = sum(render_frames(*job) for job in jobs)
+
+        frame_files = [frame_path(frame_dir, frame) for frame in range(n_steps)]
+        if extension == ".gif":
+            stitch_gif(frame_files, path, fps)
+        else:
+            stitch_mp4(frame_dir, path, fps)
+
+    return rendered
@@ -0,0 +1,69 @@
+"""On-demand, chunked export of filtered orbit samples.
+
+The dashboard hands ``st.download_button`` a callable built by
+``export_callback``, so nothing is serialized until someone clicks it.
+The export then writes the frame a chunk of rows at a time into an
+``io.BytesIO``, so the full output never exists as one Python string.
+Streamlit reads whatever the callable returns into bytes and only accepts
+in-memory buffers or plain readers, so the buffer is handed over as is.
+"""
+import gzip
+import io
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from orbit_store import COLUMNS, SCHEMA
+
+# Label -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    "CSV (gzip)": ("csv.gz", "application/gzip"),
+    "CSV": ("csv", "text/csv"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+
+def _write_csv(df, f, chunk_rows):
+    text = io.TextIOWrapper(f, encoding="utf-8", newline="")
+    for start in range(0, max(len(df), 1), chunk_rows):
+        df.iloc[start:start + chunk_rows].to_csv(text, index=False, header=start == 0)
+    text.flush()
+    text.detach()
+
+
+def _write_parquet(df, f, chunk_rows):
+    with pq.ParquetWriter(f, SCHEMA, compression="zstd") as writer:
+        for start in range(0, len(df), chunk_rows):
+            chunk = df.iloc[start:start + chunk_rows]
+            writer.write_table(pa.Table.from_pandas(chunk, schema=SCHEMA, preserve_index=False))
+
+
+def export_orbits(df, fmt, chunk_rows=100_000):
+    """Serialize ``df`` in the ``EXPORT_FORMATS`` format ``fmt``.
+
+    Returns an ``io.BytesIO`` positioned at the start of the output.
+    """
+    df = df[COLUMNS]
+    out = io.BytesIO()
+
+    if fmt == "CSV (gzip)":
+        with gzip.GzipFile(fileobj=out, mode="wb", compresslevel=6) as f:
+            _write_csv(df, f, chunk_rows)
+    elif fmt == "CSV":
+        _write_csv(df, out, chunk_rows)
+    elif fmt == "Parquet":
+        _write_parquet(df, out, chunk_rows)
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+    out.seek(0)
+    return out
+
+
+def export_callback(df, fmt):
+    """Zero-argument callable for ``st.download_button(data=...)``."""
+    return lambda: export_orbits(df, fmt)
+
+
+def export_file_name(stem, fmt):
+    return f"{stem}.{EXPORT_FORMATS[fmt][0]}"
@@ -0,0 +1,124 @@
+"""Precomputed indexes over a loaded orbit dataset.
+
+``OrbitIndex`` keeps the samples sorted by time, so selecting a time window
+is two binary searches and a contiguous slice instead of a full-frame
+``dt.date`` comparison. It also builds a per-satellite offset table over a
+satellite-grouped permutation of the rows: the rows of one satellite are
+``by_satellite[offsets[k]:offsets[k + 1]]``, already in time order, so a
+single-satellite lookup needs no scan and no sort.
+
+One instance is shared by every dashboard session (``st.cache_resource``),
+so it is treated as immutable: the index and column arrays are read-only,
+and ``select`` answers a filter with a slice or an array of row positions
+into the shared frame rather than with a filtered copy. Only ``rows`` and
+``satellite`` build a frame, of the selected rows alone (a copy-on-write
+view for slices), when a view actually needs one.
+
+The dataset is zstd-compressed Parquet and cannot be memory-mapped, so the
+decoded frame is what is held once per process, in place of mapped Arrow
+buffers.
+"""
+import numpy as np
+import pandas as pd
+
+from orbit_store import ALT, NAME, TIME, naive_utc
+
+
+class OrbitIndex:
+    def __init__(self, df):
+        df = df.sort_values(TIME, kind="stable", ignore_index=True)
+        if not isinstance(df[NAME].dtype, pd.CategoricalDtype):
+            df[NAME] = df[NAME].astype("category")
+
+        self.df = df
+
+        # Sorted datetime64 column (naive UTC) for binary search
+        times = df[TIME]
+        if times.dt.tz is not None:
+            times = times.dt.tz_convert("UTC").dt.tz_localize(None)
+        self.times = times.to_numpy()
+
+        # Satellite code -> (start, end) offsets into the grouped permutation
+        codes = df[NAME].cat.codes.to_numpy()
+        self.satellites = list(df[NAME].cat.categories)
+        self.by_satellite = np.argsort(codes, kind="stable")
+        counts = np.bincount(codes, minlength=len(self.satellites))
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+        self._codes = {name: code for code, name in enumerate(self.satellites)}
+
+        self.codes = codes
+        self.altitudes = df[ALT].to_numpy()
+
+        for array in (self.times, self.by_satellite, self.offsets, self.codes,
+                      self.altitudes):
+            array.setflags(write=False)
+
+    def __len__(self):
+        return len(self.df)
+
+    @property
+    def nbytes(self):
+        """Approximate memory held by the frame and its indexes."""
+        return int(self.df.memory_usage(deep=True).sum()) + sum(
+            array.nbytes for array in (self.times, self.by_satellite, self.offsets)
+        )
+
+    def time_slice(self, start=None, end=None):
+        """Row slice covering ``start <= time < end``."""
+        lo, hi = 0, len(self.times)
+        if start is not None:
+            lo = np.searchsorted(self.times, naive_utc(start).to_datetime64(), "left")
+        if end is not None:
+            hi = np.searchsorted(self.times, naive_utc(end).to_datetime64(), "left")
+        return slice(int(lo), int(max(lo, hi)))
+
+    def window(self, start=None, end=None):
+        """Samples in ``[start, end)`` as a view-backed slice of the frame."""
+        return self.df.iloc[self.time_slice(start, end)]
+
+    def select(self, start=None, end=None, alt_range=None, names=None):
+        """Rows matching a time window, altitude range and satellite set.
+
+        Returns a slice when every row of the window matches (no copy is
+        ever made for an unfiltered view), otherwise sorted row positions.
+        Pass the result to ``rows``.
+        """
+        window = self.time_slice(start, end)
+        keep = self.matches(window, alt_range, names)
+
+        if keep is None or keep.all():
+            return window
+        return window.start + np.flatnonzero(keep)
+
+    def matches(self, rows, alt_range=None, names=None):
+        """Mask of ``rows`` (a slice or positions) inside the altitude range
+        and satellite set, or None when neither filter is given."""
+        keep = None
+
+        if alt_range is not None:
+            alt = self.altitudes[rows]
+            keep = (alt >= alt_range[0]) & (alt <= alt_range[1])
+
+        if names:
+            wanted = np.zeros(len(self.satellites), dtype=bool)
+            wanted[[self._codes[name] for name in names if name in self._codes]] = True
+            in_names = wanted[self.codes[rows]]
+            keep = in_names if keep is None else keep & in_names
+
+        return keep
+
+    def rows(self, selection):
+        """Frame for a ``select`` / ``time_slice`` result (a view for slices,
+        a copy of just the selected rows for positions)."""
+        return self.df.iloc[selection]
+
+    def satellite_rows(self, name):
+        """Row positions of one satellite, in time order."""
+        code = self._codes.get(name)
+        if code is None:
+            return self.by_satellite[:0]
+        return self.by_satellite[self.offsets[code]:self.offsets[code + 1]]
+
+    def satellite(self, name):
+        """All samples of one satellite, in time order."""
+        return self.df.take(self.satellite_rows(name))
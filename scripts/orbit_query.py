@@ -0,0 +1,291 @@
+"""One query API over the orbit samples, shared by ``app.py`` and ``dashboard.py``.
+
+An ``OrbitQuery`` describes the samples a view needs: a time window, a
+satellite set, an altitude band, a region (lat/lon box or point + radius)
+and a time resolution. A source answers it with a time-sorted frame:
+
+* ``IndexedSource`` holds the dataset in memory behind its shared indexes
+  (``OrbitIndex``, and a ``SpatialIndex`` built on first use): binary
+  search on time, tile lookups for regions, so a narrow query touches only
+  its own rows.
+* ``DatasetSource`` never loads the dataset whole. Every predicate is
+  pushed into the Parquet scan: the time window prunes day partitions, the
+  satellite set prunes row groups by their name statistics (the generator
+  writes rows in name order), and altitude / latitude / longitude bounds
+  are handed to pyarrow, which skips row groups by their statistics and
+  filters the rest while decoding. Only matching rows are materialized.
+
+``open_source`` keeps datasets up to ``resident_rows`` samples in memory
+and queries larger ones in place.
+"""
+import functools
+import operator
+import os
+import threading
+from dataclasses import dataclass
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from downsampling import bin_downsample
+from orbit_index import OrbitIndex
+from orbit_store import (
+    ALT, COLUMNS, LAT, LON, NAME, TIME,
+    naive_utc, open_orbit_dataset, read_orbit_dataset, read_summary, row_group_name_ranges,
+    time_window_filter,
+)
+from orbit_summary import OrbitSummary
+from spatial_index import SpatialIndex, circle_bounds, within_radius
+
+# Sidebar "Time Resolution" labels -> time-bin width
+RESOLUTIONS = {"All": None, "5 min": "5min", "10 min": "10min", "30 min": "30min"}
+
+# Datasets larger than this are queried on disk instead of being loaded
+RESIDENT_ENV = "ORBIT_RESIDENT_ROWS"
+RESIDENT_ROWS = 20_000_000
+
+# Slack (deg) on the box a radius query is pre-filtered with, so float32
+# rounding never drops a row the exact great-circle test keeps
+_RADIUS_PAD_DEG = 0.01
+
+
+@dataclass(frozen=True)
+class OrbitQuery:
+    """Samples in ``[start, end)`` matching every given predicate.
+
+    ``bbox`` is ``(lat_min, lat_max, lon_min, lon_max)``, crossing the
+    antimeridian when ``lon_min > lon_max``; ``radius`` is ``(lat, lon,
+    km)`` around a point (great circle). ``resolution`` is a time-bin width
+    such as ``"10min"`` (see ``RESOLUTIONS``). Fields are normalized, so
+    equal queries compare and hash equal.
+    """
+    start: pd.Timestamp | None = None
+    end: pd.Timestamp | None = None
+    satellites: tuple[str, ...] = ()
+    alt_range: tuple[float, float] | None = None
+    bbox: tuple[float, float, float, float] | None = None
+    radius: tuple[float, float, float] | None = None
+    resolution: str | None = None
+
+    def __post_init__(self):
+        if self.bbox is not None and self.radius is not None:
+            raise ValueError("An orbit query takes a bbox or a radius, not both")
+
+        normalize = functools.partial(object.__setattr__, self)
+        normalize("start", None if self.start is None else naive_utc(self.start))
+        normalize("end", None if self.end is None else naive_utc(self.end))
+        normalize("satellites", tuple(sorted(set(self.satellites))))
+        for field in ("alt_range", "bbox", "radius"):
+            value = getattr(self, field)
+            normalize(field, None if value is None else tuple(float(v) for v in value))
+
+    @property
+    def region(self):
+        """The bbox or radius, whichever is set (None: anywhere)."""
+        return self.bbox if self.bbox is not None else self.radius
+
+    def key(self):
+        """Plain-value tuple for cache keys."""
+        return (str(self.start), str(self.end), self.satellites, self.alt_range,
+                self.bbox, self.radius, self.resolution)
+
+    def expression(self):
+        """pyarrow filter of the query (a radius as its bounding box), or None."""
+        parts = [time_window_filter(self.start, self.end)]
+
+        if self.satellites:
+            parts.append(ds.field(NAME).isin(list(self.satellites)))
+        if self.alt_range is not None:
+            parts.append(_between(ALT, *self.alt_range))
+
+        if self.bbox is not None:
+            lat_min, lat_max, lon_min, lon_max = self.bbox
+            parts.append(_between(LAT, lat_min, lat_max))
+            if lon_min <= lon_max:
+                parts.append(_between(LON, lon_min, lon_max))
+            else:
+                parts.append((ds.field(LON) >= _f32(lon_min)) | (ds.field(LON) <= _f32(lon_max)))
+
+        if self.radius is not None:
+            lat_lo, lat_hi, lon_ranges = circle_bounds(*self.radius)
+            parts.append(_between(LAT, lat_lo - _RADIUS_PAD_DEG, lat_hi + _RADIUS_PAD_DEG))
+            parts.append(functools.reduce(operator.or_, [
+                _between(LON, lo - _RADIUS_PAD_DEG, hi + _RADIUS_PAD_DEG)
+                for lo, hi in lon_ranges
+            ]))
+
+        parts = [part for part in parts if part is not None]
+        return functools.reduce(operator.and_, parts) if parts else None
+
+    def downsample(self, samples):
+        """Time-sorted ``samples`` at the query's resolution."""
+        if self.resolution is None:
+            return samples
+        return bin_downsample(samples, self.resolution)
+
+
+# =========================================================
+# SOURCES
+# =========================================================
+class IndexedSource:
+    """Answers queries from a resident ``OrbitIndex``, shared read-only."""
+
+    kind = "index"
+
+    def __init__(self, orbit_index, summary=None):
+        self.orbit_index = orbit_index
+        self.summary = summary
+        self._spatial_index = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.orbit_index)
+
+    def spatial_index(self):
+        """Geo-tiled index for region queries, built once on first use."""
+        with self._lock:
+            if self._spatial_index is None:
+                self._spatial_index = SpatialIndex(self.orbit_index)
+            return self._spatial_index
+
+    @property
+    def satellites(self):
+        return sorted(self.orbit_index.satellites)
+
+    def time_range(self):
+        """First and last sample times (naive UTC)."""
+        times = self.orbit_index.times
+        return pd.Timestamp(times[0]), pd.Timestamp(times[-1])
+
+    def altitude_range(self):
+        altitudes = self.orbit_index.altitudes
+        return float(altitudes.min()), float(altitudes.max())
+
+    def samples(self, query):
+        """Frame of the query: a view or row positions of the shared frame."""
+        filters = (query.start, query.end, query.alt_range, query.satellites)
+        if query.bbox is not None:
+            rows = self.spatial_index().bbox(*query.bbox, *filters)
+        elif query.radius is not None:
+            rows = self.spatial_index().radius(*query.radius, *filters)
+        else:
+            rows = self.orbit_index.select(*filters)
+        return query.downsample(self.orbit_index.rows(rows))
+
+    def satellite(self, name):
+        """All samples of one satellite, in time order."""
+        return self.orbit_index.satellite(name)
+
+
+class DatasetSource:
+    """Answers queries straight from a Parquet orbit dataset on disk."""
+
+    kind = "pushdown"
+
+    def __init__(self, dataset_dir, summary=None):
+        self.dataset = open_orbit_dataset(dataset_dir)
+        self.summary = summary
+        self.rows = self.dataset.count_rows()
+
+        # Name range of every row group, from the file footers only
+        self._name_ranges = {
+            fragment.path: row_group_name_ranges(fragment.metadata)
+            for fragment in self.dataset.get_fragments()
+        }
+
+        if summary is None:
+            # Sidebar bounds need one pass over three columns, once per process
+            table = self.dataset.to_table(columns=[NAME, TIME, ALT])
+            self._satellites = sorted(pc.unique(table[NAME].combine_chunks()
+                                                .dictionary_decode()).to_pylist())
+            times = pc.min_max(table[TIME])
+            altitudes = pc.min_max(table[ALT])
+            self._time_range = tuple(naive_utc(times[k].as_py()) for k in ("min", "max"))
+            self._altitude_range = tuple(float(altitudes[k].as_py()) for k in ("min", "max"))
+        else:
+            self._satellites = sorted(summary.df[NAME].cat.categories)
+            self._time_range = (pd.Timestamp(summary.hours[0]), pd.Timestamp(summary.hours[-1]))
+            self._altitude_range = (float(summary.alt_min.min()), float(summary.alt_max.max()))
+
+    def __len__(self):
+        return self.rows
+
+    @property
+    def satellites(self):
+        return self._satellites
+
+    def time_range(self):
+        """First and last sample times (naive UTC; hour-aligned from summaries)."""
+        return self._time_range
+
+    def altitude_range(self):
+        return self._altitude_range
+
+    def _fragments(self, query, expression):
+        """Day files the window overlaps, cut to row groups that may hold
+        one of the query's satellites."""
+        for fragment in self.dataset.get_fragments(filter=expression):
+            if query.satellites:
+                ranges = self._name_ranges[fragment.path]
+                keep = [
+                    i for i, (lo, hi) in enumerate(ranges)
+                    if lo is None or any(lo <= name <= hi for name in query.satellites)
+                ]
+                fragment = fragment.subset(row_group_ids=keep)
+            yield fragment
+
+    def samples(self, query):
+        """Frame of the query; rows outside it are never decoded into memory."""
+        expression = query.expression()
+        scan = ds.FileSystemDataset(
+            list(self._fragments(query, expression)),
+            self.dataset.schema, self.dataset.format, self.dataset.filesystem
+        )
+        samples = scan.to_table(columns=COLUMNS, filter=expression).to_pandas()
+        samples = samples.sort_values(TIME, kind="stable", ignore_index=True)
+
+        if query.radius is not None:
+            # Pushed down as a box: the exact disc test runs on its rows
+            inside = within_radius(samples[LAT].to_numpy(), samples[LON].to_numpy(),
+                                   *query.radius)
+            samples = samples[inside].reset_index(drop=True)
+        return query.downsample(samples)
+
+    def satellite(self, name):
+        """All samples of one satellite, in time order."""
+        return self.samples(OrbitQuery(satellites=(name,)))
+
+
+def open_source(dataset_dir, resident_rows=None):
+    """Query source for a dataset directory.
+
+    Datasets up to ``resident_rows`` samples (``ORBIT_RESIDENT_ROWS``,
+    default ``RESIDENT_ROWS``) are loaded once into an ``IndexedSource``;
+    larger ones get a ``DatasetSource``. The per-hour summaries are
+    attached when they cover every sample.
+    """
+    if resident_rows is None:
+        resident_rows = int(os.environ.get(RESIDENT_ENV) or RESIDENT_ROWS)
+
+    rows = open_orbit_dataset(dataset_dir).count_rows()
+
+    # Ignored if missing or not covering every sample (e.g. an older run)
+    summary = read_summary(dataset_dir)
+    summary = OrbitSummary(summary) if summary is not None else None
+    if summary is not None and summary.samples != rows:
+        summary = None
+
+    if rows <= resident_rows:
+        return IndexedSource(OrbitIndex(read_orbit_dataset(dataset_dir)), summary)
+    return DatasetSource(dataset_dir, summary)
+
+
+def _f32(value):
+    # Same float32 comparison as the resident path's numpy arrays
+    return pa.scalar(value, type=pa.float32())
+
+
+def _between(column, lo, hi):
+    return (ds.field(column) >= _f32(lo)) & (ds.field(column) <= _f32(hi))
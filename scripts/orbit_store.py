@@ -0,0 +1,378 @@
+"""Columnar on-disk format for the propagated orbit samples.
+
+The dataset is a directory of Parquet files, hive-partitioned by UTC day::
+
+    all_satellite_orbits/
+        date=2026-01-03/shard_0000.parquet
+        date=2026-01-03/shard_0001.parquet
+        date=2026-01-04/...
+
+Columns are typed (dictionary-encoded satellite name, UTC timestamp,
+float32 coordinates) and zstd-compressed, so loading needs no text parsing
+and a time-window read only opens the day partitions it overlaps.
+
+Next to the samples, every writer also emits a per-satellite, per-hour
+summary table (``_summary/<file_stem>.parquet``: sample count, altitude
+sum/min/max, latitude/longitude extents) that the dashboard answers its
+KPIs from.
+
+Samples are streamed: the generator hands over one propagated block at a
+time and the writer flushes a fixed-size chunk of rows into the day
+partitions whenever its buffer fills up, so memory depends on
+``chunk_rows`` and not on the catalog size.
+
+Rows arrive in (satellite name, time) order and are cut into row groups of
+at most ``row_group_rows``, so every row group covers a narrow range of
+names and its Parquet statistics let a query for a few satellites skip the
+rest of the file (see ``orbit_query``).
+"""
+import glob
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+NAME = "Satellite Name"
+TIME = "Time (UTC)"
+LAT = "Latitude"
+LON = "Longitude"
+ALT = "Altitude (m)"
+
+COLUMNS = [NAME, TIME, LAT, LON, ALT]
+
+TIME_TYPE = pa.timestamp("ms", tz="UTC")
+
+SCHEMA = pa.schema([
+    (NAME, pa.dictionary(pa.int32(), pa.string())),
+    (TIME, TIME_TYPE),
+    (LAT, pa.float32()),
+    (LON, pa.float32()),
+    (ALT, pa.float32()),
+])
+
+# Summary table columns
+HOUR = "Hour (UTC)"
+COUNT = "Samples"
+ALT_SUM = "Altitude Sum (m)"
+ALT_MIN = "Altitude Min (m)"
+ALT_MAX = "Altitude Max (m)"
+LAT_MIN = "Latitude Min"
+LAT_MAX = "Latitude Max"
+LON_MIN = "Longitude Min"
+LON_MAX = "Longitude Max"
+
+SUMMARY_SCHEMA = pa.schema([
+    (NAME, pa.dictionary(pa.int32(), pa.string())),
+    (HOUR, TIME_TYPE),
+    (COUNT, pa.int64()),
+    (ALT_SUM, pa.float64()),
+    (ALT_MIN, pa.float32()),
+    (ALT_MAX, pa.float32()),
+    (LAT_MIN, pa.float32()),
+    (LAT_MAX, pa.float32()),
+    (LON_MIN, pa.float32()),
+    (LON_MAX, pa.float32()),
+])
+
+# How partial summaries of the same (satellite, hour) are merged
+_SUMMARY_MERGE = {
+    COUNT: "sum", ALT_SUM: "sum", ALT_MIN: "min", ALT_MAX: "max",
+    LAT_MIN: "min", LAT_MAX: "max", LON_MIN: "min", LON_MAX: "max",
+}
+
+# Rows per Parquet row group (the granularity of statistics-based skipping)
+ROW_GROUP_ROWS = 16_384
+
+PARTITIONING = ds.partitioning(pa.schema([("date", pa.string())]), flavor="hive")
+
+# Leading underscore: ignored by pyarrow's dataset discovery
+MANIFEST_NAME = "_manifest.json"
+SUMMARY_DIR = "_summary"
+
+
+# =========================================================
+# PER-SATELLITE, PER-HOUR SUMMARIES
+# =========================================================
+def summarize_rows(names, time_values, lat, lon, alt):
+    """Summary rows for a batch of samples (one per satellite and hour)."""
+    frame = pd.DataFrame({
+        NAME: names,
+        HOUR: time_values.astype("datetime64[h]").astype("datetime64[ms]"),
+        LAT: lat,
+        LON: lon,
+        ALT: alt,
+        ALT_SUM: alt.astype(np.float64),
+    })
+    return frame.groupby([NAME, HOUR], sort=False).agg(**{
+        COUNT: (ALT, "size"),
+        ALT_SUM: (ALT_SUM, "sum"),
+        ALT_MIN: (ALT, "min"),
+        ALT_MAX: (ALT, "max"),
+        LAT_MIN: (LAT, "min"),
+        LAT_MAX: (LAT, "max"),
+        LON_MIN: (LON, "min"),
+        LON_MAX: (LON, "max"),
+    }).reset_index()
+
+
+def merge_summaries(parts):
+    """Combine partial summaries of overlapping (satellite, hour) groups."""
+    frame = pd.concat(parts, ignore_index=True)
+    return frame.groupby([NAME, HOUR], sort=False).agg(_SUMMARY_MERGE).reset_index()
+
+
+# =========================================================
+# WRITING
+# =========================================================
+class OrbitDatasetWriter:
+    """Streams orbit samples into the day partitions of a dataset directory.
+
+    Every writer owns one file per partition (``<file_stem>.parquet``), so
+    several shard workers can write into the same dataset concurrently.
+    """
+
+    def __init__(self, dataset_dir, file_stem, chunk_rows=500_000, compression="zstd",
+                 row_group_rows=ROW_GROUP_ROWS):
+        self.dataset_dir = dataset_dir
+        self.file_stem = file_stem
+        self.chunk_rows = chunk_rows
+        self.row_group_rows = row_group_rows
+        self.compression = compression
+        self.rows_written = 0
+        self.paths = []
+        self._writers = {}
+        self._buffer = []
+        self._buffered = 0
+        self._summaries = []
+
+    def write_block(self, names, time_values, lat, lon, alt, valid):
+        """Buffer one (satellites x times) block, keeping only valid samples."""
+        sat_idx, time_idx = np.nonzero(valid)
+        self.write_rows(
+            names[sat_idx], time_values[time_idx], lat[valid], lon[valid], alt[valid]
+        )
+
+    def write_rows(self, names, time_values, lat, lon, alt):
+        """Buffer flat per-sample columns."""
+        if not len(names):
+            return
+
+        self._buffer.append((
+            names,
+            time_values,
+            lat.astype(np.float32),
+            lon.astype(np.float32),
+            alt.astype(np.float32),
+        ))
+        self._buffered += len(names)
+
+        if self._buffered >= self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+
+        names, times, lat, lon, alt = (np.concatenate(parts) for parts in zip(*self._buffer))
+        self._buffer = []
+        self._buffered = 0
+
+        self._summaries.append(summarize_rows(names, times, lat, lon, alt))
+
+        days = times.astype("datetime64[D]")
+        for day in np.unique(days):
+            in_day = days == day
+            table = pa.table(
+                [
+                    pa.array(names[in_day], type=pa.string()).dictionary_encode(),
+                    pa.array(times[in_day].astype("datetime64[ms]"), type=TIME_TYPE),
+                    pa.array(lat[in_day]),
+                    pa.array(lon[in_day]),
+                    pa.array(alt[in_day]),
+                ],
+                schema=SCHEMA,
+            )
+            self._partition_writer(str(day)).write_table(table, row_group_size=self.row_group_rows)
+            self.rows_written += table.num_rows
+
+    def _partition_writer(self, day):
+        writer = self._writers.get(day)
+        if writer is None:
+            partition_dir = os.path.join(self.dataset_dir, f"date={day}")
+            os.makedirs(partition_dir, exist_ok=True)
+            path = os.path.join(partition_dir, f"{self.file_stem}.parquet")
+            writer = pq.ParquetWriter(path, SCHEMA, compression=self.compression)
+            self._writers[day] = writer
+            self.paths.append(path)
+        return writer
+
+    def close(self):
+        self.flush()
+        for writer in self._writers.values():
+            writer.close()
+        self._writers = {}
+
+        if self._summaries:
+            self._write_summary(merge_summaries(self._summaries))
+            self._summaries = []
+
+    def _write_summary(self, summary):
+        path = summary_file(self.dataset_dir, self.file_stem)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        summary[NAME] = summary[NAME].astype(str)
+        summary[HOUR] = summary[HOUR].dt.tz_localize("UTC")
+        table = pa.Table.from_pandas(summary, schema=SUMMARY_SCHEMA, preserve_index=False)
+        pq.write_table(table, path, compression=self.compression)
+        self.paths.append(path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# =========================================================
+# SHARD FILES & MANIFEST
+# =========================================================
+def shard_files(dataset_dir, file_stem):
+    """Every day-partition file written by one shard."""
+    return sorted(glob.glob(os.path.join(dataset_dir, "date=*", f"{file_stem}.parquet")))
+
+
+def summary_file(dataset_dir, file_stem):
+    return os.path.join(dataset_dir, SUMMARY_DIR, f"{file_stem}.parquet")
+
+
+def row_group_name_ranges(metadata):
+    """``(min, max)`` satellite name of every row group ((None, None) if unknown)."""
+    column = metadata.schema.names.index(NAME)
+    ranges = []
+    for i in range(metadata.num_row_groups):
+        stats = metadata.row_group(i).column(column).statistics
+        if stats is not None and stats.has_min_max:
+            ranges.append((stats.min, stats.max))
+        else:
+            ranges.append((None, None))
+    return ranges
+
+
+class ShardReader:
+    """Reads the stored rows of chosen satellites back from one shard.
+
+    Only the row groups whose name statistics overlap the requested names
+    are decoded, so reading the shard back a few satellites at a time
+    holds one batch in memory, never the whole shard.
+    """
+
+    def __init__(self, dataset_dir, file_stem):
+        self.files = [pq.ParquetFile(path) for path in shard_files(dataset_dir, file_stem)]
+        self.ranges = [row_group_name_ranges(f.metadata) for f in self.files]
+
+    def read(self, names):
+        """Rows of ``names`` (one DataFrame over every day file, file order)."""
+        if not len(names):
+            return SCHEMA.empty_table().to_pandas()
+
+        lo, hi = min(names), max(names)
+        tables = []
+        for f, ranges in zip(self.files, self.ranges):
+            ids = [
+                i for i, (first, last) in enumerate(ranges)
+                if first is None or (first <= hi and last >= lo)
+            ]
+            if ids:
+                tables.append(f.read_row_groups(ids))
+        if not tables:
+            return SCHEMA.empty_table().to_pandas()
+
+        rows = pa.concat_tables(tables, promote_options="permissive").to_pandas()
+        return rows[rows[NAME].isin(names)]
+
+    def close(self):
+        for f in self.files:
+            f.close()
+        self.files = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_manifest(dataset_dir):
+    path = os.path.join(dataset_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def write_manifest(dataset_dir, manifest):
+    path = os.path.join(dataset_dir, MANIFEST_NAME)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, path)
+
+
+# =========================================================
+# READING
+# =========================================================
+def open_orbit_dataset(dataset_dir):
+    if not os.path.isdir(dataset_dir):
+        raise FileNotFoundError(
+            f"❌ Orbit dataset not found: {dataset_dir}\n\n"
+            "Run scripts/GenerateAllOrbitsFromMetadata.py to generate it."
+        )
+    return ds.dataset(dataset_dir, format="parquet", partitioning=PARTITIONING)
+
+
+def naive_utc(value):
+    """``value`` as a tz-naive UTC ``Timestamp`` (naive input is taken as UTC)."""
+    value = pd.Timestamp(value)
+    if value.tz is not None:
+        value = value.tz_convert("UTC").tz_localize(None)
+    return value
+
+
+def time_window_filter(start=None, end=None):
+    """Dataset filter for ``start <= time < end``.
+
+    The matching predicate on the ``date`` partition key lets pyarrow skip
+    whole day directories before any file is opened.
+    """
+    expr = None
+    if start is not None:
+        start = naive_utc(start)
+        expr = (ds.field("date") >= start.strftime("%Y-%m-%d")) & (
+            ds.field(TIME) >= pa.scalar(start, type=TIME_TYPE)
+        )
+    if end is not None:
+        end = naive_utc(end)
+        end_expr = (ds.field("date") <= end.strftime("%Y-%m-%d")) & (
+            ds.field(TIME) < pa.scalar(end, type=TIME_TYPE)
+        )
+        expr = end_expr if expr is None else expr & end_expr
+    return expr
+
+
+def read_orbit_dataset(dataset_dir, start=None, end=None, columns=COLUMNS):
+    """Load the samples of ``[start, end)`` (everything by default) as a DataFrame."""
+    dataset = open_orbit_dataset(dataset_dir)
+    table = dataset.to_table(columns=columns, filter=time_window_filter(start, end))
+    return table.to_pandas()
+
+
+def read_summary(dataset_dir):
+    """All per-satellite, per-hour summary rows, or None if none were written."""
+    paths = sorted(glob.glob(os.path.join(dataset_dir, SUMMARY_DIR, "*.parquet")))
+    if not paths:
+        return None
+    tables = [pq.read_table(path, schema=SUMMARY_SCHEMA) for path in paths]
+    return pa.concat_tables(tables, promote_options="permissive").to_pandas()
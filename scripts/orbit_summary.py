@@ -0,0 +1,81 @@
+"""Overview KPIs answered from the per-satellite, per-hour summary table.
+
+The generator writes one summary row per satellite and UTC hour (see
+``orbit_store.summarize_rows``). When a dashboard filter lines up with
+those groups, the KPIs are sums over at most satellites x hours rows
+instead of a pass over every sample:
+
+* the time window starts and ends on whole hours,
+* every group in the window lies either entirely inside or entirely
+  outside the altitude range (checked with its altitude min/max),
+* no time downsampling is applied (the caller's responsibility).
+
+Otherwise ``kpis`` returns None and the caller falls back to
+``sample_kpis`` on the filtered samples.
+"""
+import numpy as np
+import pandas as pd
+
+from orbit_store import ALT, ALT_MAX, ALT_MIN, ALT_SUM, COUNT, HOUR, NAME, naive_utc
+
+
+class OrbitSummary:
+    def __init__(self, df):
+        df = df.sort_values(HOUR, kind="stable", ignore_index=True)
+        if not isinstance(df[NAME].dtype, pd.CategoricalDtype):
+            df[NAME] = df[NAME].astype("category")
+        self.df = df
+
+        self.hours = df[HOUR].dt.tz_convert("UTC").dt.tz_localize(None).to_numpy()
+        self.codes = df[NAME].cat.codes.to_numpy()
+        self.counts = df[COUNT].to_numpy()
+        self.alt_sum = df[ALT_SUM].to_numpy()
+        self.alt_min = df[ALT_MIN].to_numpy()
+        self.alt_max = df[ALT_MAX].to_numpy()
+        self._codes = {name: code for code, name in enumerate(df[NAME].cat.categories)}
+
+    @property
+    def samples(self):
+        return int(self.counts.sum())
+
+    def kpis(self, start, end, alt_range=None, names=None):
+        """KPIs for ``[start, end)``, or None if the filter is not aligned."""
+        start = naive_utc(start)
+        end = naive_utc(end)
+        if start != start.floor("h") or end != end.floor("h"):
+            return None
+
+        lo = np.searchsorted(self.hours, start.to_datetime64(), "left")
+        hi = np.searchsorted(self.hours, end.to_datetime64(), "left")
+        window = slice(int(lo), int(max(lo, hi)))
+        keep = np.ones(window.stop - window.start, dtype=bool)
+
+        if names:
+            wanted = np.zeros(len(self._codes), dtype=bool)
+            wanted[[self._codes[name] for name in names if name in self._codes]] = True
+            keep &= wanted[self.codes[window]]
+
+        if alt_range is not None:
+            alt_min = self.alt_min[window]
+            alt_max = self.alt_max[window]
+            inside = (alt_min >= alt_range[0]) & (alt_max <= alt_range[1])
+            outside = (alt_max < alt_range[0]) | (alt_min > alt_range[1])
+            if np.any(keep & ~inside & ~outside):
+                return None
+            keep &= inside
+
+        samples = int(self.counts[window][keep].sum())
+        return {
+            "satellites": int(np.unique(self.codes[window][keep]).size),
+            "samples": samples,
+            "mean_altitude": self.alt_sum[window][keep].sum() / samples if samples else np.nan,
+        }
+
+
+def sample_kpis(df):
+    """The same KPIs computed from raw samples."""
+    return {
+        "satellites": df[NAME].nunique(),
+        "samples": len(df),
+        "mean_altitude": df[ALT].mean(),
+    }
@@ -0,0 +1,431 @@
+"""Ground-station pass prediction for whole satellite catalogs.
+
+Running skyfield's ``find_events`` once per satellite and station repeats
+the propagation for every pair and is far too slow for the full catalog
+against dozens of stations. Instead, passes are found in two stages:
+
+* coarse: the catalog is propagated in satellite blocks over a regular
+  grid (one ``SatrecArray`` call per block) and the elevation of every
+  satellite above every station is evaluated with a couple of matrix
+  products per station. Every local maximum of the sampled elevation that
+  is above the mask, or within ``graze_deg`` of it, is a pass candidate;
+  a sampled pass is bracketed by its last sample below the mask on either
+  side.
+* refine: culminations (sign change of the elevation rate), then rise and
+  set (mask crossings) are bisected for all candidates of a block at once.
+  Each bisection step re-propagates only the candidate satellites, one
+  ``sgp4_array`` call per satellite, and rotates TEME into ITRS with the
+  grid rotation of the nearest sample advanced by the Earth rotation
+  angle.
+
+Passes already in progress at the start of the window (or still in
+progress at its end) have no rise (set) time.
+"""
+import argparse
+import os
+from datetime import datetime, timezone
+
+from skyfield.api import load
+import numpy as np
+import pandas as pd
+
+from catalog import CACHE_DIR, load_catalog
+from propagation import (
+    DAY_S,
+    GroupedPropagator,
+    build_time_grid,
+    geodetic_to_itrs,
+    grid_datetimes,
+    max_radius_km,
+    propagate_teme,
+    sgp4_dates,
+    teme_to_itrs,
+    teme_to_itrs_matrices,
+    valid_states,
+)
+
+METADATA_PATH = "../data/starlink_metadata.csv"
+OUTPUT_PATH = "../data/ground_station_passes.csv"
+
+# Earth rotation rate (IERS), rad/s
+EARTH_ROTATION_RAD_S = 7.292115146706979e-5
+
+STATION_COLUMNS = ["Station", "Latitude", "Longitude", "Elevation (m)"]
+
+# A few well-known ground stations; any table with STATION_COLUMNS works
+STATIONS = pd.DataFrame(
+    [
+        ("Svalbard", 78.2297, 15.4078, 500.0),
+        ("Kiruna", 67.8571, 20.9644, 390.0),
+        ("Fairbanks", 64.8594, -147.8497, 200.0),
+        ("Wallops", 37.9402, -75.4664, 10.0),
+        ("Hawaii", 19.0139, -155.6633, 370.0),
+        ("Bengaluru", 13.0344, 77.5116, 920.0),
+        ("Hartebeesthoek", -25.8872, 27.7075, 1540.0),
+        ("Santiago", -33.1480, -70.6680, 720.0),
+        ("Canberra", -35.4014, 148.9817, 680.0),
+        ("McMurdo", -77.8419, 166.6863, 10.0),
+    ],
+    columns=STATION_COLUMNS,
+)
+
+COLUMNS = [
+    "Station",
+    "Satellite Name",
+    "Rise (UTC)",
+    "Culmination (UTC)",
+    "Set (UTC)",
+    "Max Elevation (deg)",
+    "Culmination Azimuth (deg)",
+    "Duration (s)",
+]
+
+
+# =========================================================
+# STATIONS
+# =========================================================
+def read_stations(csv_path):
+    """Station table from a CSV with ``STATION_COLUMNS``."""
+    stations = pd.read_csv(csv_path)
+    missing = set(STATION_COLUMNS) - set(stations.columns)
+    if missing:
+        raise ValueError(f"❌ Station file is missing columns: {sorted(missing)}")
+    return stations[STATION_COLUMNS].reset_index(drop=True)
+
+
+def station_frames(stations):
+    """ITRS positions (S, 3) in km and local (east, north, up) axes (S, 3, 3)."""
+    lat = np.radians(stations["Latitude"].to_numpy(dtype=np.float64))
+    lon = np.radians(stations["Longitude"].to_numpy(dtype=np.float64))
+
+    position = geodetic_to_itrs(
+        stations["Latitude"].to_numpy(dtype=np.float64),
+        stations["Longitude"].to_numpy(dtype=np.float64),
+        stations["Elevation (m)"].to_numpy(dtype=np.float64),
+    )
+
+    zero = np.zeros_like(lat)
+    east = np.stack([-np.sin(lon), np.cos(lon), zero], axis=-1)
+    north = np.stack([-np.sin(lat) * np.cos(lon), -np.sin(lat) * np.sin(lon), np.cos(lat)],
+                     axis=-1)
+    up = np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1)
+    return position, np.stack([east, north, up], axis=1)
+
+
+# =========================================================
+# COARSE PASS (sampled elevations, whole blocks)
+# =========================================================
+def sampled_sin_elevation(r_itrs, valid, position, up):
+    """Sine of the elevation of (n, T, 3) ITRS positions above one station.
+
+    Uses ``|r - p|^2 = |r|^2 - 2 r.p + |p|^2`` so each station costs one
+    (n*T, 3) x (3, 2) product. Invalid samples read as -2 (never visible).
+    """
+    flat = r_itrs.reshape(-1, 3)
+    dots = flat @ np.stack([up, position], axis=1)
+    r2 = np.einsum("ij,ij->i", flat, flat)
+    distance = np.sqrt(np.maximum(r2 - 2.0 * dots[:, 1] + position @ position, 1e-12))
+    sin_el = ((dots[:, 0] - position @ up) / distance).reshape(valid.shape)
+    return np.where(valid, sin_el, -2.0)
+
+
+def pass_candidates(g, graze):
+    """Pass candidates in ``g`` = sampled sin(elevation) - sin(mask), (n, T).
+
+    Returns ``(row, peak, rise_lo, set_hi)`` sample indices: the highest
+    local maximum of every run of samples above the mask, plus every
+    isolated maximum within ``graze`` below it (a short pass may peak
+    between samples). ``rise_lo``/``set_hi`` are the nearest samples below
+    the mask before/after the peak, -1/T when the window starts/ends first.
+    """
+    n, T = g.shape
+    padded = np.pad(g, ((0, 0), (1, 1)), constant_values=-np.inf)
+    peaks = (padded[:, 1:-1] >= padded[:, :-2]) & (padded[:, 1:-1] > padded[:, 2:])
+    rows, peak = np.nonzero(peaks & (g >= graze))
+
+    below = g < 0.0
+    column = np.arange(T)
+    last_below = np.maximum.accumulate(np.where(below, column, -1), axis=1)
+    next_below = np.minimum.accumulate(np.where(below, column, T)[:, ::-1], axis=1)[:, ::-1]
+
+    above = ~below[rows, peak]
+    rise_lo = np.where(above, last_below[rows, peak], peak - 1)
+    set_hi = np.where(above, next_below[rows, peak], peak + 1)
+
+    # One candidate per run: keep its highest sample
+    order = np.lexsort((-g[rows, peak], rise_lo, rows))
+    rows, peak, rise_lo, set_hi = rows[order], peak[order], rise_lo[order], set_hi[order]
+    first = np.ones(len(rows), dtype=bool)
+    first[1:] = (rows[1:] != rows[:-1]) | (rise_lo[1:] != rise_lo[:-1])
+    return rows[first], peak[first], rise_lo[first], set_hi[first]
+
+
+# =========================================================
+# REFINEMENT (bisection over all candidates of a block)
+# =========================================================
+class _LookAngles:
+    """Elevation/azimuth of satellite ``sat_idx[k]`` from station ``station_idx[k]``.
+
+    Times are day offsets from the grid's first Julian date. The TEME ->
+    ITRS rotation of the nearest grid sample is advanced by the Earth
+    rotation angle, which is exact to well below an arcsecond over a step.
+    """
+
+    def __init__(self, satrec_list, sat_idx, station_idx, grid, position, enu):
+        self.propagate = GroupedPropagator(satrec_list, sat_idx)
+        self.jd0, self.offsets, self.rotations = grid
+        self.position = position[station_idx]
+        self.enu = enu[station_idx]
+
+    def local(self, offsets):
+        """Station-to-satellite vector and its rate in (east, north, up)."""
+        r_teme, v_teme = self.propagate(self.jd0, offsets)
+        nearest = np.clip(np.searchsorted(self.offsets, offsets), 1, len(self.offsets) - 1)
+        nearest -= offsets - self.offsets[nearest - 1] < self.offsets[nearest] - offsets
+        rotation = self.rotations[nearest]
+
+        angle = EARTH_ROTATION_RAD_S * (offsets - self.offsets[nearest]) * DAY_S
+        cos_a, sin_a = np.cos(angle), np.sin(angle)
+
+        def to_itrs(vectors):
+            x, y, z = np.einsum("kij,kj->ik", rotation, vectors)
+            return np.stack([cos_a * x + sin_a * y, cos_a * y - sin_a * x, z], axis=-1)
+
+        r = to_itrs(r_teme)
+        # Earth-fixed velocity: inertial velocity minus omega x r
+        v = to_itrs(v_teme) + EARTH_ROTATION_RAD_S * np.stack(
+            [r[:, 1], -r[:, 0], np.zeros(len(r))], axis=-1
+        )
+
+        return (np.einsum("kij,kj->ki", self.enu, r - self.position),
+                np.einsum("kij,kj->ki", self.enu, v))
+
+    def sin_elevation(self, offsets):
+        local, _ = self.local(offsets)
+        return local[:, 2] / np.linalg.norm(local, axis=1)
+
+    def climbing(self, offsets):
+        """Whether the elevation is increasing: d/dt (up / |d|) > 0."""
+        local, rate = self.local(offsets)
+        return rate[:, 2] * (local * local).sum(axis=1) > local[:, 2] * (local * rate).sum(axis=1)
+
+    def elevation_azimuth(self, offsets):
+        east, north, up = self.local(offsets)[0].T
+        elevation = np.degrees(np.arctan2(up, np.hypot(east, north)))
+        return elevation, np.degrees(np.arctan2(east, north)) % 360.0
+
+
+def refine_culminations(look, lo, hi, tolerance):
+    """Bisect the sign change of the elevation rate inside [lo, hi]."""
+    while len(lo) and (hi - lo).max() > tolerance:
+        mid = 0.5 * (lo + hi)
+        climbing = look.climbing(mid)
+        lo = np.where(climbing, mid, lo)
+        hi = np.where(climbing, hi, mid)
+    return 0.5 * (lo + hi)
+
+
+def refine_crossings(look, lo, hi, rising, sin_mask, tolerance):
+    """Bisect mask crossings; ``rising`` marks rises (below at ``lo``)."""
+    while len(lo) and (hi - lo).max() > tolerance:
+        mid = 0.5 * (lo + hi)
+        visible = look.sin_elevation(mid) >= sin_mask
+        move_hi = visible == rising
+        lo = np.where(move_hi, lo, mid)
+        hi = np.where(move_hi, mid, hi)
+    return 0.5 * (lo + hi)
+
+
+def refine_block(satrec_list, sat_idx, station_idx, peak, rise_lo, set_hi, grid,
+                 position, enu, sin_mask, tolerance):
+    """Exact culmination, rise and set of one block's candidates (day offsets)."""
+    offsets = grid[1]
+    T = len(offsets)
+    look = _LookAngles(satrec_list, sat_idx, station_idx, grid, position, enu)
+
+    culmination = refine_culminations(
+        look, offsets[np.maximum(peak - 1, 0)], offsets[np.minimum(peak + 1, T - 1)], tolerance
+    )
+    max_elevation, azimuth = look.elevation_azimuth(culmination)
+    visible = np.sin(np.radians(max_elevation)) >= sin_mask
+
+    # Rises and sets bisected together; NaN where the window cuts the pass
+    has_rise = visible & (rise_lo >= 0)
+    has_set = visible & (set_hi < T)
+    rise_idx, set_idx = np.flatnonzero(has_rise), np.flatnonzero(has_set)
+    both = np.concatenate([rise_idx, set_idx])
+    crossing_look = _LookAngles(satrec_list, sat_idx[both], station_idx[both], grid,
+                                position, enu)
+    crossings = refine_crossings(
+        crossing_look,
+        np.concatenate([offsets[rise_lo[rise_idx]], culmination[set_idx]]),
+        np.concatenate([culmination[rise_idx], offsets[set_hi[set_idx]]]),
+        np.arange(len(both)) < len(rise_idx),
+        sin_mask,
+        tolerance,
+    )
+
+    rise = np.full(len(peak), np.nan)
+    set_ = np.full(len(peak), np.nan)
+    rise[rise_idx] = crossings[:len(rise_idx)]
+    set_[set_idx] = crossings[len(rise_idx):]
+    return visible, rise, culmination, set_, max_elevation, azimuth
+
+
+# =========================================================
+# ENTRY POINT
+# =========================================================
+def predict_passes(catalog, stations, times, min_elevation_deg=10.0, graze_deg=2.0,
+                   tolerance_s=1.0, chunk_rows=2_000_000):
+    """Every pass of every ``catalog`` satellite over every station in ``times``.
+
+    ``times`` is a regular skyfield grid (1-minute steps suit LEO);
+    ``stations`` is a table with ``STATION_COLUMNS``. Returns a DataFrame
+    with ``COLUMNS``, sorted by culmination time.
+    """
+    satrec_list = catalog.satrecs()
+    position, enu = station_frames(stations)
+    station_names = stations["Station"].to_numpy(dtype=object)
+
+    jd, fraction = sgp4_dates(times)
+    offsets = (jd - jd[0]) + fraction
+    grid = (jd[0], offsets, teme_to_itrs_matrices(times))
+    T = len(offsets)
+
+    sin_mask = np.sin(np.radians(min_elevation_deg))
+    graze = np.sin(np.radians(min_elevation_deg - graze_deg)) - sin_mask
+    tolerance = tolerance_s / DAY_S
+
+    sat_block = max(1, chunk_rows // T)
+    frames = []
+    for s0 in range(0, len(satrec_list), sat_block):
+        block = satrec_list[s0:s0 + sat_block]
+        error, r_teme, _ = propagate_teme(block, times)
+        r_itrs = teme_to_itrs(r_teme, times)
+        valid = valid_states(error, r_teme, max_radius_km(block))
+
+        found = []
+        for s in range(len(stations)):
+            g = sampled_sin_elevation(r_itrs, valid, position[s], enu[s, 2]) - sin_mask
+            row, peak, rise_lo, set_hi = pass_candidates(g, graze)
+            found.append((row, np.full(len(row), s), peak, rise_lo, set_hi))
+        row, station_idx, peak, rise_lo, set_hi = map(np.concatenate, zip(*found))
+        if not len(row):
+            continue
+
+        visible, rise, culmination, set_, max_elevation, azimuth = refine_block(
+            block, row, station_idx, peak, rise_lo, set_hi, grid,
+            position, enu, sin_mask, tolerance
+        )
+        frames.append(pd.DataFrame({
+            "station": station_idx[visible],
+            "satellite": s0 + row[visible],
+            "rise": rise[visible],
+            "culmination": culmination[visible],
+            "set": set_[visible],
+            "max_elevation": max_elevation[visible],
+            "azimuth": azimuth[visible],
+        }))
+
+    if not frames:
+        return pd.DataFrame(columns=COLUMNS)
+    found = pd.concat(frames, ignore_index=True)
+
+    start = grid_datetimes(times[:1])[0]
+
+    def to_datetime(day_offsets):
+        ms = np.round((day_offsets - offsets[0]) * DAY_S * 1000)
+        return pd.to_datetime(start) + pd.to_timedelta(ms, unit="ms")
+
+    passes = pd.DataFrame({
+        "Station": station_names[found["station"].to_numpy()],
+        "Satellite Name": catalog.names[found["satellite"].to_numpy()],
+        "Rise (UTC)": to_datetime(found["rise"].to_numpy()),
+        "Culmination (UTC)": to_datetime(found["culmination"].to_numpy()),
+        "Set (UTC)": to_datetime(found["set"].to_numpy()),
+        "Max Elevation (deg)": found["max_elevation"].to_numpy(),
+        "Culmination Azimuth (deg)": found["azimuth"].to_numpy(),
+        "Duration (s)": (found["set"] - found["rise"]).to_numpy() * DAY_S,
+    })
+    return passes.sort_values(["Culmination (UTC)", "Station"], ignore_index=True)
+
+
+def predict_window(catalog, names, stations, start, end, step_minutes=1,
+                   min_elevation_deg=10.0, ts=None):
+    """Passes of ``names`` (all of ``catalog`` if empty) over ``[start, end)``."""
+    ts = ts or load.timescale()
+    if names:
+        catalog = catalog.take(np.flatnonzero(np.isin(catalog.names, list(names))))
+
+    total_minutes = (pd.Timestamp(end) - pd.Timestamp(start)) / pd.Timedelta(minutes=1)
+    times = build_time_grid(ts, pd.Timestamp(start, tz="UTC"), total_minutes, step_minutes)
+    return predict_passes(catalog, stations, times, min_elevation_deg)
+
+
+# =========================================================
+# MAIN
+# =========================================================
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Predict satellite passes over ground stations for the whole catalog"
+    )
+    parser.add_argument(
+        "--catalog", default=METADATA_PATH,
+        help="element source: OMM metadata CSV (default) or a TLE text file"
+    )
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="parsed-catalog cache directory")
+    parser.add_argument(
+        "--stations", nargs="*", default=None,
+        help=f"built-in stations to use (default: all of {', '.join(STATIONS['Station'])})"
+    )
+    parser.add_argument(
+        "--stations-csv", default=None,
+        help=f"station CSV with columns {', '.join(STATION_COLUMNS)} (replaces the built-ins)"
+    )
+    parser.add_argument("--satellites", nargs="*", default=None, help="satellite names")
+    parser.add_argument("--start", default=None, help="start time, ISO UTC (default: now)")
+    parser.add_argument("--hours", type=float, default=24, help="prediction horizon")
+    parser.add_argument("--step", type=float, default=1, help="coarse time step in minutes")
+    parser.add_argument(
+        "--min-elevation", type=float, default=10.0, help="elevation mask in degrees"
+    )
+    parser.add_argument(
+        "--tolerance-s", type=float, default=1.0, help="event time tolerance in seconds"
+    )
+    parser.add_argument("--output", default=OUTPUT_PATH, help="pass table CSV output")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    catalog = load_catalog(args.catalog, args.cache_dir)
+    if args.satellites:
+        catalog = catalog.take(np.isin(catalog.names, args.satellites))
+
+    stations = read_stations(args.stations_csv) if args.stations_csv else STATIONS
+    if args.stations:
+        stations = stations[stations["Station"].isin(args.stations)].reset_index(drop=True)
+    print(f"Predicting passes of {len(catalog)} satellites over {len(stations)} stations")
+
+    start = datetime.now(timezone.utc)
+    if args.start:
+        start = datetime.fromisoformat(args.start)
+        start = start.replace(tzinfo=timezone.utc) if start.tzinfo is None else start
+
+    ts = load.timescale()
+    times = build_time_grid(ts, start, args.hours * 60, args.step)
+
+    passes = predict_passes(catalog, stations, times, args.min_elevation,
+                            tolerance_s=args.tolerance_s)
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    passes.to_csv(args.output, index=False)
+
+    print("✅ Pass prediction complete")
+    print(f"Passes found: {len(passes)}")
+    print(f"CSV saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""Batch SGP4 propagation for whole satellite catalogs.
+
+Instead of building one skyfield ``EarthSatellite`` per TLE and calling
+``sat.at(times)`` in a loop, the whole catalog is wrapped in a single
+``sgp4.api.SatrecArray`` and evaluated against the whole time grid in one
+call. The TEME -> ITRS rotation only depends on time, so it is computed
+once per timestep (through skyfield's frames, exactly like ``sat.at`` +
+``wgs84.subpoint`` do) and applied to every satellite with one einsum.
+"""
+import numpy as np
+import pandas as pd
+from sgp4.api import SatrecArray
+from skyfield.framelib import itrs
+from skyfield.functions import mxm, T
+from skyfield.sgp4lib import TEME
+
+DAY_S = 86400.0
+
+# WGS84 ellipsoid (same constants as skyfield.api.wgs84)
+WGS84_A_KM = 6378.137
+WGS84_F = 1.0 / 298.257223563
+WGS84_E2 = 2.0 * WGS84_F - WGS84_F * WGS84_F
+
+# Plausible geocentric distances (km): the WGS84 polar radius, and about
+# the Moon's distance
+WGS84_B_KM = WGS84_A_KM * (1.0 - WGS84_F)
+MAX_RADIUS_KM = 400_000.0
+
+# How far (km) a sample may sit above the apogee of its element set
+MAX_CLIMB_KM = 500.0
+
+
+# =========================================================
+# TIME GRID
+# =========================================================
+def build_time_grid(ts, start, total_minutes=24 * 60, step_minutes=10):
+    """Regular UTC time grid starting at ``start`` (floored to the minute)."""
+    minutes = np.arange(0, total_minutes, step_minutes)
+    return ts.utc(
+        start.year,
+        start.month,
+        start.day,
+        start.hour,
+        start.minute + minutes
+    )
+
+
+def sgp4_dates(times):
+    """Split skyfield times into the (jd, fraction) pair SGP4 expects.
+
+    Mirrors ``EarthSatellite._position_and_velocity_TEME_km``: TLE epochs
+    are UTC, so the leap seconds are taken back out of the TAI fraction.
+    """
+    jd = np.atleast_1d(times.whole)
+    fraction = np.atleast_1d(times.tai_fraction - times._leap_seconds() / DAY_S)
+    return jd, fraction
+
+
+def teme_to_itrs_matrices(times):
+    """Rotation matrices taking TEME vectors into ITRS, shape (T, 3, 3)."""
+    R = mxm(itrs.rotation_at(times), T(TEME.rotation_at(times)))
+    if R.ndim == 2:
+        R = R[:, :, None]
+    return np.moveaxis(R, -1, 0)
+
+
+# =========================================================
+# SATELLITE RECORDS
+# =========================================================
+def as_satrec_array(satrecs):
+    if isinstance(satrecs, SatrecArray):
+        return satrecs
+    return SatrecArray(list(satrecs))
+
+
+# =========================================================
+# VALIDITY
+# =========================================================
+def max_radius_km(satrecs):
+    """Largest plausible geocentric distance of every satellite, shape (N, 1).
+
+    Stale element sets (old epoch, high drag) can propagate "without
+    error" to thousands or millions of km, so each satellite is held to
+    ``MAX_CLIMB_KM`` above its element-set apogee. A ``SatrecArray`` does
+    not expose its elements and only gets the global ``MAX_RADIUS_KM``.
+    """
+    if isinstance(satrecs, SatrecArray):
+        return MAX_RADIUS_KM
+    apogee = np.array([(1.0 + sat.alta) * sat.radiusearthkm for sat in satrecs])
+    return np.minimum(apogee + MAX_CLIMB_KM, MAX_RADIUS_KM)[:, None]
+
+
+def valid_states(error, r, max_radius=MAX_RADIUS_KM):
+    """Mask of usable (N, T) samples: no SGP4 error and a geocentric
+    distance between the Earth's polar radius and ``max_radius`` km (see
+    ``max_radius_km``). Non-finite positions are invalid too."""
+    radius2 = np.einsum("...j,...j->...", r, r)
+    return (error == 0) & (radius2 >= WGS84_B_KM ** 2) & (radius2 <= np.square(max_radius))
+
+
+# =========================================================
+# PROPAGATION
+# =========================================================
+def propagate_teme(satrecs, times):
+    """Propagate every satellite against every time in one SGP4 call.
+
+    Returns ``(error, r, v)`` with shapes (N, T), (N, T, 3) and (N, T, 3);
+    positions are in km and velocities in km/s, in the TEME frame.
+    """
+    jd, fraction = sgp4_dates(times)
+    return as_satrec_array(satrecs).sgp4(jd, fraction)
+
+
+def itrs_to_geodetic(r_itrs_km):
+    """Geodetic latitude/longitude (degrees) and height (m) of ITRS vectors.
+
+    Same fixed three-iteration scheme as skyfield's ``Geoid``, so results
+    match ``wgs84.subpoint`` to floating point precision.
+    """
+    x = r_itrs_km[..., 0]
+    y = r_itrs_km[..., 1]
+    z = r_itrs_km[..., 2]
+
+    R = np.hypot(x, y)
+    lat = np.arctan2(z, R)
+    for _ in range(3):
+        sin_lat = np.sin(lat)
+        e2_sin_lat = WGS84_E2 * sin_lat
+        aC = WGS84_A_KM / np.sqrt(1.0 - e2_sin_lat * sin_lat)
+        hyp = z + aC * e2_sin_lat
+        lat = np.arctan2(hyp, R)
+
+    lon = (np.arctan2(y, x) - np.pi) % (2.0 * np.pi) - np.pi
+    height_km = np.sqrt(hyp * hyp + R * R) - aC
+
+    return np.degrees(lat), np.degrees(lon), height_km * 1000.0
+
+
+def geodetic_to_itrs(lat_deg, lon_deg, height_m):
+    """ITRS position (km) of WGS84 geodetic coordinates, shape (..., 3)."""
+    lat = np.radians(lat_deg)
+    lon = np.radians(lon_deg)
+    height_km = np.asarray(height_m, dtype=np.float64) / 1000.0
+
+    sin_lat = np.sin(lat)
+    N = WGS84_A_KM / np.sqrt(1.0 - WGS84_E2 * sin_lat * sin_lat)
+    return np.stack([
+        (N + height_km) * np.cos(lat) * np.cos(lon),
+        (N + height_km) * np.cos(lat) * np.sin(lon),
+        (N * (1.0 - WGS84_E2) + height_km) * sin_lat,
+    ], axis=-1)
+
+
+def teme_to_itrs(r_teme, times):
+    """Rotate (N, T, 3) TEME vectors into ITRS."""
+    return np.einsum("tij,ntj->nti", teme_to_itrs_matrices(times), r_teme)
+
+
+def propagate_geodetic(satrecs, times):
+    """Latitude, longitude, altitude for the whole catalog.
+
+    Returns four (N, T) arrays: latitude and longitude in degrees, altitude
+    in meters, and a boolean mask that is False where SGP4 reported an
+    error (decayed satellite, bad elements) or the position is implausible
+    (see ``valid_states``) for that sample.
+    """
+    error, r_teme, _ = propagate_teme(satrecs, times)
+    lat, lon, alt = itrs_to_geodetic(teme_to_itrs(r_teme, times))
+    valid = valid_states(error, r_teme, max_radius_km(satrecs))
+    return lat, lon, alt, valid
+
+
+def iter_propagated_blocks(satrecs, times, chunk_rows=1_000_000):
+    """Propagate the catalog block by block, at most ``chunk_rows`` samples each.
+
+    Yields ``(sat_slice, time_slice, lat, lon, alt, valid)`` in
+    satellite-major order (all times of a satellite block before the next
+    block), so concatenating the blocks gives the same row order as one
+    big ``propagate_geodetic`` call while peak memory stays bounded.
+    """
+    satrecs = list(satrecs)
+    n_sats = len(satrecs)
+    n_times = len(np.atleast_1d(times.tt))
+
+    time_block = max(1, min(n_times, chunk_rows))
+    sat_block = max(1, chunk_rows // time_block)
+
+    for s0 in range(0, n_sats, sat_block):
+        sat_slice = slice(s0, min(s0 + sat_block, n_sats))
+        block = satrecs[sat_slice]
+        for t0 in range(0, n_times, time_block):
+            time_slice = slice(t0, min(t0 + time_block, n_times))
+            yield (sat_slice, time_slice) + propagate_geodetic(block, times[time_slice])
+
+
+class GroupedPropagator:
+    """Evaluates satellite ``sat_idx[k]`` at its own time ``fraction[k]``.
+
+    Samples are grouped by satellite once, so every evaluation costs one
+    ``sgp4_array`` call per distinct satellite instead of one call per sample.
+    """
+
+    def __init__(self, satrec_list, sat_idx):
+        self.satrec_list = satrec_list
+        order = np.argsort(sat_idx, kind="stable")
+        bounds = np.flatnonzero(np.diff(sat_idx[order])) + 1
+        self.groups = [(sat_idx[g[0]], g) for g in np.split(order, bounds) if len(g)]
+        self.size = len(sat_idx)
+
+    def __call__(self, jd, fraction):
+        r = np.empty((self.size, 3))
+        v = np.empty((self.size, 3))
+        for sat, members in self.groups:
+            _, r[members], v[members] = self.satrec_list[sat].sgp4_array(
+                np.full(len(members), jd), fraction[members]
+            )
+        return r, v
+
+
+def grid_datetimes(times):
+    """UTC ``datetime64[ms]`` values of a skyfield time grid."""
+    return pd.to_datetime(times.utc_iso()).tz_localize(None).values.astype("datetime64[ms]")
@@ -1,240 +1,280 @@
-#importing modules 
-from skyfield.api import load, EarthSatellite, wgs84
-import numpy as np
-import matplotlib.pyplot as plt
-import csv
+import argparse
 import os
-from datetime import datetime
-from mpl_toolkits.mplot3d import Axes3D 
-from matplotlib.animation import FuncAnimation
-
-
-#Load the TLE data
-#as of now hardcode the data
-
-#TLE for one satellite (we hardcoded Starlink-1010 TLE data for now)
-line1 = "1 44714U 19074B   25195.18782228 -.00000912  00000+0 -42376-4 0  9990"
-line2 = "2 44714  53.0544 177.2958 0001195  66.4551 293.6564 15.06388484312979"
-name = "STARLINK-1010"
-
-#We now created EarthSatellite object using Skyfield
-satellite = EarthSatellite(line1, line2, name)
-ts = load.timescale()
-
-#now we will define time window
-#we'll take positions every 10 minutes
-start_time = ts.now()
-minutes_interval = 10
-total_minutes = 24 * 60  
-times = []
-
-#time list for all timestamps (at every 10 minutes)
-for minute in range(0, total_minutes, minutes_interval):
-    t = start_time + minute / (60 * 24) 
-    times.append(t)
-
-
-
-#Now for computing satellite positions (we will create latitudes and longitudes)
-
-latitudes = []
-longitudes = []
-altitudes = [] 
-
-
-
-    
-
-
-#for each time we will get satellite subpoint
-for t in times:
-    #we are finding geocentric coordinates here(relative to center of earth)
-    geocentric = satellite.at(t)
-
-    #to point the geocentric coordinate with the earth's surface just below 
-    subpoint = wgs84.subpoint(geocentric)
-
-    #extracting latitude and longitude from subpoint
-    latitude = subpoint.latitude.degrees
-    longitude = subpoint.longitude.degrees
-
-    
-
-    # Get (x, y, z) position of satellite in kilometers
-    position = geocentric.position.km
-    x, y, z = position
-
-    # Earth radius (approximate in km)
-    earth_radius_km = 6371.0
-
-    # Distance from Earth's center to satellite
-    distance = np.sqrt(x**2 + y**2 + z**2)
-
-    # Altitude above Earth’s surface
-    altitude = distance - earth_radius_km
-
-
-    latitudes.append(latitude)
-    longitudes.append(longitude)
-    altitudes.append(altitude)
-
-
-#Data Storage and File Handling through csv file
-output_csv = "../data/satellite_orbit_track.csv"
-
-
-with open(output_csv, mode='w', newline='') as file:
-    writer = csv.writer(file)
-    #header row
-    writer.writerow(["Time (UTC)", "Latitude", "Longitude", "Altitude (km)"]) 
-
-    
-    for i in range(len(times)):
-        #to convert the time to a UTC timestamp in ISO 8601 format, like:
-        #'2025-07-15T18:30:00Z'
-        #Z at the end means “Zulu time,” which is just another name for UTC.
-
-        time_string = times[i].utc_iso() 
-        writer.writerow([time_string, latitudes[i], longitudes[i],altitudes[i]])
-
-
-#Plotting the lat long
-plt.figure(figsize=(12, 6))
-
-# Plot the orbit path as a scatter plot
-plt.plot(longitudes, latitudes, marker='o', linestyle='-', color='blue', markersize=3)
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
 
-# Set axis labels and title
-plt.xlabel("Longitude")
-plt.ylabel("Latitude")
-plt.title(f"Ground Track of {name}")
+# Headless rendering: no display needed (CI, servers)
+import matplotlib
+matplotlib.use("Agg")
 
-# Set axis limits
-plt.xlim(-180, 180)
-plt.ylim(-90, 90)
-
-# Add a grid for better readability
-plt.grid(True)
-
-# Save the plot to PNG file
-plot_path = "../plots/orbit_track.png"
-plt.savefig(plot_path)
-
-# Show the plot (you can disable this on headless systems)
-plt.show()
-
-print("Orbit simulation completed.")
-print(f"CSV saved to: {output_csv}")
-print(f"Plot saved to: {plot_path}")
-
-
-# Plot Altitude vs Time
-plt.figure(figsize=(10, 5))
-plt.plot([t.utc_datetime() for t in times], altitudes, color='green', linewidth=2)
-
-plt.xlabel("Time (UTC)")
-plt.ylabel("Altitude (km)")
-plt.title(f"Altitude vs Time for {name}")
-plt.grid(True)
-
-# Save plot
-altitude_plot_path = "../plots/altitude_vs_time.png"
-plt.savefig(altitude_plot_path)
-plt.show()
-
-print(f"Altitude plot saved to: {altitude_plot_path}")
-
-
-# 3D Plot
-fig = plt.figure(figsize=(10, 8))
-ax = fig.add_subplot(111, projection='3d')
-
-# Plotting longitude, latitude, and altitude
-ax.plot(longitudes, latitudes, altitudes, color='purple', marker='o', markersize=2, linestyle='-')
-
-ax.set_xlabel('Longitude (°)')
-ax.set_ylabel('Latitude (°)')
-ax.set_zlabel('Altitude (km)')
-ax.set_title(f"3D Orbit Track of {name}")
-
-# Optional: Set axis limits
-ax.set_xlim(-180, 180)
-ax.set_ylim(-90, 90)
-
-# Save the figure
-plot_3d_path = "../plots/3d_orbit.png"
-plt.savefig(plot_3d_path)
-plt.show()
-
-print(f"3D orbit plot saved to: {plot_3d_path}")
-
-# Convert longitudes, latitudes, and altitudes to 3D Cartesian coordinates
-x_vals = []
-y_vals = []
-z_vals = []
-
-for i in range(len(latitudes)):
-    # Convert degrees to radians
-    lat_rad = np.radians(latitudes[i])
-    lon_rad = np.radians(longitudes[i])
-    r = altitudes[i] + earth_radius_km
-
-    # Spherical to Cartesian conversion
-    x = r * np.cos(lat_rad) * np.cos(lon_rad)
-    y = r * np.cos(lat_rad) * np.sin(lon_rad)
-    z = r * np.sin(lat_rad)
-
-    x_vals.append(x)
-    y_vals.append(y)
-    z_vals.append(z)
-
-# Setup figure
-plt.style.use('dark_background')
-
-fig = plt.figure(figsize=(10, 8))
-ax = fig.add_subplot(111, projection='3d')
-ax.set_title(f"3D Orbit Animation of {name}")
-
-# Earth sphere
-u, v = np.mgrid[0:2*np.pi:100j, 0:np.pi:50j]
-earth_x = earth_radius_km * np.cos(u) * np.sin(v)
-earth_y = earth_radius_km * np.sin(u) * np.sin(v)
-earth_z = earth_radius_km * np.cos(v)
-ax.plot_surface(earth_x, earth_y, earth_z, rstride=4, cstride=4, color='midnightblue', edgecolor='gray', linewidth=0.3, alpha=1.0)
-
-
-# Axis limits and labels
-limit = max(x_vals + y_vals + z_vals, key=abs)
-ax.set_xlim([-limit, limit])
-ax.set_ylim([-limit, limit])
-ax.set_zlim([-limit, limit])
-ax.set_xlabel("X (km)")
-ax.set_ylabel("Y (km)")
-ax.set_zlabel("Z (km)")
-
-
-# Initial satellite point and trail line
-satellite_dot, = ax.plot([], [], [], 'ro', markersize=4, label='Satellite')
-trail_line, = ax.plot([], [], [], color='red', linewidth=1, label='Trail')
-
-def update(frame):
-    # Update the satellite dot
-    satellite_dot.set_data([x_vals[frame]], [y_vals[frame]])
-    satellite_dot.set_3d_properties([z_vals[frame]])
-    
-    # Update the trail (path so far)
-    trail_line.set_data(x_vals[:frame+1], y_vals[:frame+1])
-    trail_line.set_3d_properties(z_vals[:frame+1])
-    
-    return satellite_dot, trail_line
-
-
-
-# Animate!
-ani = FuncAnimation(fig, update, frames=len(x_vals), interval=100, blit=True)
-
-
-# Show animation
-plt.show()
+from skyfield.api import load
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
 
-print("3D animation complete.")
+from catalog import CACHE_DIR, load_catalog
+from orbit_animation import export_animation
+from propagation import (
+    build_time_grid,
+    grid_datetimes,
+    itrs_to_geodetic,
+    max_radius_km,
+    propagate_teme,
+    teme_to_itrs,
+    valid_states,
+)
+
+TLE_PATH = "../data/starlink_tle.txt"
+OUTPUT_CSV = "../data/satellite_orbit_track.csv"
+PLOTS_DIR = "../plots/orbits"
+
+PLOT_KINDS = ["ground_track", "altitude", "3d"]
+
+# Simulated when neither --satellites nor --all is given (STARLINK-1008);
+# selected by NORAD ID, which survives renames in the catalog
+DEFAULT_NORAD_ID = 44714
+
+
+# =========================================================
+# PROPAGATION (whole selection, one array call)
+# =========================================================
+def propagate_tracks(catalog, times):
+    """Earth-fixed tracks for every satellite of ``catalog`` over ``times``.
+
+    Returns (N, T) latitude/longitude in degrees and altitude in km, the
+    (N, T, 3) Earth-fixed Cartesian positions in km, and the validity mask.
+    Altitude is the WGS84 geodetic height, like the orbit dataset, not the
+    spherical ``|r| - 6371 km`` the single-satellite script used (that one
+    reads about 7 km higher at the equator and 14 km lower at the poles).
+    """
+    satrecs = catalog.satrecs()
+    error, r_teme, _ = propagate_teme(satrecs, times)
+    xyz = teme_to_itrs(r_teme, times)
+    lat, lon, alt_m = itrs_to_geodetic(xyz)
+    valid = valid_states(error, r_teme, max_radius_km(satrecs))
+    return lat, lon, alt_m / 1000.0, xyz, valid
+
+
+def write_tracks_csv(path, names, time_values, lat, lon, alt_km, valid):
+    sat_idx, time_idx = np.nonzero(valid)
+    pd.DataFrame({
+        "Satellite Name": names[sat_idx],
+        "Time (UTC)": np.datetime_as_string(time_values[time_idx], unit="s"),
+        "Latitude": lat[valid],
+        "Longitude": lon[valid],
+        "Altitude (km)": alt_km[valid],
+    }).to_csv(path, index=False)
+
+
+def plot_file_name(output_dir, name, kind, extension="png"):
+    safe_name = re.sub(r"[^A-Za-z0-9_.-]+", "_", name.strip())
+    return os.path.join(output_dir, f"{safe_name}_{kind}.{extension}")
+
+
+# =========================================================
+# RENDERING (runs inside a worker process)
+# =========================================================
+def render_batch(names, time_values, lat, lon, alt_km, valid, output_dir, kinds):
+    """Save the requested PNG plots for a batch of satellites.
+
+    Each figure is built once per batch and only its line data is swapped
+    per satellite, which is much cheaper than building a figure per plot.
+    """
+    times = time_values.astype("datetime64[ms]").astype(object)
+    saved = 0
+
+    if "ground_track" in kinds:
+        fig_track, ax = plt.subplots(figsize=(12, 6))
+        track_line, = ax.plot([], [], marker="o", linestyle="-", color="blue", markersize=3)
+        ax.set_xlabel("Longitude")
+        ax.set_ylabel("Latitude")
+        ax.set_xlim(-180, 180)
+        ax.set_ylim(-90, 90)
+        ax.grid(True)
+
+    if "altitude" in kinds:
+        fig_alt, ax_alt = plt.subplots(figsize=(10, 5))
+        alt_line, = ax_alt.plot(times, np.zeros(len(times)), color="green", linewidth=2)
+        ax_alt.set_xlabel("Time (UTC)")
+        ax_alt.set_ylabel("Altitude (km)")
+        ax_alt.grid(True)
+
+    if "3d" in kinds:
+        fig_3d = plt.figure(figsize=(10, 8))
+        ax_3d = fig_3d.add_subplot(111, projection="3d")
+        line_3d, = ax_3d.plot([], [], [], color="purple", marker="o", markersize=2, linestyle="-")
+        ax_3d.set_xlabel("Longitude (°)")
+        ax_3d.set_ylabel("Latitude (°)")
+        ax_3d.set_zlabel("Altitude (km)")
+        ax_3d.set_xlim(-180, 180)
+        ax_3d.set_ylim(-90, 90)
+
+    for i, name in enumerate(names):
+        ok = valid[i]
+        if not ok.any():
+            continue
+
+        if "ground_track" in kinds:
+            track_line.set_data(lon[i, ok], lat[i, ok])
+            ax.set_title(f"Ground Track of {name}")
+            fig_track.savefig(plot_file_name(output_dir, name, "ground_track"))
+            saved += 1
+
+        if "altitude" in kinds:
+            alt_line.set_data(times[ok], alt_km[i, ok])
+            ax_alt.relim()
+            ax_alt.autoscale_view()
+            ax_alt.set_title(f"Altitude vs Time for {name}")
+            fig_alt.savefig(plot_file_name(output_dir, name, "altitude"))
+            saved += 1
+
+        if "3d" in kinds:
+            line_3d.set_data_3d(lon[i, ok], lat[i, ok], alt_km[i, ok])
+            ax_3d.set_zlim(alt_km[i, ok].min() - 1, alt_km[i, ok].max() + 1)
+            ax_3d.set_title(f"3D Orbit Track of {name}")
+            fig_3d.savefig(plot_file_name(output_dir, name, "3d"))
+            saved += 1
+
+    plt.close("all")
+    return saved
+
+
+def render_all(names, time_values, lat, lon, alt_km, valid, output_dir, kinds, workers):
+    os.makedirs(output_dir, exist_ok=True)
+
+    # A few batches per worker keeps the pool busy until the end
+    batches = np.array_split(np.arange(len(names)), max(1, workers * 4))
+    jobs = [
+        (names[b], time_values, lat[b], lon[b], alt_km[b], valid[b], output_dir, kinds)
+        for b in batches if len(b)
+    ]
+
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return sum(pool.map(render_batch, *zip(*jobs)))
+    return sum(render_batch(*job) for job in jobs)
+
+
+# =========================================================
+# MAIN
+# =========================================================
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Propagate satellites and render per-satellite orbit plots (headless)"
+    )
+    parser.add_argument(
+        "--catalog", default=TLE_PATH,
+        help="element source: TLE text file (default) or OMM metadata CSV"
+    )
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="parsed-catalog cache directory")
+    parser.add_argument(
+        "--satellites", nargs="*", default=None,
+        help=f"satellite names to simulate (default: NORAD {DEFAULT_NORAD_ID})"
+    )
+    parser.add_argument(
+        "--all", action="store_true",
+        help="simulate the whole catalog (renders plots for every satellite)"
+    )
+    parser.add_argument("--limit", type=int, default=None, help="simulate at most N satellites")
+    parser.add_argument("--start", default=None, help="start time, ISO UTC (default: now)")
+    parser.add_argument("--hours", type=float, default=24, help="propagation horizon")
+    parser.add_argument("--step", type=float, default=10, help="time step in minutes")
+    parser.add_argument("--csv", default=OUTPUT_CSV, help="track CSV output ('' to skip)")
+    parser.add_argument("--output-dir", default=PLOTS_DIR, help="PNG output directory")
+    parser.add_argument(
+        "--plots", nargs="*", default=PLOT_KINDS, choices=PLOT_KINDS,
+        help="plots to render per satellite (none to skip rendering)"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=0,
+        help="rendering processes (0 = one per CPU core)"
+    )
+    parser.add_argument(
+        "--animate", nargs="*", default=None, metavar="NAME",
+        help="also export a 3D orbit animation of these satellites "
+             "(no names: every simulated satellite)"
+    )
+    parser.add_argument(
+        "--animation-output", default=None,
+        help="animation file, .gif or .mp4 (default: <output-dir>/orbit_animation.gif)"
+    )
+    parser.add_argument(
+        "--trail", type=int, default=None,
+        help="animation trail length in time steps (default: the whole track so far)"
+    )
+    parser.add_argument("--fps", type=float, default=10, help="animation frame rate")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    catalog = load_catalog(args.catalog, args.cache_dir)
+
+    if args.satellites:
+        wanted = np.isin(catalog.names, args.satellites)
+        missing = sorted(set(args.satellites) - set(catalog.names[wanted]))
+        for name in missing:
+            print(f"⚠️ Not in catalog: {name}")
+        catalog = catalog.take(wanted)
+    elif not args.all:
+        default = np.flatnonzero(catalog.norad_ids == DEFAULT_NORAD_ID)
+        if not len(default):
+            raise SystemExit(
+                f"❌ Default satellite NORAD {DEFAULT_NORAD_ID} is not in {args.catalog}; "
+                "pass --satellites or --all"
+            )
+        catalog = catalog.take(default[:1])
+    if args.limit:
+        catalog = catalog.take(slice(0, args.limit))
+    print(f"Simulating {len(catalog)} satellites")
+
+    start = datetime.now(timezone.utc)
+    if args.start:
+        start = datetime.fromisoformat(args.start)
+        start = start.replace(tzinfo=timezone.utc) if start.tzinfo is None else start
+
+    ts = load.timescale()
+    times = build_time_grid(ts, start, args.hours * 60, args.step)
+    time_values = grid_datetimes(times)
+
+    lat, lon, alt_km, xyz, valid = propagate_tracks(catalog, times)
+
+    for name in catalog.names[~valid.any(axis=1)]:
+        print(f"⚠️ Skipped {name}: SGP4 propagation failed")
+
+    if args.csv:
+        write_tracks_csv(args.csv, catalog.names, time_values, lat, lon, alt_km, valid)
+        print(f"CSV saved to: {args.csv}")
+
+    if args.plots:
+        workers = args.workers or os.cpu_count()
+        saved = render_all(catalog.names, time_values, lat, lon, alt_km, valid,
+                           args.output_dir, args.plots, workers)
+        print(f"{saved} plots saved to: {args.output_dir}")
+
+    if args.animate is not None:
+        animated = np.isin(catalog.names, args.animate) if args.animate else np.ones(len(catalog), bool)
+        animated &= valid.any(axis=1)
+        if not animated.any():
+            print("⚠️ Nothing to animate: no selected satellite was simulated")
+        else:
+            path = args.animation_output or os.path.join(args.output_dir, "orbit_animation.gif")
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            names = catalog.names[animated]
+            title = f"3D Orbit Animation of {names[0]}" if len(names) == 1 \
+                else f"3D Orbit Animation of {len(names)} satellites"
+            export_animation(
+                xyz[animated], valid[animated],
+                np.datetime_as_string(time_values, unit="m").tolist(),
+                path, title=title, trail_steps=args.trail, fps=args.fps,
+                workers=args.workers or os.cpu_count()
+            )
+            print(f"3D animation saved to: {path}")
+
+    print("Orbit simulation completed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Geo-tiled index for region-of-interest queries over an orbit dataset.
+
+"Which satellites passed over this area during this window?" would
+otherwise scan every sample. ``SpatialIndex`` buckets the samples of an
+``OrbitIndex`` into fixed lat/lon tiles once, at load time: rows are
+permuted so every tile is contiguous and, because the stable sort keeps the
+frame's time order, time-sorted inside its tile. Each row gets the
+composite key ``tile * span + milliseconds since the first sample``, so the
+time window of every intersecting tile is found with one vectorized
+``searchsorted``. A query reads only those rows and tests the exact shape
+(box or great-circle radius) on them.
+
+Like ``OrbitIndex`` it is shared read-only by every session, and answers
+with sorted row positions into the shared frame (pass them to
+``OrbitIndex.rows``).
+"""
+import numpy as np
+
+from orbit_store import LAT, LON, naive_utc
+
+# Mean Earth radius (km) for point + radius queries
+EARTH_RADIUS_KM = 6371.0
+
+_MS = np.timedelta64(1, "ms")
+
+
+class SpatialIndex:
+    # Memory of the tile permutation and composite keys (int64 each)
+    BYTES_PER_ROW = 16
+
+    def __init__(self, orbit_index, tile_deg=5.0):
+        self.orbit_index = orbit_index
+        self.tile_deg = tile_deg
+        self.n_lat = int(np.ceil(180.0 / tile_deg))
+        self.n_lon = int(np.ceil(360.0 / tile_deg))
+
+        self.lat = orbit_index.df[LAT].to_numpy()
+        self.lon = orbit_index.df[LON].to_numpy()
+        tiles = self._tile_rows(self.lat) * self.n_lon + self._tile_cols(self.lon)
+
+        # Tile-major permutation; time order is kept inside every tile
+        self.by_tile = np.argsort(tiles, kind="stable")
+
+        times = orbit_index.times
+        self.t0 = times[0] if len(times) else np.datetime64(0, "ms")
+        elapsed = ((times - self.t0) // _MS).astype(np.int64)
+        self.span = int(elapsed[-1]) + 1 if len(times) else 1
+        self.keys = tiles[self.by_tile].astype(np.int64) * self.span + elapsed[self.by_tile]
+
+        for array in (self.lat, self.lon, self.by_tile, self.keys):
+            array.setflags(write=False)
+
+    @property
+    def nbytes(self):
+        return self.by_tile.nbytes + self.keys.nbytes
+
+    def _tile_rows(self, lat):
+        rows = np.floor((np.asarray(lat, dtype=np.float64) + 90.0) / self.tile_deg)
+        return np.clip(rows, 0, self.n_lat - 1).astype(np.int64)
+
+    def _tile_cols(self, lon):
+        cols = np.floor((np.asarray(lon, dtype=np.float64) + 180.0) / self.tile_deg)
+        return np.clip(cols, 0, self.n_lon - 1).astype(np.int64)
+
+    def _elapsed_ms(self, value, default):
+        if value is None:
+            return default
+        value = np.datetime64(naive_utc(value).to_datetime64(), "ms")
+        return int(np.clip((value - self.t0) // _MS, 0, self.span))
+
+    def _candidates(self, lat_lo, lat_hi, lon_ranges, start, end):
+        """Row positions of the tiles covering the box, inside ``[start, end)``."""
+        rows = np.arange(self._tile_rows(lat_lo), self._tile_rows(lat_hi) + 1)
+        cols = np.concatenate([
+            np.arange(self._tile_cols(lo), self._tile_cols(hi) + 1) for lo, hi in lon_ranges
+        ])
+        tiles = (rows[:, None] * self.n_lon + np.unique(cols)[None, :]).ravel()
+
+        base = tiles * self.span
+        lo = np.searchsorted(self.keys, base + self._elapsed_ms(start, 0), "left")
+        hi = np.searchsorted(self.keys, base + self._elapsed_ms(end, self.span), "left")
+
+        counts = np.maximum(hi - lo, 0)
+        first = np.repeat(lo - (np.cumsum(counts) - counts), counts)
+        return self.by_tile[first + np.arange(counts.sum())]
+
+    def _finish(self, positions, inside, alt_range, names):
+        positions = positions[inside]
+        keep = self.orbit_index.matches(positions, alt_range, names)
+        if keep is not None:
+            positions = positions[keep]
+        # Row order of the time-sorted frame
+        return np.sort(positions)
+
+    def bbox(self, lat_min, lat_max, lon_min, lon_max, start=None, end=None,
+             alt_range=None, names=None):
+        """Rows inside a lat/lon box (``lon_min > lon_max`` crosses the
+        antimeridian) in ``[start, end)``, as sorted row positions."""
+        if lon_min <= lon_max:
+            lon_ranges = [(lon_min, lon_max)]
+        else:
+            lon_ranges = [(lon_min, 180.0), (-180.0, lon_max)]
+
+        positions = self._candidates(lat_min, lat_max, lon_ranges, start, end)
+        lat, lon = self.lat[positions], self.lon[positions]
+        in_lon = (lon >= lon_min) & (lon <= lon_max) if lon_min <= lon_max \
+            else (lon >= lon_min) | (lon <= lon_max)
+        inside = (lat >= lat_min) & (lat <= lat_max) & in_lon
+        return self._finish(positions, inside, alt_range, names)
+
+    def radius(self, lat, lon, radius_km, start=None, end=None, alt_range=None, names=None):
+        """Rows whose subpoint is within ``radius_km`` (great circle) of a
+        point, in ``[start, end)``, as sorted row positions."""
+        lat_lo, lat_hi, lon_ranges = circle_bounds(lat, lon, radius_km)
+        positions = self._candidates(lat_lo, lat_hi, lon_ranges, start, end)
+        inside = within_radius(self.lat[positions], self.lon[positions], lat, lon, radius_km)
+        return self._finish(positions, inside, alt_range, names)
+
+
+def circle_bounds(lat, lon, radius_km):
+    """``(lat_lo, lat_hi, lon_ranges)`` of a box holding a great circle
+    disc; ``lon_ranges`` is split in two where the disc crosses 180°."""
+    angle = min(radius_km / EARTH_RADIUS_KM, np.pi)
+    angle_deg = np.degrees(angle)
+    lat_lo, lat_hi = max(lat - angle_deg, -90.0), min(lat + angle_deg, 90.0)
+
+    if lat_lo <= -90.0 or lat_hi >= 90.0:
+        return lat_lo, lat_hi, [(-180.0, 180.0)]
+
+    half = np.degrees(np.arcsin(min(np.sin(angle) / np.cos(np.radians(lat)), 1.0)))
+    lo, hi = lon - half, lon + half
+    if hi - lo >= 360.0:
+        lon_ranges = [(-180.0, 180.0)]
+    elif lo < -180.0:
+        lon_ranges = [(lo + 360.0, 180.0), (-180.0, hi)]
+    elif hi > 180.0:
+        lon_ranges = [(lo, 180.0), (-180.0, hi - 360.0)]
+    else:
+        lon_ranges = [(lo, hi)]
+    return lat_lo, lat_hi, lon_ranges
+
+
+def within_radius(lats, lons, lat, lon, radius_km):
+    """Mask of the subpoints within ``radius_km`` (great circle) of a point."""
+    angle = min(radius_km / EARTH_RADIUS_KM, np.pi)
+    lat_r = np.radians(np.asarray(lats, dtype=np.float64))
+    dlon = np.radians(np.asarray(lons, dtype=np.float64) - lon)
+    phi = np.radians(lat)
+    cos_distance = np.sin(lat_r) * np.sin(phi) + np.cos(lat_r) * np.cos(phi) * np.cos(dlon)
+    return cos_distance >= np.cos(angle)
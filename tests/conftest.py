@@ -0,0 +1,29 @@
+"""Shared fixtures: the pipeline modules live in ``scripts/`` and import
+each other as top-level modules, so that directory goes on ``sys.path``."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "scripts"))
+
+import pandas as pd  # noqa: E402
+from skyfield.api import load  # noqa: E402
+
+from benchmarks import synthetic_catalog  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def ts():
+    return load.timescale()
+
+
+@pytest.fixture(scope="session")
+def epoch():
+    return pd.Timestamp("2026-01-05 12:00", tz="UTC").to_pydatetime()
+
+
+@pytest.fixture(scope="session")
+def catalog(epoch):
+    """Small synthetic LEO catalog with element epochs at ``epoch``."""
+    return synthetic_catalog(40, epoch)
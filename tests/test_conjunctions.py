@@ -0,0 +1,66 @@
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from catalog import Catalog
+from conjunctions import coarse_search_radius, screen_catalog, screen_catalog_refined
+from propagation import DAY_S, build_time_grid, sgp4_dates
+
+
+def crossing_pair(epoch):
+    """Two circular orbits in different planes that both sit at their
+    shared ascending node at ``epoch``."""
+    epoch_days = (pd.Timestamp(epoch).tz_convert(None) - pd.Timestamp("1949-12-31")) \
+        / pd.Timedelta(days=1)
+    elements = {
+        "epoch": [epoch_days] * 2,
+        "bstar": [0.0] * 2,
+        "ndot": [0.0] * 2,
+        "nddot": [0.0] * 2,
+        "ecco": [1e-4] * 2,
+        "argpo": [0.0] * 2,
+        "inclo": np.radians([53.0, 97.6]),
+        "mo": [0.0] * 2,
+        "no_kozai": [15.06 / 720.0 * np.pi] * 2,
+        "nodeo": [1.0] * 2,
+    }
+    return Catalog(["A", "B"], [1, 2], elements)
+
+
+def test_refined_tca_finds_off_grid_approach(ts, epoch):
+    # The meeting happens 30 s after the nearest grid sample
+    catalog = crossing_pair(epoch + timedelta(seconds=30))
+    times = build_time_grid(ts, epoch - timedelta(minutes=10), 20, 1)
+
+    coarse = screen_catalog(catalog, times, threshold_km=500.0)
+    refined = screen_catalog_refined(catalog, times, threshold_km=10.0)
+
+    assert len(refined) == 1
+    event = refined.iloc[0]
+    assert (event["Satellite 1"], event["Satellite 2"]) == ("A", "B")
+    assert event["Miss Distance (km)"] < coarse["Miss Distance (km)"].min()
+
+    # Brute force: the separation sampled every 10 ms around the meeting
+    a, b = catalog.satrecs()
+    seconds = np.arange(-60.0, 60.0, 0.01)
+    jd, fraction = sgp4_dates(ts.utc(epoch + timedelta(seconds=30)))
+    fractions = fraction[0] + seconds / DAY_S
+    _, r_a, _ = a.sgp4_array(np.full(len(seconds), jd[0]), fractions)
+    _, r_b, _ = b.sgp4_array(np.full(len(seconds), jd[0]), fractions)
+    separation = np.linalg.norm(r_a - r_b, axis=1)
+    closest = separation.argmin()
+
+    assert event["Miss Distance (km)"] == pytest.approx(separation[closest], abs=1e-3)
+    expected = pd.Timestamp(epoch).tz_localize(None) + pd.Timedelta(
+        seconds=30 + seconds[closest])
+    assert abs(pd.Timestamp(event["Timestamp"]) - expected) < pd.Timedelta(seconds=0.05)
+
+
+def test_coarse_radius_rejects_long_steps():
+    radius, _ = coarse_search_radius(10.0, 60.0)
+    assert radius < 510.0
+
+    with pytest.raises(ValueError, match="all-pairs"):
+        coarse_search_radius(10.0, 600.0)
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+from coverage import CoverageGrid, coverage_map, footprint_half_angle
+from orbit_store import ALT, LAT, LON, NAME, TIME
+
+
+def brute_force_counts(grid, lat, lon, alt_m, min_elevation_deg):
+    """Satellites within the footprint angle of every cell centre."""
+    cell_lat, cell_lon = np.meshgrid(np.radians(grid.lat), np.radians(grid.lon), indexing="ij")
+    cell_lat, cell_lon = cell_lat.ravel()[:, None], cell_lon.ravel()[:, None]
+    sat_lat, sat_lon = np.radians(lat)[None, :], np.radians(lon)[None, :]
+    cos_angle = (np.sin(cell_lat) * np.sin(sat_lat)
+                 + np.cos(cell_lat) * np.cos(sat_lat) * np.cos(cell_lon - sat_lon))
+    angle = np.arccos(np.clip(cos_angle, -1.0, 1.0))
+    return (angle <= footprint_half_angle(alt_m, min_elevation_deg)[None, :]).sum(axis=1)
+
+
+def test_count_in_view_matches_brute_force():
+    rng = np.random.default_rng(3)
+    n = 300
+    lat = np.degrees(np.arcsin(rng.uniform(-1, 1, n)))
+    lon = rng.uniform(-180, 180, n)
+    lon[:5] = [179.9, -179.9, 0.0, 90.0, -90.0]   # antimeridian wraps
+    lat[5:8] = [89.5, -89.5, 0.0]                   # polar caps
+    alt = rng.uniform(3e5, 1.2e6, n)
+
+    grid = CoverageGrid(3.0)
+    got = grid.count_in_view(lat, lon, alt, 10.0, chunk_pairs=97)
+    expected = brute_force_counts(grid, lat, lon, alt, 10.0)
+
+    np.testing.assert_array_equal(got, expected)
+
+
+def test_revisit_gap_and_coverage():
+    # One satellite over (0, 0) at steps 0 and 4 of 6, elsewhere otherwise
+    times = pd.date_range("2026-01-05", periods=6, freq="10min", tz="UTC")
+    over = [True, False, False, False, True, False]
+    samples = pd.DataFrame({
+        NAME: ["SAT"] * 6,
+        TIME: times,
+        LAT: [0.0 if o else 60.0 for o in over],
+        LON: [0.0 if o else 120.0 for o in over],
+        ALT: [550e3] * 6,
+    })
+
+    cells = coverage_map(samples, min_elevation_deg=10.0, cell_deg=2.0)
+    cell = cells[(cells[LAT] == 1.0) & (cells[LON] == 1.0)].iloc[0]
+
+    assert cell["Coverage"] == 2 / 6
+    assert cell["Mean Satellites in View"] == 2 / 6
+    assert cell["Max Revisit Gap (min)"] == 30.0
+
+    far = cells[(cells[LAT] == -61.0) & (cells[LON] == -119.0)].iloc[0]
+    assert far["Coverage"] == 0.0 and far["Max Revisit Gap (min)"] == 60.0
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+from downsampling import lttb_indices, bin_downsample
+from orbit_store import ALT, NAME, TIME
+
+
+def samples(rows):
+    frame = pd.DataFrame(rows, columns=[NAME, TIME, ALT])
+    frame[NAME] = frame[NAME].astype("category")
+    frame[TIME] = pd.to_datetime(frame[TIME]).dt.tz_localize("UTC").dt.as_unit("ms")
+    return frame.sort_values(TIME, kind="stable", ignore_index=True)
+
+
+def baseline(df, rule):
+    """The group-by downsampling the dashboard used before."""
+    binned = df.assign(**{"Time Bin": df[TIME].dt.floor(rule)})
+    return (binned.groupby([NAME, "Time Bin"], observed=True).first().reset_index()
+            .drop(columns=TIME).rename(columns={"Time Bin": TIME}))
+
+
+def test_satellite_entering_the_filter_mid_bin_is_kept():
+    # B only passes the (altitude) filter from 10:05, inside the 10:00 bin
+    df = samples([
+        ("A", "2026-01-05 10:00", 550e3),
+        ("A", "2026-01-05 10:05", 551e3),
+        ("B", "2026-01-05 10:05", 560e3),
+        ("A", "2026-01-05 10:10", 552e3),
+        ("B", "2026-01-05 10:10", 561e3),
+    ])
+
+    out = bin_downsample(df, "10min")
+
+    assert out[NAME].tolist() == ["A", "B", "A", "B"]
+    assert out[ALT].tolist() == [550e3, 560e3, 552e3, 561e3]
+    assert (out[TIME].dt.minute == [0, 0, 10, 10]).all()
+
+
+def test_matches_group_by_first():
+    rng = np.random.default_rng(0)
+    times = pd.date_range("2026-01-05", periods=90, freq="1min")
+    rows = [
+        (f"SAT-{s}", t, float(rng.uniform(4e5, 6e5)))
+        for t in times for s in range(6) if rng.random() < 0.6
+    ]
+    df = samples(rows)
+
+    out = bin_downsample(df, "10min")
+    expected = baseline(df, "10min")
+
+    key = [NAME, TIME]
+    got = out.assign(**{NAME: out[NAME].astype(str)}).sort_values(key, ignore_index=True)
+    expected = expected.assign(**{NAME: expected[NAME].astype(str)}) \
+        .sort_values(key, ignore_index=True)
+    pd.testing.assert_frame_equal(got[[NAME, TIME, ALT]], expected[[NAME, TIME, ALT]])
+    assert out[TIME].is_monotonic_increasing
+
+
+def test_lttb_keeps_endpoints_and_peak():
+    x = np.arange(1000)
+    y = np.sin(x / 50.0)
+    y[437] = 5.0
+
+    kept = lttb_indices(x, y, 50)
+
+    assert len(kept) == 50
+    assert kept[0] == 0 and kept[-1] == 999
+    assert 437 in kept
@@ -0,0 +1,58 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import plotly.graph_objects as go
+
+from figure_cache import FigureCache, as_figure
+
+
+def figure(n):
+    return go.Figure(go.Scatter(x=list(range(n)), y=list(range(n))))
+
+
+def test_round_trip(tmp_path):
+    cache = FigureCache(str(tmp_path))
+    key = cache.key("dataset", {"view": "Overview"})
+
+    assert cache.get(key) is None
+    cache.put(key, [figure(5)], {"rows": 5})
+
+    figures, meta = cache.get(key)
+    assert meta == {"rows": 5}
+    assert isinstance(figures[0], dict)
+
+    fig = as_figure(figures[0])
+    assert isinstance(fig, go.Figure)
+    assert list(fig.data[0].x) == list(range(5))
+    assert fig.to_json() == figure(5).to_json()
+
+
+def test_concurrent_writes_of_one_key(tmp_path):
+    cache = FigureCache(str(tmp_path))
+    key = cache.key("default filters")
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda _: cache.put(key, [figure(2_000)], {"ok": True}), range(32)))
+
+    figures, meta = cache.get(key)
+    assert meta == {"ok": True} and len(figures[0]["data"][0]["x"]) == 2_000
+    assert os.listdir(tmp_path) == [f"{key}.json"]
+    assert cache._bytes == os.path.getsize(tmp_path / f"{key}.json")
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    entry_bytes = len(figure(200).to_json())
+    cache = FigureCache(str(tmp_path), max_bytes=int(entry_bytes * 3.5))
+
+    keys = [cache.key(i) for i in range(3)]
+    for key in keys:
+        cache.put(key, [figure(200)])
+        time.sleep(0.01)
+    cache.get(keys[0])  # refresh the oldest entry
+
+    cache.put(cache.key(3), [figure(200)])
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None and cache.get(keys[2]) is not None
+    assert cache._bytes <= cache.max_bytes
@@ -0,0 +1,39 @@
+import numpy as np
+import pyarrow.parquet as pq
+
+from GenerateAllOrbitsFromMetadata import full_rebuild, incremental_update
+from orbit_store import NAME, HOUR, read_manifest, read_summary, shard_files
+
+CHUNK_ROWS = 500
+
+
+def test_incremental_update_matches_full_rebuild(tmp_path, catalog, epoch):
+    grid = (epoch, 2 * 24 * 60, 30)
+    updated_dir = str(tmp_path / "updated")
+    rebuilt_dir = str(tmp_path / "rebuilt")
+
+    full_rebuild(catalog, grid, 2, updated_dir, 1, CHUNK_ROWS)
+
+    # Two satellites decay, every fifth gets a new element set
+    current = catalog.take(np.arange(2, len(catalog)))
+    current.elements["mo"][::5] += 0.5
+
+    incremental_update(current, read_manifest(updated_dir), grid, updated_dir, 1, CHUNK_ROWS)
+    full_rebuild(current, grid, 2, rebuilt_dir, 1, CHUNK_ROWS)
+
+    for stem in ("shard_0000", "shard_0001"):
+        updated = shard_files(updated_dir, stem)
+        rebuilt = shard_files(rebuilt_dir, stem)
+        assert [p.split("/")[-2:] for p in updated] == [p.split("/")[-2:] for p in rebuilt]
+        for a, b in zip(updated, rebuilt):
+            assert pq.ParquetFile(a).metadata.num_row_groups == \
+                pq.ParquetFile(b).metadata.num_row_groups
+            assert pq.read_table(a).equals(pq.read_table(b))
+
+    def summary(path):
+        frame = read_summary(path)
+        frame[NAME] = frame[NAME].astype(str)
+        return frame.sort_values([NAME, HOUR], ignore_index=True)
+
+    assert summary(updated_dir).equals(summary(rebuilt_dir))
+    assert read_manifest(updated_dir) == read_manifest(rebuilt_dir)
@@ -0,0 +1,38 @@
+import gc
+import weakref
+
+import pandas as pd
+
+from on_demand import PropagationCache
+from orbit_query import IndexedSource
+
+START = pd.Timestamp("2026-01-05")
+
+
+def test_cached_sources_are_shared(catalog):
+    cache = PropagationCache()
+    names = list(catalog.names[:3])
+
+    source = cache.get(catalog, names, START, START + pd.Timedelta(hours=2), 5)
+
+    assert isinstance(source, IndexedSource)
+    assert cache.get(catalog, names[::-1], START, START + pd.Timedelta(hours=2), 5) is source
+    assert sorted(source.satellites) == sorted(names)
+
+
+def test_eviction_releases_the_tile_index(catalog):
+    window = (START, START + pd.Timedelta(hours=6), 1)
+    first = PropagationCache().get(catalog, catalog.names[:4], *window)
+    entry_bytes = first.orbit_index.nbytes + 16 * len(first)
+    cache = PropagationCache(max_bytes=int(entry_bytes * 1.5))
+
+    source = cache.get(catalog, catalog.names[:4], *window)
+    tiles = weakref.ref(source.spatial_index())
+    del source
+
+    cache.get(catalog, catalog.names[4:8], *window)
+    gc.collect()
+
+    assert len(cache) == 1
+    assert tiles() is None
+    assert cache.current_bytes <= cache.max_bytes
@@ -0,0 +1,92 @@
+import gzip
+import io
+import json
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from instrumentation import timed_export
+from orbit_export import EXPORT_FORMATS, export_callback
+from orbit_store import ALT, COLUMNS, LAT, LON, NAME, TIME
+
+
+@pytest.fixture
+def orbits():
+    n = 2_500
+    return pd.DataFrame({
+        NAME: pd.Categorical([f"SAT-{i % 7}" for i in range(n)]),
+        TIME: pd.date_range("2026-01-05", periods=n, freq="1min", tz="UTC").as_unit("ms"),
+        LAT: (pd.Series(range(n)) % 180 - 90).astype("float32"),
+        LON: (pd.Series(range(n)) % 360 - 180).astype("float32"),
+        ALT: pd.Series(range(n), dtype="float32") * 10 + 5e5,
+    })
+
+
+def download_bytes(export):
+    buffer = export()
+    assert isinstance(buffer, io.BytesIO) and buffer.tell() == 0
+    return buffer.getvalue()
+
+
+def read_back(data, fmt):
+    if fmt == "Parquet":
+        return pq.read_table(io.BytesIO(data)).to_pandas()
+    if fmt == "CSV (gzip)":
+        data = gzip.decompress(data)
+    frame = pd.read_csv(io.BytesIO(data))
+    frame[TIME] = pd.to_datetime(frame[TIME]).dt.as_unit("ms")
+    return frame
+
+
+@pytest.mark.parametrize("fmt", list(EXPORT_FORMATS))
+def test_export_round_trip(orbits, fmt):
+    data = download_bytes(export_callback(orbits, fmt))
+    frame = read_back(data, fmt)
+
+    assert list(frame.columns) == COLUMNS
+    assert frame[NAME].astype(str).tolist() == orbits[NAME].astype(str).tolist()
+    assert (frame[TIME] == orbits[TIME]).all()
+    for column in (LAT, LON, ALT):
+        assert frame[column].to_numpy() == pytest.approx(orbits[column].to_numpy())
+
+
+def test_timed_export_passes_the_buffer_through(orbits, tmp_path):
+    log = tmp_path / "perf.jsonl"
+    export = timed_export(export_callback(orbits, "CSV"), str(log), "session",
+                          format="CSV", rows=len(orbits))
+
+    data = download_bytes(export)
+
+    record = json.loads(log.read_text())
+    assert record["event"] == "export"
+    assert record["bytes"] == len(data)
+    assert len(read_back(data, "CSV")) == len(orbits)
+
+
+def download_app(orbits, fmt, log):
+    """The dashboard's export button; the export logs a line when it runs."""
+    import streamlit as st
+
+    from instrumentation import timed_export
+    from orbit_export import EXPORT_FORMATS, export_callback, export_file_name
+
+    st.download_button(
+        "Download",
+        timed_export(export_callback(orbits, fmt), log, "session", format=fmt, rows=len(orbits)),
+        export_file_name("filtered_orbit_data", fmt),
+        EXPORT_FORMATS[fmt][1],
+    )
+
+
+@pytest.mark.parametrize("fmt", list(EXPORT_FORMATS))
+def test_download_button_defers_the_export(orbits, fmt, tmp_path):
+    log = tmp_path / "perf.jsonl"
+    at = AppTest.from_function(download_app, args=(orbits, fmt, str(log))).run()
+
+    assert not at.exception
+    button = at.download_button[0]
+    assert button.proto.deferred_file_id
+    assert not button.proto.url
+    assert not log.exists()
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from orbit_index import OrbitIndex
+from orbit_store import ALT, LAT, LON, NAME, TIME
+
+
+@pytest.fixture
+def orbit_index():
+    rng = np.random.default_rng(1)
+    times = pd.date_range("2026-01-05", periods=48, freq="30min", tz="UTC").as_unit("ms")
+    df = pd.DataFrame({
+        NAME: np.repeat([f"SAT-{i}" for i in range(5)], len(times)),
+        TIME: np.tile(times, 5),
+        LAT: rng.uniform(-60, 60, 5 * len(times)).astype("float32"),
+        LON: rng.uniform(-180, 180, 5 * len(times)).astype("float32"),
+        ALT: rng.uniform(4e5, 6e5, 5 * len(times)).astype("float32"),
+    })
+    return OrbitIndex(df)
+
+
+def test_select_matches_a_pandas_filter(orbit_index):
+    df = orbit_index.df
+    start, end = pd.Timestamp("2026-01-05 06:00", tz="UTC"), pd.Timestamp("2026-01-05 18:00")
+    names = ("SAT-1", "SAT-3")
+
+    got = orbit_index.rows(orbit_index.select(start, end, (4.5e5, 5.5e5), names))
+
+    naive = df[TIME].dt.tz_localize(None)
+    mask = ((naive >= start.tz_localize(None)) & (naive < end) & df[ALT].between(4.5e5, 5.5e5)
+            & df[NAME].isin(names))
+    pd.testing.assert_frame_equal(got, df[mask])
+
+
+def test_unfiltered_select_is_a_slice(orbit_index):
+    assert isinstance(orbit_index.select(), slice)
+
+
+def test_satellite_rows_are_time_sorted(orbit_index):
+    sat = orbit_index.satellite("SAT-2")
+    assert (sat[NAME] == "SAT-2").all()
+    assert len(sat) == 48 and sat[TIME].is_monotonic_increasing
+    assert orbit_index.satellite("missing").empty
+
+
+def test_shared_arrays_are_read_only(orbit_index):
+    for array in (orbit_index.times, orbit_index.altitudes, orbit_index.codes,
+                  orbit_index.by_satellite, orbit_index.offsets):
+        with pytest.raises(ValueError):
+            array[0] = array[1]
@@ -0,0 +1,71 @@
+import pandas as pd
+import pytest
+
+from GenerateAllOrbitsFromMetadata import full_rebuild
+from orbit_query import DatasetSource, IndexedSource, OrbitQuery, open_source
+from orbit_store import ALT, COLUMNS, NAME, TIME
+
+
+@pytest.fixture(scope="module")
+def dataset_dir(tmp_path_factory, catalog, epoch):
+    path = str(tmp_path_factory.mktemp("orbits") / "all_satellite_orbits")
+    # Small chunks: many row groups, so name pruning has something to skip
+    full_rebuild(catalog, (epoch, 2 * 24 * 60, 10), 2, path, 1, 2_000)
+    return path
+
+
+def canonical(frame):
+    frame = frame[COLUMNS].assign(**{NAME: frame[NAME].astype(str)})
+    return frame.sort_values([TIME, NAME], ignore_index=True)
+
+
+def queries(catalog, epoch):
+    start = pd.Timestamp(epoch) + pd.Timedelta(hours=7, minutes=3)
+    end = start + pd.Timedelta(hours=20)
+    names = tuple(catalog.names[[1, 7, 30]])
+    return [
+        OrbitQuery(),
+        OrbitQuery(start, end),
+        OrbitQuery(start, end, names),
+        OrbitQuery(start, end, alt_range=(480e3, 560e3)),
+        OrbitQuery(bbox=(-20.0, 35.0, -40.0, 60.0)),
+        OrbitQuery(start, end, bbox=(-50.0, 50.0, 150.0, -160.0)),
+        OrbitQuery(radius=(10.0, 179.0, 2500.0), alt_range=(400e3, 700e3)),
+        OrbitQuery(start, end, names, resolution="30min"),
+    ]
+
+
+def test_pushdown_matches_the_resident_index(dataset_dir, catalog, epoch):
+    resident = open_source(dataset_dir)
+    disk = DatasetSource(dataset_dir, resident.summary)
+    assert isinstance(resident, IndexedSource)
+
+    for query in queries(catalog, epoch):
+        expected = canonical(resident.samples(query))
+        got = canonical(disk.samples(query))
+        pd.testing.assert_frame_equal(got, expected, check_categorical=False)
+
+
+def test_queries_filter_what_they_say(dataset_dir, catalog, epoch):
+    resident = open_source(dataset_dir)
+    start = pd.Timestamp(epoch) + pd.Timedelta(hours=3)
+    names = tuple(catalog.names[:2])
+
+    samples = resident.samples(OrbitQuery(start, start + pd.Timedelta(hours=1), names,
+                                          alt_range=(0.0, 2e6)))
+
+    assert set(samples[NAME].astype(str)) == set(names)
+    assert samples[TIME].min() >= start and samples[TIME].max() < start + pd.Timedelta(hours=1)
+    assert samples[ALT].between(0.0, 2e6).all()
+
+
+def test_disk_source_satellite_lookup(dataset_dir, catalog):
+    name = catalog.names[5]
+    resident = open_source(dataset_dir)
+    disk = open_source(dataset_dir, resident_rows=0)
+
+    assert isinstance(disk, DatasetSource)
+    pd.testing.assert_frame_equal(canonical(disk.satellite(name)),
+                                  canonical(resident.satellite(name)),
+                                  check_categorical=False)
+    assert disk.satellites == resident.satellites
@@ -0,0 +1,56 @@
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+from skyfield.api import EarthSatellite, wgs84
+
+from passes import STATIONS, predict_passes
+from propagation import build_time_grid
+
+MIN_ELEVATION = 10.0
+
+
+def skyfield_passes(satrec, station, ts, t0, t1):
+    """(culmination time, max elevation) of every full pass, via find_events."""
+    satellite = EarthSatellite.from_satrec(satrec, ts)
+    place = wgs84.latlon(station["Latitude"], station["Longitude"],
+                         elevation_m=station["Elevation (m)"])
+    times, events = satellite.find_events(place, t0, t1, altitude_degrees=MIN_ELEVATION)
+
+    found = []
+    for t, event in zip(times, events):
+        if event == 1:
+            elevation = (satellite - place).at(t).altaz()[0].degrees
+            found.append((pd.Timestamp(t.utc_datetime()).tz_localize(None), elevation))
+    return found
+
+
+def test_passes_match_skyfield(ts, catalog, epoch):
+    catalog = catalog.take(np.arange(6))
+    stations = STATIONS.iloc[[1, 3, 6]].reset_index(drop=True)
+    times = build_time_grid(ts, epoch, 12 * 60, 1)
+
+    passes = predict_passes(catalog, stations, times, MIN_ELEVATION)
+
+    # Passes cut by the window edges are compared where skyfield sees them too
+    t0, t1 = ts.utc(epoch + timedelta(minutes=20)), ts.utc(epoch + timedelta(hours=11, minutes=40))
+    inside = passes["Culmination (UTC)"].between(
+        pd.Timestamp(t0.utc_datetime()).tz_localize(None),
+        pd.Timestamp(t1.utc_datetime()).tz_localize(None))
+
+    expected_total = 0
+    for satrec, name in zip(catalog.satrecs(), catalog.names):
+        for _, station in stations.iterrows():
+            expected = skyfield_passes(satrec, station, ts, t0, t1)
+            got = passes[inside & (passes["Satellite Name"] == name)
+                         & (passes["Station"] == station["Station"])]
+            assert len(got) == len(expected), (name, station["Station"])
+            for (culmination, elevation), (_, row) in zip(expected, got.iterrows()):
+                assert abs(row["Culmination (UTC)"] - culmination) < pd.Timedelta(seconds=2)
+                assert abs(row["Max Elevation (deg)"] - elevation) < 0.05
+            expected_total += len(expected)
+
+    assert expected_total > 0
+    full = passes[inside].dropna(subset=["Rise (UTC)", "Set (UTC)"])
+    assert (full["Rise (UTC)"] < full["Culmination (UTC)"]).all()
+    assert (full["Culmination (UTC)"] < full["Set (UTC)"]).all()
@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+from sgp4.api import WGS72, Satrec
+
+from propagation import (
+    build_time_grid,
+    iter_propagated_blocks,
+    propagate_geodetic,
+    propagate_teme,
+)
+
+EPOCH_DAYS = 27761.86  # 2026-01-03
+
+
+def leo(bstar):
+    """Starlink-like element set with the given drag term."""
+    sat = Satrec()
+    sat.sgp4init(WGS72, "i", 1, EPOCH_DAYS, bstar, 1.3e-8, 0.0, 1.5e-4, 1.0, 0.93, 2.0,
+                 15.06 / 720.0 * np.pi, 3.0)
+    return sat
+
+
+def grid(ts, days_after_epoch, hours=6):
+    epoch = pd.Timestamp("1949-12-31", tz="UTC") + pd.Timedelta(days=EPOCH_DAYS)
+    start = (epoch + pd.Timedelta(days=days_after_epoch)).to_pydatetime()
+    return build_time_grid(ts, start, hours * 60, 10)
+
+
+def test_stale_element_sets_are_invalid(ts):
+    # High drag, propagated long past epoch: SGP4 reports no error but
+    # sends the satellite to about 155,000 km, then millions of km
+    stale = [leo(0.03), leo(0.03)]
+    for days, radius_km in ((280, 1e5), (350, 1e6)):
+        times = grid(ts, days)
+        error, r, _ = propagate_teme(stale, times)
+        assert (error == 0).all()
+        assert (np.linalg.norm(r, axis=-1) > radius_km).all()
+
+        _, _, _, valid = propagate_geodetic(stale, times)
+        assert not valid.any()
+
+
+def test_healthy_and_stale_satellites_in_one_block(ts):
+    times = grid(ts, 280)
+    lat, lon, alt, valid = propagate_geodetic([leo(1e-4), leo(0.03)], times)
+
+    assert valid[0].all() and not valid[1].any()
+    assert (alt[0] > 3e5).all() and (alt[0] < 7e5).all()
+
+
+def test_blocks_apply_the_same_mask(ts):
+    satrecs = [leo(1e-4), leo(0.03), leo(3e-4)]
+    times = grid(ts, 280, hours=2)
+    _, _, _, expected = propagate_geodetic(satrecs, times)
+
+    valid = np.zeros_like(expected)
+    for sat_slice, time_slice, *_, block_valid in iter_propagated_blocks(satrecs, times, 5):
+        valid[sat_slice, time_slice] = block_valid
+    np.testing.assert_array_equal(valid, expected)